@@ -1,12 +1,47 @@
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
+from beanie import PydanticObjectId
+from bson.errors import InvalidId
 from app.utils.security import decode_access_token
+from app.utils.cache import TTLCache
 from app.models.user import User, UserRole
+from app.config import settings
 
 # HTTP Bearer scheme for Swagger UI - simple token input
 security = HTTPBearer(auto_error=False)
 
+# Resolved users keyed by JWT `sub`, so role checks skip a Mongo round trip
+user_cache = TTLCache(max_size=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
+
+
+async def get_user_by_id(user_id: Optional[str]) -> Optional[User]:
+    """
+    Resolve a user by ID, serving from the in-process cache when possible.
+
+    Each caller gets its own copy, so a request mutating its user cannot leak
+    into the cache or into concurrent requests. Database errors propagate
+    (as a 5xx) rather than looking like an unknown user.
+    """
+    if not user_id:
+        return None
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user.model_copy(deep=True)
+    try:
+        oid = PydanticObjectId(user_id)
+    except (InvalidId, TypeError):
+        return None
+    user = await User.get(oid)
+    if user:
+        user_cache.set(user_id, user.model_copy(deep=True))
+    return user
+
+
+def invalidate_user(user_id) -> None:
+    """Drop a cached user after it was created, changed or deleted."""
+    user_cache.invalidate(str(user_id))
+
 
 async def get_token_from_request(request: Request, credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)) -> str:
     """Extract token from Bearer header or cookie."""
@@ -39,7 +74,7 @@ async def get_current_user(request: Request, credentials: Optional[HTTPAuthoriza
         )
     
     user_id = payload.get("sub")
-    user = await User.get(user_id)
+    user = await get_user_by_id(user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
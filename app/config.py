@@ -1,16 +1,82 @@
 from pydantic_settings import BaseSettings
 from pydantic import field_validator
-from typing import List
+from typing import List, Optional
 import json
 
 class Settings(BaseSettings):
     MONGODB_URI: str
     DATABASE_NAME: str = "progress_hub"
+
+    # Mongo connection pool (sized per worker process)
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_MIN_POOL_SIZE: int = 0
+    MONGO_MAX_IDLE_TIME_MS: Optional[int] = None
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: Optional[int] = None
+    MONGO_CONNECT_TIMEOUT_MS: int = 20000
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 30000
+    MONGO_SOCKET_TIMEOUT_MS: Optional[int] = None
+    MONGO_COMPRESSORS: str = ""  # e.g. "zstd,snappy,zlib"; zstd/snappy need extra packages
+
+    # Startup: defer index sync and cache warm-up until after serving starts
+    DEFER_INDEX_SYNC: bool = True
+    WARM_CACHES_ON_STARTUP: bool = True
     
     # JWT Settings
     JWT_SECRET: str = "change-this-secret-in-production"
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 days (10080 minutes)
+
+    # Password hashing (bcrypt runs on a bounded thread pool)
+    PASSWORD_HASH_WORKERS: int = 4
+
+    # User cache (resolved JWT subjects)
+    USER_CACHE_TTL_SECONDS: float = 60.0
+    USER_CACHE_MAX_SIZE: int = 1024
+
+    # Verified-token cache (entries expire at the token's own `exp`)
+    TOKEN_CACHE_MAX_SIZE: int = 4096
+
+    # ETags for polled read endpoints
+    ETAG_MAX_AGE_SECONDS: int = 300
+
+    # Dashboard response cache
+    RESPONSE_CACHE_TTL_SECONDS: float = 30.0
+    RESPONSE_CACHE_MAX_SIZE: int = 256
+
+    # Activity stats windows end on a multiple of this, and are cached until the next one
+    ACTIVITY_STATS_BUCKET_SECONDS: int = 60
+
+    # Burnup / velocity charts
+    SPRINT_START_DATE: str = "2024-01-01"
+    SPRINT_LENGTH_DAYS: int = 14
+    BURNUP_WINDOW_DAYS: int = 90
+    VELOCITY_SPRINTS: int = 6
+
+    # Bulk update endpoints
+    BULK_MAX_ITEMS: int = 500
+    BULK_WRITE_CONCURRENCY: int = 16  # Items written one by one run this many at a time
+
+    # Write-behind activity logging
+    ACTIVITY_QUEUE_MAX_SIZE: int = 10000
+    ACTIVITY_FLUSH_BATCH_SIZE: int = 100
+    ACTIVITY_FLUSH_INTERVAL_SECONDS: float = 1.0
+
+    # Live activity feed (Server-Sent Events)
+    ACTIVITY_STREAM_QUEUE_SIZE: int = 100
+    ACTIVITY_STREAM_HEARTBEAT_SECONDS: float = 15.0
+    ACTIVITY_STREAM_POLL_INTERVAL_SECONDS: float = 2.0
+    ACTIVITY_STREAM_REPLAY_LIMIT: int = 500
+
+    # Activity log retention: raw logs expire via a TTL index after being
+    # rolled up into per-day summaries (None keeps raw logs forever)
+    ACTIVITY_RETENTION_DAYS: Optional[int] = 90
+    ACTIVITY_ROLLUP_INTERVAL_SECONDS: float = 3600.0
+    ACTIVITY_ROLLUP_DELAY_SECONDS: float = 3600.0  # grace after midnight UTC for late flushes
+
+    # Slow Mongo command log (None disables it)
+    SLOW_QUERY_THRESHOLD_MS: Optional[float] = 100.0
+    SLOW_QUERY_LOG_SIZE: int = 200
+    SLOW_QUERY_EXPLAIN: bool = True
     
     ALLOWED_ORIGINS: List[str] = []
 
@@ -25,6 +91,13 @@ class Settings(BaseSettings):
             return [i.strip() for i in v.split(",")]
         return v
 
+    @field_validator("ACTIVITY_RETENTION_DAYS")
+    def check_retention(cls, v):
+        # A day is rolled up only after it ends, so it must outlive that
+        if v is not None and v < 2:
+            raise ValueError("ACTIVITY_RETENTION_DAYS must be at least 2")
+        return v
+
     class Config:
         env_file = ".env"
         extra = "ignore"
@@ -1,32 +1,171 @@
-from motor.motor_asyncio import AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from beanie import init_beanie
+from pymongo import IndexModel, monitoring
+from typing import List, Optional
+import asyncio
+import threading
 from app.config import settings
-from app.models.task import Task
+from app.models.task import Task, TaskDailyRollup
 from app.models.roadmap import RoadmapPhase
 from app.models.feature import Feature
-from app.models.dashboard import KPI, PipelineItem, ChartData
+from app.models.dashboard import KPI, PipelineItem, ChartData, DashboardCounters
 from app.models.user import User
 from app.models.report import IncidentReport
-from app.models.activity import ActivityLog
+from app.models.activity import ActivityLog, ActivityDailyRollup
+from app.utils.metrics import command_metrics
+from app.utils.slow_queries import slow_command_log
 
 import certifi
 
-async def init_db():
-    client = AsyncIOMotorClient(settings.MONGODB_URI, tlsCAFile=certifi.where())
-    database = client[settings.DATABASE_NAME]
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Counts connection pool events so readiness checks can report pool usage."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checked_out = 0
+        self.open_connections = 0
+        self.total_checkouts = 0
+        self.checkout_failures = 0
+
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_cleared(self, event): pass
+    def pool_closed(self, event): pass
+    def connection_check_out_started(self, event): pass
+    def connection_ready(self, event): pass
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open_connections += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open_connections -= 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.checked_out += 1
+            self.total_checkouts += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+
+    def stats(self) -> dict:
+        return {
+            "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+            "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+            "openConnections": self.open_connections,
+            "checkedOut": self.checked_out,
+            "totalCheckouts": self.total_checkouts,
+            "checkoutFailures": self.checkout_failures,
+        }
+
+
+pool_stats = PoolStatsListener()
+
+_client: Optional[AsyncIOMotorClient] = None
+
+DOCUMENT_MODELS = [
+    Task,
+    TaskDailyRollup,
+    RoadmapPhase,
+    Feature,
+    KPI,
+    PipelineItem,
+    ChartData,
+    DashboardCounters,
+    User,
+    IncidentReport,
+    ActivityLog,
+    ActivityDailyRollup
+]
+
+
+def get_client() -> AsyncIOMotorClient:
+    """The process-wide Mongo client created by `init_db`."""
+    if _client is None:
+        raise RuntimeError("Database client is not initialized; call init_db() first")
+    return _client
+
+
+def get_database() -> AsyncIOMotorDatabase:
+    return get_client()[settings.DATABASE_NAME]
+
+
+def _client_options() -> dict:
+    options = {
+        "tlsCAFile": certifi.where(),
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "connectTimeoutMS": settings.MONGO_CONNECT_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "event_listeners": [pool_stats, command_metrics, slow_command_log],
+    }
+    if settings.MONGO_MAX_IDLE_TIME_MS is not None:
+        options["maxIdleTimeMS"] = settings.MONGO_MAX_IDLE_TIME_MS
+    if settings.MONGO_WAIT_QUEUE_TIMEOUT_MS is not None:
+        options["waitQueueTimeoutMS"] = settings.MONGO_WAIT_QUEUE_TIMEOUT_MS
+    if settings.MONGO_SOCKET_TIMEOUT_MS is not None:
+        options["socketTimeoutMS"] = settings.MONGO_SOCKET_TIMEOUT_MS
+    if settings.MONGO_COMPRESSORS:
+        options["compressors"] = settings.MONGO_COMPRESSORS
+    return options
+
+
+async def init_db(skip_indexes: bool = False):
+    """
+    Connect and register the document models.
+
+    init_beanie creates the indexes declared in each model's Settings unless
+    `skip_indexes` is set. Unique indexes are created here even then, since
+    writes rely on them for correctness; call `sync_indexes(unique=False)`
+    later for the rest.
+    """
+    global _client
+    if _client is None:
+        _client = AsyncIOMotorClient(settings.MONGODB_URI, **_client_options())
     
     await init_beanie(
-        database=database,
-        document_models=[
-            Task,
-            RoadmapPhase,
-            Feature,
-            KPI,
-            PipelineItem,
-            ChartData,
-            User,
-            IncidentReport,
-            ActivityLog
-        ]
+        database=get_database(),
+        document_models=DOCUMENT_MODELS,
+        skip_indexes=skip_indexes
     )
+    if skip_indexes:
+        await sync_indexes(unique=True)
+    collections = [model.get_settings().name for model in DOCUMENT_MODELS]
+    command_metrics.track_collections(collections)
+    slow_command_log.track_collections(collections, get_database(), asyncio.get_running_loop())
+
+
+def declared_indexes(model, unique: Optional[bool] = None) -> List[IndexModel]:
+    """
+    The pymongo IndexModels a Document declares (Beanie wraps them once
+    initialised), optionally only the unique or only the non-unique ones.
+    """
+    indexes = [index.index for index in model.get_settings().indexes or []]
+    if unique is None:
+        return indexes
+    return [index for index in indexes if bool(index.document.get("unique")) == unique]
+
+
+async def sync_indexes(unique: Optional[bool] = None):
+    """Create the declared indexes (all, or only unique / non-unique); existing identical ones are a no-op."""
+    pending = [(model, declared_indexes(model, unique)) for model in DOCUMENT_MODELS]
+    await asyncio.gather(*(
+        model.get_motor_collection().create_indexes(indexes)
+        for model, indexes in pending
+        if indexes
+    ))
+
 
+async def close_db():
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
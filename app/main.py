@@ -1,9 +1,23 @@
+import time
+_import_started = time.perf_counter()
+
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import init_db
+from app.database import init_db, close_db, sync_indexes
 from app.config import settings
 from app.auth import verify_token
-from app.routes import tasks, roadmap, features, dashboard, users, auth, reports, activities
+from app.utils.activity_logger import activity_writer
+from app.utils.activity_stream import activity_broadcaster
+from app.utils.activity_retention import activity_retention
+from app.utils.counters import ensure_counters
+from app.utils.task_rollups import ensure_task_rollups
+from app.utils.feature_history import migrate_feature_history
+from app.utils.pagination import NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER
+from app.utils.metrics import MetricsMiddleware
+from app.utils.startup import timed, record_timing, run_in_background, cancel_background_tasks
+from app.routes import tasks, roadmap, features, dashboard, users, auth, reports, activities, health, metrics, debug
+
+record_timing("importMs", _import_started)
 
 app = FastAPI(title="JobProMax Progress Hub API", redirect_slashes=False)
 
@@ -14,17 +28,50 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER],
 )
 
+# Per-route latency and status counts, served at /metrics
+app.add_middleware(MetricsMiddleware)
+
 @app.on_event("startup")
 async def start_db():
-    await init_db()
+    # Only what the first request needs (including unique indexes) runs
+    # before serving; other index builds and cache warm-up continue in the
+    # background
+    with timed("initDbMs"):
+        await init_db(skip_indexes=settings.DEFER_INDEX_SYNC)
+    # Counters and chart rollups are only ever incremented, so they must
+    # exist before any write
+    with timed("countersMs"):
+        await ensure_counters()
+        await ensure_task_rollups()
+    activity_writer.start()
+    activity_retention.start()
+
+    if settings.DEFER_INDEX_SYNC:
+        run_in_background("indexSyncMs", sync_indexes(unique=False))
+    if settings.WARM_CACHES_ON_STARTUP:
+        run_in_background("cacheWarmupMs", dashboard.warm_cache())
+    # Features written before history was packed; reads convert them meanwhile
+    run_in_background("featureHistoryMigrationMs", migrate_feature_history())
+
+@app.on_event("shutdown")
+async def stop_db():
+    await cancel_background_tasks()
+    await activity_broadcaster.stop()
+    await activity_retention.stop()
+    # Flush pending activity logs before the client goes away
+    await activity_writer.stop()
+    await close_db()
 
 @app.get("/")
 async def root():
     return {"message": "Welcome to JobProMax Progress Hub API"}
 
 # Include Routers
+app.include_router(health.router, prefix="/health", tags=["Health"])
+app.include_router(metrics.router, tags=["Metrics"])
 app.include_router(auth.router, prefix="/auth", tags=["Auth"])
 app.include_router(users.router, prefix="/users", tags=["Users"])
 app.include_router(tasks.router, tags=["Tasks"], dependencies=[Depends(verify_token)])
@@ -33,4 +80,4 @@ app.include_router(features.router, tags=["Features"], dependencies=[Depends(ver
 app.include_router(dashboard.router, tags=["Dashboard"], dependencies=[Depends(verify_token)])
 app.include_router(reports.router, prefix="/api/reports", tags=["Reports"])
 app.include_router(activities.router, prefix="/api/activities", tags=["Activities"], dependencies=[Depends(verify_token)])
-
+app.include_router(debug.router, prefix="/debug", tags=["Debug"], dependencies=[Depends(verify_token)])
@@ -4,6 +4,7 @@ from typing import Optional, Dict, Any
 from datetime import datetime
 from enum import Enum
 from beanie import PydanticObjectId
+from pymongo import IndexModel, ASCENDING, DESCENDING
 
 
 class ActionType(str, Enum):
@@ -43,6 +44,36 @@ class ActivityLog(Document):
     targetName: Optional[str] = None  # Human-readable name
     details: Optional[Dict[str, Any]] = None  # Additional context
     timestamp: datetime = Field(default_factory=datetime.utcnow)
+    insertedAt: Optional[datetime] = None  # Set by the writer; orders the live stream
 
     class Settings:
         name = "activity_logs"
+        indexes = [
+            IndexModel([("insertedAt", ASCENDING), ("_id", ASCENDING)]),
+            IndexModel([("timestamp", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("userId", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("action", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("userId", ASCENDING), ("action", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)]),
+        ]
+        # The TTL index on `timestamp` is managed by app.utils.activity_retention,
+        # since its expiry is configurable and it must wait for the first rollup
+
+
+class ActivityDailyRollup(Document):
+    """Per-day, per-user, per-action activity counts that outlive the raw logs"""
+    day: str  # Format: YYYY-MM-DD (UTC)
+    userId: PydanticObjectId
+    userName: str  # As of the user's last activity that day
+    userRole: str
+    action: ActionType
+    total: int = 0
+    firstAt: Optional[datetime] = None
+    lastAt: Optional[datetime] = None
+
+    class Settings:
+        name = "activity_daily_rollups"
+        indexes = [
+            IndexModel([("day", ASCENDING), ("userId", ASCENDING), ("action", ASCENDING)], unique=True),
+            IndexModel([("userId", ASCENDING), ("day", ASCENDING)]),
+            IndexModel([("action", ASCENDING), ("day", ASCENDING)]),
+        ]
@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from enum import Enum
+from typing import List
+
+
+class BulkItemStatus(str, Enum):
+    UPDATED = "updated"
+    NOT_FOUND = "not_found"
+    CONFLICT = "conflict"
+    INVALID_ID = "invalid_id"
+    DUPLICATE = "duplicate"
+
+
+class BulkItemResult(BaseModel):
+    """Outcome of one item in a bulk update"""
+    id: str
+    result: BulkItemStatus
+
+
+class BulkUpdateResponse(BaseModel):
+    updated: int
+    results: List[BulkItemResult]
@@ -1,7 +1,8 @@
 from beanie import Document
 from pydantic import BaseModel, Field
 from enum import Enum
-from typing import Optional, List
+from typing import Optional, List, Dict
+from pymongo import IndexModel, ASCENDING
 
 # KPI Models
 class KPI(Document):
@@ -35,6 +36,7 @@ class PipelineItem(Document):
     estEffort: Optional[str] = None # For Incoming
     requester: Optional[str] = None # For Wishlist
     dateAdded: Optional[str] = None # For Wishlist
+    revision: int = 0 # Bumped on every update, for optimistic concurrency
 
     class Settings:
         name = "pipeline_items"
@@ -55,3 +57,23 @@ class ChartData(Document):
 
     class Settings:
         name = "chart_data"
+        indexes = [
+            IndexModel([("chart_type", ASCENDING)]),
+        ]
+
+# Materialized counters behind the live KPIs
+class DashboardCounters(Document):
+    """
+    Per-status document counts, kept current by the write routes with `$inc`
+    so KPIs are an O(1) read. Keys are enum member names (e.g. 'IN_PROGRESS').
+    """
+    key: str = "global"
+    tasks: Dict[str, int] = {}
+    features: Dict[str, int] = {}
+    reports: Dict[str, int] = {}
+
+    class Settings:
+        name = "dashboard_counters"
+        indexes = [
+            IndexModel([("key", ASCENDING)], unique=True),
+        ]
@@ -1,5 +1,5 @@
 from beanie import Document
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from enum import Enum
 from typing import Optional, List
 from datetime import datetime
@@ -23,6 +23,7 @@ class LastUpdatedBy(BaseModel):
     userId: PydanticObjectId
     userName: str
     updatedAt: datetime = Field(default_factory=datetime.utcnow)
+    previousStatus: Optional[FeatureStatusEnum] = None  # Status before this update
 
 
 class Feature(Document):
@@ -30,9 +31,29 @@ class Feature(Document):
     status: FeatureStatusEnum
     publicNote: str
     linkedTicket: Optional[str] = None
-    history: List[HistoryEntry] = []  # 30-60 day history
+    # Last 60 days of status, one code byte per day from historyStart; see
+    # app.utils.feature_history. Responses expose it as `history` entries.
+    historyStart: Optional[str] = None  # Format: YYYY-MM-DD
+    historyCodes: bytes = b""
     lastUpdatedBy: Optional[LastUpdatedBy] = None
 
     class Settings:
         name = "features"
 
+
+class FeatureSummary(BaseModel):
+    """Feature list projection without the embedded history"""
+    model_config = ConfigDict(populate_by_name=True)
+
+    id: PydanticObjectId = Field(alias="_id")
+    name: str
+    status: FeatureStatusEnum
+    publicNote: str
+    linkedTicket: Optional[str] = None
+    lastUpdatedBy: Optional[LastUpdatedBy] = None
+
+
+class FeatureWithHistory(FeatureSummary):
+    """Feature with its daily status history unpacked into entries"""
+    history: List[HistoryEntry] = []
+
@@ -1,9 +1,10 @@
 from beanie import Document
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List
 from datetime import datetime
 from enum import Enum
 from beanie import PydanticObjectId
+from pymongo import IndexModel, ASCENDING, DESCENDING
 
 
 class ImpactLevel(str, Enum):
@@ -46,3 +47,28 @@ class IncidentReport(Document):
 
     class Settings:
         name = "incident_reports"
+        indexes = [
+            IndexModel([("createdAt", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("status", ASCENDING), ("createdAt", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("impactLevel", ASCENDING), ("createdAt", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("featureId", ASCENDING), ("createdAt", DESCENDING), ("_id", DESCENDING)]),
+        ]
+
+
+class ReportSummary(BaseModel):
+    """Report list projection without admin notes"""
+    model_config = ConfigDict(populate_by_name=True)
+
+    id: PydanticObjectId = Field(alias="_id")
+    featureId: Optional[PydanticObjectId] = None
+    reporter: Reporter
+    impactLevel: ImpactLevel
+    description: str
+    status: ReportStatus
+    createdAt: datetime
+    resolvedAt: Optional[datetime] = None
+
+
+class ReportWithNotes(ReportSummary):
+    """Report list projection including admin notes"""
+    adminNotes: List[AdminNote] = []
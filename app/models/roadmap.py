@@ -30,6 +30,7 @@ class RoadmapPhase(Document):
     status: PhaseStatus
     health: Optional[HealthStatus] = None
     deliverables: List[Deliverable]
+    revision: int = 0  # Bumped on every update, for optimistic concurrency
 
     class Settings:
         name = "roadmap_phases"
@@ -1,5 +1,6 @@
 from beanie import Document
 from pydantic import Field
+from pymongo import IndexModel, ASCENDING
 from enum import Enum
 from typing import Optional
 from datetime import datetime
@@ -21,6 +22,21 @@ class Task(Document):
     status: TaskStatus
     dueDate: str  # Keeping as string to match simple requirements, can be datetime
     priority: Optional[TaskPriority] = None
+    completedAt: Optional[datetime] = None  # Set when status moves to Done
+    revision: int = 0  # Bumped on every update, for optimistic concurrency
 
     class Settings:
         name = "tasks"
+
+
+class TaskDailyRollup(Document):
+    """Per-day task scope and completion counts backing the burnup/velocity charts"""
+    day: str  # Format: YYYY-MM-DD (UTC)
+    scopeAdded: int = 0
+    completed: int = 0
+
+    class Settings:
+        name = "task_daily_rollups"
+        indexes = [
+            IndexModel([("day", ASCENDING)], unique=True),
+        ]
@@ -1,7 +1,8 @@
-from beanie import Document
-from pydantic import EmailStr
+from beanie import Document, PydanticObjectId, after_event, Delete, Replace, Save, SaveChanges, Update
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 from enum import Enum
 from typing import Optional
+from pymongo import IndexModel, ASCENDING
 
 class UserRole(str, Enum):
     MANAGER = "manager"
@@ -13,6 +14,25 @@ class User(Document):
     name: str
     password_hash: str
     role: UserRole = UserRole.DEVELOPER
+
+    @after_event(Replace, Save, SaveChanges, Update, Delete)
+    def drop_cached(self):
+        """Keep the resolved-user cache in step with role/profile changes made through the model."""
+        from app.auth import invalidate_user  # app.auth imports this module
+        invalidate_user(self.id)
     
     class Settings:
         name = "users"
+        indexes = [
+            IndexModel([("email", ASCENDING)], unique=True),
+        ]
+
+
+class UserSummary(BaseModel):
+    """User projection without the password hash"""
+    model_config = ConfigDict(populate_by_name=True)
+
+    id: PydanticObjectId = Field(alias="_id")
+    email: str
+    name: str
+    role: UserRole
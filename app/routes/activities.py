@@ -1,12 +1,25 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, List, Optional
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import date, datetime
+import asyncio
 from beanie import PydanticObjectId
 
-from app.models.activity import ActivityLog, ActionType
+from app.models.activity import ActivityLog, ActivityDailyRollup, ActionType
 from app.models.user import User, UserRole
 from app.auth import get_current_user, require_role
+from app.config import settings
+from app.utils.activity_logger import activity_writer
+from app.utils.activity_stream import (
+    STREAM_ORDER, Subscription, activity_broadcaster, event_id, stream_position, written_after,
+)
+from app.utils.activity_retention import activity_retention
+from app.utils.activity_stats import StatsWindow, load_activity_stats, stats_cache_key, stats_metric_key, window_end
+from app.utils.etag import check_etag
+from app.utils.response_cache import response_cache
+from app.utils.pagination import encode_cursor, keyset_after, NEXT_CURSOR_HEADER
+from app.utils.fast_json import FastJSONResponse, fast_json_response, dumps
 
 router = APIRouter()
 
@@ -24,29 +37,109 @@ class ActivityResponse(BaseModel):
     timestamp: datetime
 
 
-def activity_to_response(activity: ActivityLog) -> ActivityResponse:
-    """Convert ActivityLog document to response model"""
-    return ActivityResponse(
-        id=str(activity.id),
-        userId=str(activity.userId),
-        userName=activity.userName,
-        userRole=activity.userRole,
-        action=activity.action.value,
-        targetType=activity.targetType.value if activity.targetType else None,
-        targetId=str(activity.targetId) if activity.targetId else None,
-        targetName=activity.targetName,
-        details=activity.details,
-        timestamp=activity.timestamp
-    )
+class ActivityRollupResponse(BaseModel):
+    day: str
+    userId: str
+    userName: str
+    userRole: str
+    action: str
+    total: int
+    firstAt: Optional[datetime] = None
+    lastAt: Optional[datetime] = None
+
+
+class ActionCount(BaseModel):
+    action: str
+    count: int
+
+
+class UserCount(BaseModel):
+    userId: str
+    userName: str
+    count: int
+
+
+class TargetTypeCount(BaseModel):
+    targetType: Optional[str] = None
+    count: int
+
+
+class DayCount(BaseModel):
+    day: str
+    count: int
+
+
+class ActivityStatsResponse(BaseModel):
+    window: str
+    since: datetime
+    until: datetime
+    total: int
+    byAction: List[ActionCount]
+    byUser: List[UserCount]
+    byTargetType: List[TargetTypeCount]
+    byDay: List[DayCount]
+
+
+def activity_to_dict(doc: dict) -> dict:
+    """Convert a raw activity_logs document to the ActivityResponse shape"""
+    target_id = doc.get("targetId")
+    return {
+        "id": str(doc["_id"]),
+        "userId": str(doc["userId"]),
+        "userName": doc["userName"],
+        "userRole": doc["userRole"],
+        "action": doc["action"],
+        "targetType": doc.get("targetType"),
+        "targetId": str(target_id) if target_id else None,
+        "targetName": doc.get("targetName"),
+        "details": doc.get("details"),
+        "timestamp": doc["timestamp"],
+    }
+
+
+async def find_activities(
+    query: dict,
+    limit: int,
+    offset: int,
+    cursor: Optional[str],
+    response: Response
+) -> FastJSONResponse:
+    """
+    Run an activity query newest first, paginated by offset or by cursor.
+
+    With a cursor the page starts right after the (timestamp, _id) it encodes,
+    so deep pages cost the same as the first one. The cursor for the following
+    page, if any, is returned in the X-Next-Cursor header. Documents are read
+    raw and encoded with orjson, skipping model validation.
+    """
+    if cursor:
+        try:
+            query = {**query, **keyset_after("timestamp", cursor)}
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        offset = 0
+    
+    activities = await ActivityLog.get_motor_collection().find(query).sort(
+        [("timestamp", -1), ("_id", -1)]
+    ).skip(offset).limit(limit + 1).to_list(length=limit + 1)
+    
+    if len(activities) > limit:
+        activities = activities[:limit]
+        last = activities[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last["timestamp"], last["_id"])
+    
+    return fast_json_response([activity_to_dict(a) for a in activities], response)
 
 
 # GET /api/activities - List all activities (Manager only, paginated)
 @router.get("/", response_model=List[ActivityResponse])
 async def list_activities(
+    response: Response,
     user_id: Optional[str] = Query(None, alias="userId", description="Filter by user ID"),
     action: Optional[str] = Query(None, description="Filter by action type"),
     limit: int = Query(50, ge=1, le=100, description="Number of results to return"),
     offset: int = Query(0, ge=0, description="Number of results to skip"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor; overrides offset"),
     current_user: User = Depends(require_role([UserRole.MANAGER]))
 ):
     """List all activities with optional filters. Manager only."""
@@ -67,17 +160,17 @@ async def list_activities(
         except ValueError:
             raise HTTPException(status_code=400, detail=f"Invalid action type: {action}")
     
-    activities = await ActivityLog.find(query).sort("-timestamp").skip(offset).limit(limit).to_list()
-    
-    return [activity_to_response(a) for a in activities]
+    return await find_activities(query, limit, offset, cursor, response)
 
 
 # GET /api/activities/user/:userId - Get activities for specific user (Manager only)
 @router.get("/user/{user_id}", response_model=List[ActivityResponse])
 async def get_user_activities(
     user_id: str,
+    response: Response,
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None),
     current_user: User = Depends(require_role([UserRole.MANAGER]))
 ):
     """Get activities for a specific user. Manager only."""
@@ -87,24 +180,239 @@ async def get_user_activities(
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid user ID format")
     
-    activities = await ActivityLog.find(
-        {"userId": uid}
-    ).sort("-timestamp").skip(offset).limit(limit).to_list()
-    
-    return [activity_to_response(a) for a in activities]
+    return await find_activities({"userId": uid}, limit, offset, cursor, response)
 
 
 # GET /api/activities/me - Get current user's activities
 @router.get("/me", response_model=List[ActivityResponse])
 async def get_my_activities(
+    response: Response,
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None),
     current_user: User = Depends(get_current_user)
 ):
     """Get current user's own activity history."""
     
-    activities = await ActivityLog.find(
-        {"userId": current_user.id}
-    ).sort("-timestamp").skip(offset).limit(limit).to_list()
+    return await find_activities({"userId": current_user.id}, limit, offset, cursor, response)
+
+
+# GET /api/activities/stats - Activity counts over a rolling window (Manager only)
+@router.get("/stats", response_model=ActivityStatsResponse)
+async def get_activity_stats(
+    request: Request,
+    response: Response,
+    window: StatsWindow = Query(StatsWindow.WEEK, description="Rolling window ending now"),
+    current_user: User = Depends(require_role([UserRole.MANAGER]))
+):
+    """
+    Counts by action, user, target type and UTC day for the window. Manager only.
+
+    Windows end on the latest multiple of ACTIVITY_STATS_BUCKET_SECONDS. Each
+    is computed with one aggregation and cached for the rest of that bucket,
+    so dashboards can poll it cheaply; within a bucket, If-None-Match is
+    answered with 304. Logs flushed late into a bucket that is already
+    cached replace its result.
+    """
+    until = window_end()
+    not_modified = check_etag(request, response, ActivityLog, variant=f"{window.value}-{until:%Y%m%dT%H%M%S}")
+    if not_modified:
+        return not_modified
+    return await response_cache.get_or_load(
+        stats_cache_key(window, until),
+        lambda: load_activity_stats(window, until),
+        ttl=settings.ACTIVITY_STATS_BUCKET_SECONDS,
+        metric_key=stats_metric_key(window),
+    )
+
+
+# GET /api/activities/daily - Per-day activity counts, kept after raw logs expire (Manager only)
+@router.get("/daily", response_model=List[ActivityRollupResponse])
+async def list_daily_activity(
+    user_id: Optional[str] = Query(None, alias="userId", description="Filter by user ID"),
+    action: Optional[str] = Query(None, description="Filter by action type"),
+    from_day: Optional[date] = Query(None, alias="from", description="First day (UTC), inclusive"),
+    to_day: Optional[date] = Query(None, alias="to", description="Last day (UTC), inclusive"),
+    limit: int = Query(500, ge=1, le=5000),
+    current_user: User = Depends(require_role([UserRole.MANAGER]))
+):
+    """
+    Daily per-user, per-action counts from the rollup job, newest day first.
+
+    Days are summarised once they end, so today is not included; use the raw
+    endpoints for recent activity. Manager only.
+    """
+    query = {}
     
-    return [activity_to_response(a) for a in activities]
+    if user_id:
+        try:
+            query["userId"] = PydanticObjectId(user_id)
+        except Exception:
+            raise HTTPException(status_code=400, detail="Invalid user ID format")
+    
+    if action:
+        try:
+            ActionType(action)
+            query["action"] = action
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid action type: {action}")
+    
+    if from_day or to_day:
+        query["day"] = {}
+        if from_day:
+            query["day"]["$gte"] = from_day.isoformat()
+        if to_day:
+            query["day"]["$lte"] = to_day.isoformat()
+    
+    rollups = await ActivityDailyRollup.get_motor_collection().find(query).sort(
+        [("day", -1), ("userId", 1), ("action", 1)]
+    ).limit(limit).to_list(length=limit)
+    
+    return FastJSONResponse([{
+        "day": r["day"],
+        "userId": str(r["userId"]),
+        "userName": r["userName"],
+        "userRole": r["userRole"],
+        "action": r["action"],
+        "total": r["total"],
+        "firstAt": r.get("firstAt"),
+        "lastAt": r.get("lastAt"),
+    } for r in rollups])
+
+
+def format_event(doc: dict) -> str:
+    """One SSE message; its ID is the Last-Event-ID to resume from"""
+    return f"id: {event_id(doc)}\nevent: activity\ndata: {dumps(activity_to_dict(doc)).decode()}\n\n"
+
+
+def format_reset(newest: Optional[dict]) -> str:
+    """
+    Tells the client that more was missed than the stream replays, so it
+    should reload the feed; resuming continues after `newest`.
+    """
+    data = dumps({"reason": "replay_limit", "limit": settings.ACTIVITY_STREAM_REPLAY_LIMIT}).decode()
+    id_line = f"id: {event_id(newest)}\n" if newest else ""
+    return f"{id_line}event: reset\ndata: {data}\n\n"
+
+
+async def event_stream(
+    subscription: Subscription,
+    backfill: List[dict],
+    reset_after: Optional[dict] = None
+) -> AsyncIterator[str]:
+    try:
+        yield "retry: 3000\n\n"
+        sent = set()
+        skip_until = None
+        if reset_after is not None:
+            yield format_reset(reset_after)
+            skip_until = stream_position(reset_after)
+        for doc in backfill:
+            sent.add(doc["_id"])
+            yield format_event(doc)
+        while True:
+            try:
+                doc = await asyncio.wait_for(
+                    subscription.queue.get(), timeout=settings.ACTIVITY_STREAM_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if doc["_id"] not in sent and (skip_until is None or stream_position(doc) > skip_until):
+                yield format_event(doc)
+            if subscription.lagged and subscription.queue.empty():
+                # Events were dropped; end the stream so the client reconnects
+                # with Last-Event-ID and picks them up from the backfill
+                return
+    finally:
+        activity_broadcaster.unsubscribe(subscription)
+
+
+# GET /api/activities/stream - Live activity feed over Server-Sent Events
+@router.get("/stream")
+async def stream_activities(
+    user_id: Optional[str] = Query(None, alias="userId", description="Filter by user ID (managers only)"),
+    action: Optional[str] = Query(None, description="Filter by action type"),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    New activity logs as they are written, as `text/event-stream`.
+
+    Managers see everyone's activity and may filter by user; other roles only
+    receive their own, as with /me. Reconnecting with the Last-Event-ID header
+    first replays what was written since, in write order. When that is more
+    than ACTIVITY_STREAM_REPLAY_LIMIT entries nothing is replayed; a `reset`
+    event tells the client to reload the feed instead.
+    """
+    if current_user.role == UserRole.MANAGER:
+        if user_id:
+            try:
+                uid = PydanticObjectId(user_id)
+            except Exception:
+                raise HTTPException(status_code=400, detail="Invalid user ID format")
+        else:
+            uid = None
+    else:
+        if user_id and user_id != str(current_user.id):
+            raise HTTPException(status_code=403, detail="Insufficient permissions")
+        uid = current_user.id
+    
+    if action:
+        try:
+            ActionType(action)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid action type: {action}")
+    
+    query = {}
+    if uid is not None:
+        query["userId"] = uid
+    if action:
+        query["action"] = action
+    
+    # Subscribe before reading the backfill so nothing falls in between;
+    # duplicates are skipped by the stream
+    subscription = activity_broadcaster.subscribe(uid, action)
+    backfill = []
+    reset_after = None
+    if last_event_id:
+        try:
+            after = written_after(last_event_id)
+        except ValueError:
+            activity_broadcaster.unsubscribe(subscription)
+            raise HTTPException(status_code=400, detail="Invalid Last-Event-ID")
+        limit = settings.ACTIVITY_STREAM_REPLAY_LIMIT
+        collection = ActivityLog.get_motor_collection()
+        try:
+            backfill = await collection.find({**query, **after}).sort(STREAM_ORDER).limit(
+                limit + 1
+            ).to_list(length=limit + 1)
+            if len(backfill) > limit:
+                # Replaying only part would leave a hole; have the client reload
+                backfill = []
+                newest = await collection.find(query).sort(
+                    [(field, -1) for field, _ in STREAM_ORDER]
+                ).limit(1).to_list(length=1)
+                reset_after = newest[0] if newest else None
+        except Exception:
+            activity_broadcaster.unsubscribe(subscription)
+            raise
+    
+    return StreamingResponse(
+        event_stream(subscription, backfill, reset_after),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# GET /api/activities/queue/stats - Write-behind queue metrics (Manager only)
+@router.get("/queue/stats")
+async def get_activity_queue_stats(
+    current_user: User = Depends(require_role([UserRole.MANAGER]))
+):
+    """Queue depth and flush latency of the activity write-behind pipeline, plus stream and retention stats. Manager only."""
+    return {
+        **activity_writer.stats(),
+        "stream": activity_broadcaster.stats(),
+        "retention": activity_retention.stats(),
+    }
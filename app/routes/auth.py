@@ -1,8 +1,10 @@
 from fastapi import APIRouter, HTTPException, Response, Request
 from pydantic import BaseModel, EmailStr
 from app.models.user import User
-from app.models.activity import ActivityLog, ActionType
-from app.utils.security import verify_password, create_access_token, decode_access_token
+from app.models.activity import ActionType
+from app.utils.activity_logger import log_activity
+from app.utils.security import verify_password_async, create_access_token, decode_access_token
+from app.auth import get_user_by_id
 
 router = APIRouter()
 
@@ -24,7 +26,7 @@ async def login(request: LoginRequest, response: Response):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     # Verify password
-    if not verify_password(request.password, user.password_hash):
+    if not await verify_password_async(request.password, user.password_hash):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     # Create JWT token
@@ -41,13 +43,7 @@ async def login(request: LoginRequest, response: Response):
     )
     
     # Log LOGIN activity
-    activity = ActivityLog(
-        userId=user.id,
-        userName=user.name,
-        userRole=user.role.value,
-        action=ActionType.LOGIN
-    )
-    await activity.insert()
+    await log_activity(user=user, action=ActionType.LOGIN)
     
     return {"message": "Login successful", "user": UserResponse(
         id=str(user.id),
@@ -64,16 +60,10 @@ async def logout(response: Response, req: Request):
         payload = decode_access_token(token)
         if payload:
             user_id = payload.get("sub")
-            user = await User.get(user_id)
+            user = await get_user_by_id(user_id)
             if user:
                 # Log LOGOUT activity
-                activity = ActivityLog(
-                    userId=user.id,
-                    userName=user.name,
-                    userRole=user.role.value,
-                    action=ActionType.LOGOUT
-                )
-                await activity.insert()
+                await log_activity(user=user, action=ActionType.LOGOUT)
     
     response.delete_cookie(key="auth-token")
     return {"message": "Logged out successfully"}
@@ -89,7 +79,7 @@ async def get_current_user(request: Request):
         raise HTTPException(status_code=401, detail="Invalid or expired token")
     
     user_id = payload.get("sub")
-    user = await User.get(user_id)
+    user = await get_user_by_id(user_id)
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
     
@@ -1,34 +1,77 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from typing import List, Optional
+from pydantic import BaseModel
 from beanie import PydanticObjectId
-from app.models.dashboard import KPI, PipelineItem, ChartData, ChartDataPoint
+from app.models.dashboard import KPI, PipelineItem, PipelineType, PipelinePriority, ChartDataPoint, DashboardCounters
+from app.models.task import TaskDailyRollup
+from app.models.user import User, UserRole
+from app.auth import require_role
+from app.utils.etag import check_etag, bump_version
+from app.utils.response_cache import response_cache
+from app.utils.counters import KPI_CACHE_KEY, get_counters, counters_to_kpis
+from app.utils.task_rollups import BURNUP_CACHE_KEY, VELOCITY_CACHE_KEY, load_burnup, load_velocity
+from app.utils.partial_update import update_with_revision, reject_null
 
 router = APIRouter()
 
+PIPELINE_CACHE_KEY = "dashboard:pipeline"
+
+
+class UpdatePipelineItemRequest(BaseModel):
+    """Request model for partially updating a pipeline item"""
+    title: Optional[str] = None
+    type: Optional[PipelineType] = None
+    priority: Optional[PipelinePriority] = None
+    estEffort: Optional[str] = None
+    requester: Optional[str] = None
+    dateAdded: Optional[str] = None
+    revision: Optional[int] = None  # If set, reject with 409 unless it matches
+
+    _required = reject_null("title", "type")
+
+
+async def load_kpis() -> List[KPI]:
+    return counters_to_kpis(await get_counters())
+
+
+async def warm_cache():
+    """Prime the dashboard response cache so the first page load is a hit."""
+    await response_cache.get_or_load(KPI_CACHE_KEY, load_kpis)
+    await response_cache.get_or_load(PIPELINE_CACHE_KEY, lambda: PipelineItem.find_all().to_list())
+    await response_cache.get_or_load(BURNUP_CACHE_KEY, load_burnup)
+    await response_cache.get_or_load(VELOCITY_CACHE_KEY, load_velocity)
+
 @router.get("/dashboard/kpi", response_model=List[KPI])
-async def get_kpis():
-    return await KPI.find_all().to_list()
+async def get_kpis(request: Request, response: Response):
+    not_modified = check_etag(request, response, DashboardCounters)
+    if not_modified:
+        return not_modified
+    return await response_cache.get_or_load(KPI_CACHE_KEY, load_kpis)
 
 @router.get("/pipeline", response_model=List[PipelineItem])
-async def get_pipeline():
-    return await PipelineItem.find_all().to_list()
+async def get_pipeline(request: Request, response: Response):
+    not_modified = check_etag(request, response, PipelineItem)
+    if not_modified:
+        return not_modified
+    return await response_cache.get_or_load(PIPELINE_CACHE_KEY, lambda: PipelineItem.find_all().to_list())
 
 @router.post("/pipeline", response_model=PipelineItem)
 async def create_pipeline_item(item: PipelineItem):
     await item.insert()
+    bump_version(PipelineItem)
+    await response_cache.invalidate(PIPELINE_CACHE_KEY)
     return item
 
 @router.patch("/pipeline/{id}", response_model=PipelineItem)
-async def update_pipeline_item(id: PydanticObjectId, item_data: PipelineItem):
-    item = await PipelineItem.get(id)
-    if not item:
-        raise HTTPException(status_code=404, detail="Pipeline Item not found")
-        
-    item_dict = item_data.dict(exclude_unset=True, exclude={"id"})
-    for key, value in item_dict.items():
-        setattr(item, key, value)
-        
-    await item.save()
+async def update_pipeline_item(id: PydanticObjectId, item_data: UpdatePipelineItemRequest):
+    _, item = await update_with_revision(
+        PipelineItem, id,
+        item_data.dict(exclude_unset=True, exclude={"revision"}),
+        expected_revision=item_data.revision,
+        not_found="Pipeline Item not found"
+    )
+    bump_version(PipelineItem)
+    await response_cache.invalidate(PIPELINE_CACHE_KEY)
     return item
 
 @router.delete("/pipeline/{id}")
@@ -37,18 +80,24 @@ async def delete_pipeline_item(id: PydanticObjectId):
     if not item:
         raise HTTPException(status_code=404, detail="Pipeline Item not found")
     await item.delete()
+    bump_version(PipelineItem)
+    await response_cache.invalidate(PIPELINE_CACHE_KEY)
     return {"message": "Pipeline Item deleted"}
 
 @router.get("/dashboard/charts/burnup", response_model=List[ChartDataPoint])
-async def get_burnup_chart():
-    chart = await ChartData.find_one(ChartData.chart_type == "burnup")
-    if chart:
-        return chart.data_points
-    return []
+async def get_burnup_chart(request: Request, response: Response):
+    not_modified = check_etag(request, response, TaskDailyRollup, variant="burnup")
+    if not_modified:
+        return not_modified
+    return await response_cache.get_or_load(BURNUP_CACHE_KEY, load_burnup)
 
 @router.get("/dashboard/charts/velocity", response_model=List[ChartDataPoint])
-async def get_velocity_chart():
-    chart = await ChartData.find_one(ChartData.chart_type == "velocity")
-    if chart:
-        return chart.data_points
-    return []
+async def get_velocity_chart(request: Request, response: Response):
+    not_modified = check_etag(request, response, TaskDailyRollup, variant="velocity")
+    if not_modified:
+        return not_modified
+    return await response_cache.get_or_load(VELOCITY_CACHE_KEY, load_velocity)
+
+@router.get("/dashboard/cache/stats")
+async def get_dashboard_cache_stats(current_user: User = Depends(require_role([UserRole.MANAGER]))):
+    return response_cache.stats()
@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, Query
+
+from app.models.user import User, UserRole
+from app.auth import require_role
+from app.utils.slow_queries import slow_command_log
+
+router = APIRouter()
+
+
+# GET /debug/slow-queries - Recent slow Mongo commands with their plans (Manager only)
+@router.get("/slow-queries")
+async def list_slow_queries(
+    limit: int = Query(50, ge=1, le=500, description="Number of entries to return, newest first"),
+    current_user: User = Depends(require_role([UserRole.MANAGER]))
+):
+    """
+    Mongo commands that exceeded SLOW_QUERY_THRESHOLD_MS.
+
+    `plan` is filled in shortly after the entry is recorded, once the
+    background `explain` finishes; `plan.collectionScan` flags unindexed queries.
+    """
+    return {"stats": slow_command_log.stats(), "entries": slow_command_log.entries(limit)}
+
+
+# DELETE /debug/slow-queries - Clear the slow command log (Manager only)
+@router.delete("/slow-queries")
+async def clear_slow_queries(
+    current_user: User = Depends(require_role([UserRole.MANAGER]))
+):
+    slow_command_log.clear()
+    return {"message": "Slow query log cleared"}
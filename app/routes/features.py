@@ -1,17 +1,57 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List, Optional
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field, field_validator
 from beanie import PydanticObjectId
 from datetime import datetime, date
+from pymongo import ReturnDocument, UpdateOne
 
-from app.models.feature import Feature, FeatureStatusEnum, HistoryEntry, LastUpdatedBy
+from app.models.feature import Feature, FeatureSummary, FeatureWithHistory, FeatureStatusEnum, LastUpdatedBy
 from app.models.activity import ActionType, TargetType
 from app.models.user import User
+from app.models.bulk import BulkItemResult, BulkItemStatus, BulkUpdateResponse
 from app.auth import get_current_user
-from app.utils.activity_logger import log_activity
+from app.config import settings
+from app.utils.activity_logger import log_activity, build_activity, log_activities
+from app.utils.etag import check_etag, bump_version
+from app.utils.counters import apply_status_change, apply_status_changes, known_status
+from app.utils.partial_update import gather_bounded, parse_bulk_ids, reject_null
+from app.utils.fast_json import fast_json_response, projection_of
+from app.utils.feature_history import (
+    HISTORY_DAYS, HISTORY_PROJECTION, History, convert_legacy_history, encode_history, feature_to_dict,
+    history_guard, history_set_fields, is_legacy, record_status, stored_history, uptime_summary,
+)
 
 router = APIRouter()
 
+FEATURE_UPDATE_ATTEMPTS = 5
+
+
+class HistoryEntryRequest(BaseModel):
+    """History entry as accepted on create"""
+    date: date
+    status: FeatureStatusEnum
+
+
+class CreateFeatureRequest(BaseModel):
+    """Request model for creating a feature"""
+    name: str
+    status: FeatureStatusEnum
+    publicNote: str
+    linkedTicket: Optional[str] = None
+    history: List[HistoryEntryRequest] = []
+    lastUpdatedBy: Optional[LastUpdatedBy] = None
+
+    @field_validator("history")
+    def check_history_window(cls, entries):
+        # Only the last HISTORY_DAYS days are stored; refuse rather than drop
+        today = date.today()
+        for entry in entries:
+            if entry.date > today:
+                raise ValueError("history dates cannot be in the future")
+            if (today - entry.date).days >= HISTORY_DAYS:
+                raise ValueError(f"history only covers the last {HISTORY_DAYS} days")
+        return entries
+
 
 class UpdateFeatureRequest(BaseModel):
     """Request model for updating a feature"""
@@ -19,71 +59,174 @@ class UpdateFeatureRequest(BaseModel):
     publicNote: Optional[str] = None
     linkedTicket: Optional[str] = None
 
+    _required = reject_null("status", "publicNote")
+
+
+class BulkFeatureUpdateItem(UpdateFeatureRequest):
+    id: str
+
+
+class BulkFeatureUpdateRequest(BaseModel):
+    items: List[BulkFeatureUpdateItem] = Field(..., min_length=1, max_length=settings.BULK_MAX_ITEMS)
+
+
+class UptimeWindow(BaseModel):
+    uptime: Optional[float] = None  # % of days operational; None without data
+    degraded: Optional[float] = None
+    critical: Optional[float] = None
+    daysWithData: int
+
+
+class FeatureUptime(BaseModel):
+    id: str
+    name: str
+    status: FeatureStatusEnum
+    windows: Dict[str, UptimeWindow]
 
-@router.get("/features", response_model=List[Feature])
-async def get_features():
-    return await Feature.find_all().to_list()
 
+class UptimeResponse(BaseModel):
+    asOf: str
+    features: List[FeatureUptime]
 
-@router.post("/features", response_model=Feature)
-async def create_feature(feature: Feature):
+
+@router.get("/features", response_model=List[FeatureWithHistory], response_model_exclude_unset=True)
+async def get_features(
+    request: Request,
+    response: Response,
+    include: Optional[str] = Query(None, description="Comma-separated heavy fields to include: history")
+):
+    includes = {i.strip() for i in include.split(",")} if include else set()
+    projection = FeatureWithHistory if "history" in includes else FeatureSummary
+    not_modified = check_etag(request, response, Feature, variant=projection.__name__)
+    if not_modified:
+        return not_modified
+    # Raw documents projected to the response fields; omitted fields stay
+    # omitted, as with response_model_exclude_unset
+    if projection is FeatureWithHistory:
+        features = await Feature.get_motor_collection().find(
+            {}, {**projection_of(FeatureSummary), **HISTORY_PROJECTION}
+        ).to_list(length=None)
+        features = [feature_to_dict(doc) for doc in features]
+    else:
+        features = await Feature.get_motor_collection().find({}, projection_of(projection)).to_list(length=None)
+    return fast_json_response(features, response)
+
+
+@router.get("/features/uptime", response_model=UptimeResponse)
+async def get_feature_uptime(request: Request, response: Response):
+    """
+    Percentage of days each feature was operational, degraded or critical over
+    the last 7, 30 and 60 days, computed for all features in one NumPy pass.
+
+    A status counts until the next recorded change; days before a feature's
+    first recorded status are left out (see `daysWithData`).
+    """
+    not_modified = check_etag(request, response, Feature, variant="uptime")
+    if not_modified:
+        return not_modified
+    features = await Feature.get_motor_collection().find(
+        {}, {"name": 1, "status": 1, **HISTORY_PROJECTION}
+    ).to_list(length=None)
+    today = date.today()
+    return fast_json_response({"asOf": today.isoformat(), "features": uptime_summary(features, today)}, response)
+
+
+@router.post("/features", response_model=FeatureWithHistory)
+async def create_feature(feature_data: CreateFeatureRequest):
+    history_start, history_codes = encode_history(feature_data.history)
+    feature = Feature(
+        **feature_data.model_dump(exclude={"history"}),
+        historyStart=history_start,
+        historyCodes=history_codes,
+    )
     await feature.insert()
-    return feature
+    bump_version(Feature)
+    await apply_status_change("features", None, feature.status)
+    return feature_to_dict(feature.model_dump(by_alias=True))
+
+
+def feature_update_pipeline(
+    feature_data: UpdateFeatureRequest,
+    current_user: User,
+    history: Optional[History] = None
+) -> List[dict]:
+    """
+    Aggregation-pipeline update applying a PATCH in one atomic write.
 
+    Sets the provided fields and the audit trail (recording the status the
+    document had before this write). When the status is provided, `history`
+    is the packed history with today's code already recorded (see
+    `record_status`); it replaces the stored one.
+    """
+    updates = {
+        field: {"$literal": value.value if isinstance(value, FeatureStatusEnum) else value}
+        for field, value in feature_data.dict(exclude_none=True, exclude={"id"}).items()
+    }
+    updates["lastUpdatedBy"] = {
+        "userId": {"$literal": current_user.id},
+        "userName": {"$literal": current_user.name},
+        "updatedAt": {"$literal": datetime.utcnow()},
+        "previousStatus": "$status",
+    }
+    if history is not None:
+        updates.update({field: {"$literal": value} for field, value in history_set_fields(history).items()})
+    return [{"$set": updates}]
+
+
+async def apply_feature_update(
+    id: PydanticObjectId,
+    feature_data: UpdateFeatureRequest,
+    current_user: User
+) -> Optional[dict]:
+    """
+    Apply a PATCH and return the updated raw document, or None if there is no
+    such feature. The status before the write is in `lastUpdatedBy.previousStatus`.
 
-@router.patch("/features/{id}", response_model=Feature)
+    A status change writes the history read just before with today's code
+    recorded. The write matches as long as only other writes from today got
+    in between (see `history_guard`); otherwise, e.g. at midnight, it is
+    recomputed and retried. Legacy history lists are packed first.
+    """
+    collection = Feature.get_motor_collection()
+    for _ in range(FEATURE_UPDATE_ATTEMPTS):
+        query = {"_id": id}
+        history = None
+        if feature_data.status is not None:
+            doc = await collection.find_one({"_id": id}, HISTORY_PROJECTION)
+            if doc is None:
+                return None
+            if is_legacy(doc):
+                await convert_legacy_history(doc)
+                continue
+            today = date.today()
+            history = record_status(stored_history(doc), feature_data.status, today)
+            query.update(history_guard(doc, today))
+        
+        # Update and read back the new document atomically
+        updated = await collection.find_one_and_update(
+            query,
+            feature_update_pipeline(feature_data, current_user, history),
+            return_document=ReturnDocument.AFTER,
+        )
+        if updated is not None or history is None:
+            return updated
+    raise HTTPException(status_code=409, detail="Feature was modified by other requests; try again")
+
+
+@router.patch("/features/{id}", response_model=FeatureWithHistory)
 async def update_feature(
     id: PydanticObjectId, 
     feature_data: UpdateFeatureRequest,
     current_user: User = Depends(get_current_user)
 ):
-    feature = await Feature.get(id)
-    if not feature:
+    doc = await apply_feature_update(id, feature_data, current_user)
+    if not doc:
         raise HTTPException(status_code=404, detail="Feature not found")
     
-    old_status = feature.status
-    
-    # Update fields if provided
-    if feature_data.status is not None:
-        feature.status = feature_data.status
-    if feature_data.publicNote is not None:
-        feature.publicNote = feature_data.publicNote
-    if feature_data.linkedTicket is not None:
-        feature.linkedTicket = feature_data.linkedTicket
-    
-    # Update lastUpdatedBy
-    feature.lastUpdatedBy = LastUpdatedBy(
-        userId=current_user.id,
-        userName=current_user.name,
-        updatedAt=datetime.utcnow()
-    )
-    
-    # Upsert today's history entry (if status changed)
-    if feature_data.status is not None:
-        today_str = date.today().isoformat()  # YYYY-MM-DD
-        
-        # Check if today's entry exists
-        existing_entry_idx = None
-        for i, entry in enumerate(feature.history):
-            if entry.date == today_str:
-                existing_entry_idx = i
-                break
-        
-        if existing_entry_idx is not None:
-            # Update existing entry
-            feature.history[existing_entry_idx].status = feature.status.value
-        else:
-            # Add new entry
-            feature.history.append(HistoryEntry(
-                date=today_str,
-                status=feature.status.value
-            ))
-        
-        # Retain max 60 entries (trim oldest if needed)
-        if len(feature.history) > 60:
-            feature.history = feature.history[-60:]
-    
-    await feature.save()
+    feature = Feature.model_validate(doc)
+    old_status = feature.lastUpdatedBy.previousStatus
+    bump_version(Feature)
+    await apply_status_change("features", old_status, feature.status)
     
     # Log activity if status changed
     if feature_data.status is not None and old_status != feature.status:
@@ -96,14 +239,105 @@ async def update_feature(
             details={"oldStatus": old_status.value, "newStatus": feature.status.value}
         )
     
-    return feature
+    return feature_to_dict(doc)
+
+
+@router.post("/features/bulk", response_model=BulkUpdateResponse)
+async def bulk_update_features(
+    data: BulkFeatureUpdateRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Apply many feature PATCHes with one activity insert_many.
+
+    Items that leave the status alone share one bulk_write. Status changes
+    each go through the same atomic update as PATCH, at most
+    BULK_WRITE_CONCURRENCY at a time: the returned document says whether the
+    feature still existed and which status the write replaced, so the
+    counters and activity logs follow what was actually written rather than
+    an earlier read. An item whose update keeps losing races is reported as
+    a conflict; if an item fails outright, the writes that did land are
+    still accounted for before the error is raised.
+    """
+    ids, failures = parse_bulk_ids([item.id for item in data.items])
+    
+    status_items = []
+    other_items = []
+    for index, (item, oid) in enumerate(zip(data.items, ids)):
+        if index in failures:
+            continue
+        (status_items if item.status is not None else other_items).append((index, item, oid))
+    
+    written = await gather_bounded(
+        [apply_feature_update(oid, item, current_user) for _, item, oid in status_items],
+        settings.BULK_WRITE_CONCURRENCY,
+    )
+    
+    error = None
+    transitions = []
+    activities = []
+    for (index, item, oid), doc in zip(status_items, written):
+        if isinstance(doc, HTTPException) and doc.status_code == 409:
+            failures[index] = BulkItemStatus.CONFLICT
+            continue
+        if isinstance(doc, Exception):
+            error = error or doc
+            continue
+        if doc is None:
+            failures[index] = BulkItemStatus.NOT_FOUND
+            continue
+        old_status = FeatureStatusEnum(doc["lastUpdatedBy"]["previousStatus"])
+        if old_status == item.status:
+            continue
+        transitions.append((old_status, item.status))
+        activities.append(build_activity(
+            user=current_user,
+            action=ActionType.FEATURE_STATUS_UPDATE,
+            target_type=TargetType.FEATURE,
+            target_id=oid,
+            target_name=doc["name"],
+            details={"oldStatus": old_status.value, "newStatus": item.status.value}
+        ))
+    
+    collection = Feature.get_motor_collection()
+    try:
+        if other_items and error is None:
+            result = await collection.bulk_write([
+                UpdateOne({"_id": oid}, feature_update_pipeline(item, current_user))
+                for _, item, oid in other_items
+            ], ordered=False)
+            if result.matched_count < len(other_items):
+                existing = {
+                    doc["_id"]
+                    for doc in await collection.find(
+                        {"_id": {"$in": [oid for _, _, oid in other_items]}}, {"_id": 1}
+                    ).to_list(length=None)
+                }
+                for index, _, oid in other_items:
+                    if oid not in existing:
+                        failures[index] = BulkItemStatus.NOT_FOUND
+    finally:
+        if status_items or other_items:
+            bump_version(Feature)
+        await apply_status_changes("features", transitions)
+        await log_activities(activities)
+    if error is not None:
+        raise error
+    
+    results = [
+        BulkItemResult(id=item.id, result=failures.get(index, BulkItemStatus.UPDATED))
+        for index, item in enumerate(data.items)
+    ]
+    updated = sum(1 for r in results if r.result == BulkItemStatus.UPDATED)
+    return BulkUpdateResponse(updated=updated, results=results)
 
 
 @router.delete("/features/{id}")
 async def delete_feature(id: PydanticObjectId):
-    feature = await Feature.get(id)
+    # The status of the feature as deleted, for the counters
+    feature = await Feature.get_motor_collection().find_one_and_delete({"_id": id}, projection={"status": 1})
     if not feature:
         raise HTTPException(status_code=404, detail="Feature not found")
-    await feature.delete()
+    bump_version(Feature)
+    await apply_status_change("features", known_status(FeatureStatusEnum, feature.get("status")), None)
     return {"message": "Feature deleted"}
-
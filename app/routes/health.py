@@ -0,0 +1,29 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+import time
+
+from app.database import get_database, pool_stats
+from app.utils.startup import startup_timings, pending_background_steps
+
+router = APIRouter()
+
+
+@router.get("/ready")
+async def readiness():
+    """Readiness probe: Mongo ping latency and connection pool usage."""
+    started = time.perf_counter()
+    try:
+        await get_database().command("ping")
+    except Exception as exc:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "unavailable", "error": type(exc).__name__, "pool": pool_stats.stats()},
+        )
+    ping_ms = (time.perf_counter() - started) * 1000
+    return {"status": "ready", "pingMs": round(ping_ms, 3), "pool": pool_stats.stats()}
+
+
+@router.get("/startup")
+async def startup_report():
+    """Import/init timings and any startup work still running in the background."""
+    return {"timings": startup_timings, "pending": pending_background_steps()}
@@ -0,0 +1,76 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from typing import Dict, List
+
+from app.auth import user_cache
+from app.database import pool_stats
+from app.utils.activity_logger import activity_writer
+from app.utils.activity_retention import activity_retention
+from app.utils.cache import TTLCache
+from app.utils.metrics import request_metrics, command_metrics, format_metric
+from app.utils.response_cache import response_cache
+from app.utils.security import password_pool_stats, token_cache
+
+router = APIRouter()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _cache_lines(caches: Dict[str, TTLCache]) -> List[str]:
+    stats = {name: cache.stats() for name, cache in caches.items()}
+    lines = []
+    for field, metric, kind in (
+        ("size", "cache_entries", "gauge"),
+        ("hits", "cache_hits_total", "counter"),
+        ("misses", "cache_misses_total", "counter"),
+        ("evictions", "cache_evictions_total", "counter"),
+    ):
+        lines += format_metric(metric, kind, f"In-process cache {field}",
+                               {(("cache", name),): s[field] for name, s in stats.items()})
+    return lines
+
+
+def _runtime_lines() -> List[str]:
+    pool = pool_stats.stats()
+    writer = activity_writer.stats()
+    retention = activity_retention.stats()
+    hashing = password_pool_stats()
+    responses = response_cache.stats()
+    return (
+        format_metric("mongo_pool_connections", "gauge", "Open Mongo connections",
+                      {(): pool["openConnections"]})
+        + format_metric("mongo_pool_checked_out", "gauge", "Mongo connections in use",
+                        {(): pool["checkedOut"]})
+        + format_metric("mongo_pool_checkout_failures_total", "counter", "Failed connection checkouts",
+                        {(): pool["checkoutFailures"]})
+        + format_metric("activity_queue_depth", "gauge", "Activity logs waiting to be written",
+                        {(): writer["queueDepth"]})
+        + format_metric("activity_flushed_total", "counter", "Activity logs written by the flusher",
+                        {(): writer["flushed"]})
+        + format_metric("activity_overflows_total", "counter", "Activity logs written inline on a full queue",
+                        {(): writer["overflows"]})
+        + format_metric("activity_failed_total", "counter", "Activity logs that failed to write",
+                        {(): writer["failed"]})
+        + format_metric("activity_rollup_runs_total", "counter", "Completed activity rollup runs",
+                        {(): retention["runs"]})
+        + format_metric("activity_rollup_failures_total", "counter", "Failed activity rollup runs",
+                        {(): retention["failures"]})
+        + format_metric("activity_rollup_last_run_ms", "gauge", "Duration of the last activity rollup",
+                        {(): retention["lastRunMs"]})
+        + format_metric("password_hash_in_flight", "gauge", "bcrypt calls running or queued",
+                        {(): hashing["inFlight"]})
+        + format_metric("password_hash_queue_depth", "gauge", "bcrypt calls waiting for a hashing worker",
+                        {(): hashing["queueDepth"]})
+        + _cache_lines({"users": user_cache, "tokens": token_cache})
+        + format_metric("response_cache_hits_total", "counter", "Response cache hits by key",
+                        {(("key", key),): s["hits"] for key, s in responses.items()})
+        + format_metric("response_cache_misses_total", "counter", "Response cache misses by key",
+                        {(("key", key),): s["misses"] for key, s in responses.items()})
+    )
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Request, Mongo command and runtime metrics in Prometheus text format."""
+    lines = request_metrics.render() + command_metrics.render() + _runtime_lines()
+    return PlainTextResponse("\n".join(lines) + "\n", media_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,15 +1,19 @@
-from fastapi import APIRouter, HTTPException, Depends, Query, Request
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from typing import List, Optional, Union
 from pydantic import BaseModel, Field
 from datetime import datetime
 from beanie import PydanticObjectId
+from pymongo import ReturnDocument
 
-from app.models.report import IncidentReport, Reporter, AdminNote, ImpactLevel, ReportStatus
+from app.models.report import IncidentReport, ReportSummary, ReportWithNotes, Reporter, AdminNote, ImpactLevel, ReportStatus
 from app.models.user import User, UserRole
 from app.models.activity import ActionType, TargetType
 from app.auth import get_current_user, require_role
 from app.utils.activity_logger import log_activity
 from app.utils.security import decode_access_token
+from app.utils.counters import apply_status_change, known_status
+from app.utils.pagination import encode_cursor, keyset_after, NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER
+from app.utils.fast_json import fast_json_response, projection_of
 
 router = APIRouter()
 
@@ -43,9 +47,9 @@ class ReportResponse(BaseModel):
     adminNotes: List[AdminNote] = []
 
 
-def report_to_response(report: IncidentReport) -> ReportResponse:
-    """Convert IncidentReport document to response model"""
-    return ReportResponse(
+def report_to_response(report: Union[IncidentReport, ReportSummary]) -> ReportResponse:
+    """Convert IncidentReport document (or list projection) to response model"""
+    fields = dict(
         id=str(report.id),
         featureId=str(report.featureId) if report.featureId else None,
         reporter=report.reporter,
@@ -53,9 +57,32 @@ def report_to_response(report: IncidentReport) -> ReportResponse:
         description=report.description,
         status=report.status.value,
         createdAt=report.createdAt,
-        resolvedAt=report.resolvedAt,
-        adminNotes=report.adminNotes
+        resolvedAt=report.resolvedAt
     )
+    # Summary projections carry no notes; leave the field unset so list
+    # responses can omit it
+    admin_notes = getattr(report, "adminNotes", None)
+    if admin_notes is not None:
+        fields["adminNotes"] = admin_notes
+    return ReportResponse(**fields)
+
+
+def report_document_to_dict(doc: dict, include_notes: bool = False) -> dict:
+    """report_to_response for a raw incident_reports document, without validation"""
+    feature_id = doc.get("featureId")
+    fields = {
+        "id": str(doc["_id"]),
+        "featureId": str(feature_id) if feature_id else None,
+        "reporter": doc["reporter"],
+        "impactLevel": doc["impactLevel"],
+        "description": doc["description"],
+        "status": doc["status"],
+        "createdAt": doc["createdAt"],
+        "resolvedAt": doc.get("resolvedAt"),
+    }
+    if include_notes:
+        fields["adminNotes"] = doc.get("adminNotes", [])
+    return fields
 
 
 # POST /api/reports - Create report (Any user, extract from token if auth)
@@ -85,6 +112,7 @@ async def create_report(data: CreateReportRequest, request: Request):
         status=ReportStatus.PENDING
     )
     await report.insert()
+    await apply_status_change("reports", None, report.status)
     
     # Log activity if user is authenticated
     if user_id:
@@ -101,23 +129,70 @@ async def create_report(data: CreateReportRequest, request: Request):
     return report_to_response(report)
 
 
-# GET /api/reports - List reports (Manager only, with filters)
-@router.get("/", response_model=List[ReportResponse])
+# GET /api/reports - List reports (Manager only, with filters, paginated)
+@router.get("/", response_model=List[ReportResponse], response_model_exclude_unset=True)
 async def list_reports(
+    response: Response,
     status: Optional[str] = Query(None, description="Filter by status (comma-separated: pending,acknowledged)"),
+    impact_level: Optional[str] = Query(None, alias="impactLevel", description="Filter by impact level (comma-separated: high,medium)"),
+    feature_id: Optional[str] = Query(None, alias="featureId", description="Filter by feature ID"),
+    created_from: Optional[datetime] = Query(None, alias="from", description="Only reports created at or after this time"),
+    created_to: Optional[datetime] = Query(None, alias="to", description="Only reports created before this time"),
+    limit: int = Query(50, ge=1, le=200, description="Number of results to return"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor"),
+    include: Optional[str] = Query(None, description="Comma-separated heavy fields to include: notes"),
     current_user: User = Depends(require_role([UserRole.MANAGER]))
 ):
-    """List all incident reports with optional status filter. Manager only."""
+    """List incident reports newest first with optional filters. Manager only."""
+    
+    query = {}
     
     if status:
-        statuses = [s.strip() for s in status.split(",")]
-        reports = await IncidentReport.find(
-            {"status": {"$in": statuses}}
-        ).sort("-createdAt").to_list()
+        query["status"] = {"$in": [s.strip() for s in status.split(",")]}
+    
+    if impact_level:
+        query["impactLevel"] = {"$in": [i.strip() for i in impact_level.split(",")]}
+    
+    if feature_id:
+        try:
+            query["featureId"] = PydanticObjectId(feature_id)
+        except Exception:
+            raise HTTPException(status_code=400, detail="Invalid feature ID format")
+    
+    if created_from or created_to:
+        query["createdAt"] = {}
+        if created_from:
+            query["createdAt"]["$gte"] = created_from
+        if created_to:
+            query["createdAt"]["$lt"] = created_to
+    
+    # Total ignores the cursor; without filters the collection metadata is enough
+    if query:
+        total = await IncidentReport.find(query).count()
     else:
-        reports = await IncidentReport.find_all().sort("-createdAt").to_list()
+        total = await IncidentReport.get_motor_collection().estimated_document_count()
+    response.headers[TOTAL_COUNT_HEADER] = str(total)
+    
+    page_query = query
+    if cursor:
+        try:
+            page_query = {"$and": [query, keyset_after("createdAt", cursor)]}
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    includes = {i.strip() for i in include.split(",")} if include else set()
+    include_notes = "notes" in includes
+    projection = ReportWithNotes if include_notes else ReportSummary
+    reports = await IncidentReport.get_motor_collection().find(
+        page_query, projection_of(projection)
+    ).sort([("createdAt", -1), ("_id", -1)]).limit(limit + 1).to_list(length=limit + 1)
     
-    return [report_to_response(r) for r in reports]
+    if len(reports) > limit:
+        reports = reports[:limit]
+        last = reports[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last["createdAt"], last["_id"])
+    
+    return fast_json_response([report_document_to_dict(r, include_notes) for r in reports], response)
 
 
 # PATCH /api/reports/:id/status - Update status (Manager only)
@@ -130,21 +205,25 @@ async def update_report_status(
     """Update report status. Manager only."""
     
     try:
-        report = await IncidentReport.get(PydanticObjectId(report_id))
+        report_oid = PydanticObjectId(report_id)
     except Exception:
         raise HTTPException(status_code=404, detail="Report not found")
     
-    if not report:
-        raise HTTPException(status_code=404, detail="Report not found")
-    
-    old_status = report.status
-    report.status = data.status
-    
+    fields = {"status": data.status.value}
     # Set resolvedAt if addressing
     if data.status == ReportStatus.ADDRESSED:
-        report.resolvedAt = datetime.utcnow()
+        fields["resolvedAt"] = datetime.utcnow()
+    
+    # The status this write replaced, for the counters
+    before = await IncidentReport.get_motor_collection().find_one_and_update(
+        {"_id": report_oid}, {"$set": fields}, return_document=ReturnDocument.BEFORE
+    )
+    if not before:
+        raise HTTPException(status_code=404, detail="Report not found")
     
-    await report.save()
+    report = IncidentReport.model_validate({**before, **fields})
+    old_status = known_status(ReportStatus, before.get("status"))
+    await apply_status_change("reports", old_status, report.status)
     
     # Log activity
     action = ActionType.REPORT_ACKNOWLEDGED if data.status == ReportStatus.ACKNOWLEDGED else ActionType.REPORT_ADDRESSED
@@ -154,7 +233,7 @@ async def update_report_status(
         target_type=TargetType.REPORT,
         target_id=report.id,
         target_name=report.description[:50],
-        details={"oldStatus": old_status.value, "newStatus": data.status.value}
+        details={"oldStatus": before.get("status"), "newStatus": data.status.value}
     )
     
     return report_to_response(report)
@@ -170,20 +249,24 @@ async def add_report_note(
     """Add an admin note to a report. Manager only."""
     
     try:
-        report = await IncidentReport.get(PydanticObjectId(report_id))
+        report_oid = PydanticObjectId(report_id)
     except Exception:
         raise HTTPException(status_code=404, detail="Report not found")
     
-    if not report:
-        raise HTTPException(status_code=404, detail="Report not found")
-    
     note = AdminNote(
         authorId=current_user.id,
         authorName=current_user.name,
         note=data.note
     )
-    report.adminNotes.append(note)
-    await report.save()
+    # Push rather than save the whole report, which could undo a concurrent status change
+    doc = await IncidentReport.get_motor_collection().find_one_and_update(
+        {"_id": report_oid},
+        {"$push": {"adminNotes": note.model_dump()}},
+        return_document=ReturnDocument.AFTER,
+    )
+    if not doc:
+        raise HTTPException(status_code=404, detail="Report not found")
+    report = IncidentReport.model_validate(doc)
     
     # Log activity
     await log_activity(
@@ -206,23 +289,26 @@ async def delete_report(
     """Delete a spam/invalid report. Manager only."""
     
     try:
-        report = await IncidentReport.get(PydanticObjectId(report_id))
+        report_oid = PydanticObjectId(report_id)
     except Exception:
         raise HTTPException(status_code=404, detail="Report not found")
     
+    # The status of the report as deleted, for the counters
+    report = await IncidentReport.get_motor_collection().find_one_and_delete(
+        {"_id": report_oid}, projection={"status": 1, "description": 1}
+    )
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
     
-    report_desc = report.description[:50]
-    await report.delete()
+    await apply_status_change("reports", known_status(ReportStatus, report.get("status")), None)
     
     # Log activity
     await log_activity(
         user=current_user,
         action=ActionType.REPORT_DELETED,
         target_type=TargetType.REPORT,
-        target_id=PydanticObjectId(report_id),
-        target_name=report_desc
+        target_id=report_oid,
+        target_name=report.get("description", "")[:50]
     )
     
     return {"message": "Report deleted successfully", "id": report_id}
@@ -1,39 +1,62 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from typing import List, Optional
+from pydantic import BaseModel
 from beanie import PydanticObjectId
 
-from app.models.roadmap import RoadmapPhase
+from app.models.roadmap import RoadmapPhase, Deliverable, PhaseStatus, HealthStatus
 from app.models.activity import ActionType, TargetType
 from app.models.user import User
 from app.auth import get_current_user
 from app.utils.activity_logger import log_activity
+from app.utils.etag import check_etag, bump_version
+from app.utils.partial_update import update_with_revision, reject_null
+from app.utils.fast_json import fast_json_response, document_fields, complete_documents
 
 router = APIRouter()
 
+ROADMAP_FIELDS = document_fields(RoadmapPhase)
+
+
+class UpdateRoadmapPhaseRequest(BaseModel):
+    """Request model for partially updating a roadmap phase"""
+    phase: Optional[str] = None
+    date: Optional[str] = None
+    title: Optional[str] = None
+    description: Optional[str] = None
+    status: Optional[PhaseStatus] = None
+    health: Optional[HealthStatus] = None
+    deliverables: Optional[List[Deliverable]] = None
+    revision: Optional[int] = None  # If set, reject with 409 unless it matches
+
+    _required = reject_null("phase", "date", "title", "description", "status", "deliverables")
+
 @router.get("/roadmap", response_model=List[RoadmapPhase])
-async def get_roadmap():
-    return await RoadmapPhase.find_all().to_list()
+async def get_roadmap(request: Request, response: Response):
+    not_modified = check_etag(request, response, RoadmapPhase)
+    if not_modified:
+        return not_modified
+    phases = await RoadmapPhase.get_motor_collection().find({}).to_list(length=None)
+    return fast_json_response(complete_documents(phases, ROADMAP_FIELDS), response)
 
 @router.post("/roadmap", response_model=RoadmapPhase)
 async def create_roadmap_phase(phase: RoadmapPhase):
     await phase.insert()
+    bump_version(RoadmapPhase)
     return phase
 
 @router.patch("/roadmap/{id}", response_model=RoadmapPhase)
 async def update_roadmap_phase(
     id: PydanticObjectId, 
-    phase_data: RoadmapPhase,
+    phase_data: UpdateRoadmapPhaseRequest,
     current_user: User = Depends(get_current_user)
 ):
-    phase = await RoadmapPhase.get(id)
-    if not phase:
-        raise HTTPException(status_code=404, detail="Roadmap Phase not found")
-    
-    phase_dict = phase_data.dict(exclude_unset=True, exclude={"id"})
-    for key, value in phase_dict.items():
-        setattr(phase, key, value)
-        
-    await phase.save()
+    _, phase = await update_with_revision(
+        RoadmapPhase, id,
+        phase_data.dict(exclude_unset=True, exclude={"revision"}),
+        expected_revision=phase_data.revision,
+        not_found="Roadmap Phase not found"
+    )
+    bump_version(RoadmapPhase)
     
     # Log ROADMAP_PHASE_UPDATE activity
     await log_activity(
@@ -52,5 +75,6 @@ async def delete_roadmap_phase(id: PydanticObjectId):
     if not phase:
         raise HTTPException(status_code=404, detail="Roadmap Phase not found")
     await phase.delete()
+    bump_version(RoadmapPhase)
     return {"message": "Roadmap Phase deleted"}
 
@@ -1,26 +1,215 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, Request, Response
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field
+from datetime import datetime
 from beanie import PydanticObjectId
-from app.models.task import Task
+from pymongo import ReturnDocument, UpdateOne
+from app.models.task import Task, TaskStatus, TaskPriority
+from app.models.activity import ActionType, TargetType
+from app.models.user import User
+from app.models.bulk import BulkItemResult, BulkItemStatus, BulkUpdateResponse
+from app.auth import get_current_user
+from app.config import settings
+from app.utils.activity_logger import build_activity, log_activities
+from app.utils.etag import check_etag, bump_version
+from app.utils.counters import apply_status_change, apply_status_changes
+from app.utils.task_rollups import apply_task_transition, completion_day, transition_delta, record_completion_changes
+from app.utils.partial_update import (
+    update_with_revision, revision_filter, revision_update, parse_bulk_ids, reject_null, gather_bounded,
+)
+from app.utils.fast_json import fast_json_response, document_fields, complete_documents
 
 router = APIRouter()
 
+TASK_FIELDS = document_fields(Task)
+
+
+class UpdateTaskRequest(BaseModel):
+    """Request model for partially updating a task"""
+    name: Optional[str] = None
+    assignee: Optional[str] = None
+    status: Optional[TaskStatus] = None
+    dueDate: Optional[str] = None
+    priority: Optional[TaskPriority] = None
+    revision: Optional[int] = None  # If set, reject with 409 unless it matches
+
+    _required = reject_null("name", "assignee", "status", "dueDate")
+
+
+class BulkTaskUpdateItem(UpdateTaskRequest):
+    id: str
+
+
+class BulkTaskUpdateRequest(BaseModel):
+    items: List[BulkTaskUpdateItem] = Field(..., min_length=1, max_length=settings.BULK_MAX_ITEMS)
+
+def completion_update(status: Optional[TaskStatus], fields: dict, now: datetime) -> Optional[dict]:
+    """
+    Stamp completion so burnup/velocity can date it.
+
+    Moving to Done sets completedAt via an expression evaluated against the
+    stored status inside the same write (kept if it was already Done); any
+    other status clears it. Returns the extra `$set` expressions, if any.
+    """
+    if status == TaskStatus.DONE:
+        return {"completedAt": {"$cond": [
+            {"$eq": ["$status", TaskStatus.DONE.value]}, "$completedAt", {"$literal": now}
+        ]}}
+    if status is not None:
+        fields["completedAt"] = None
+    return None
+
+
 @router.get("/tasks", response_model=List[Task])
-async def get_tasks():
-    return await Task.find_all().to_list()
+async def get_tasks(request: Request, response: Response):
+    not_modified = check_etag(request, response, Task)
+    if not_modified:
+        return not_modified
+    tasks = await Task.get_motor_collection().find({}).to_list(length=None)
+    return fast_json_response(complete_documents(tasks, TASK_FIELDS), response)
 
 @router.patch("/tasks/{id}", response_model=Task)
-async def update_task(id: PydanticObjectId, task_data: Task):
-    # Using the whole model for partial updates as per simple requirements,
-    # or typically we'd use a separate Pydantic model with optional fields.
-    task = await Task.get(id)
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    
-    # Simple dictionary update for now, ideally Pydantic's copy(update=...)
-    task_dict = task_data.dict(exclude_unset=True, exclude={"id"})
-    for key, value in task_dict.items():
-        setattr(task, key, value)
-    
-    await task.save()
+async def update_task(id: PydanticObjectId, task_data: UpdateTaskRequest):
+    fields = task_data.dict(exclude_unset=True, exclude={"revision"})
+    
+    now = datetime.utcnow()
+    extra_set = completion_update(task_data.status, fields, now)
+    
+    old_task, task = await update_with_revision(
+        Task, id, fields,
+        expected_revision=task_data.revision,
+        extra_set=extra_set,
+        not_found="Task not found"
+    )
+    if task_data.status == TaskStatus.DONE:
+        task.completedAt = old_task.completedAt if old_task.status == TaskStatus.DONE else now
+    
+    old_completed_day = completion_day(old_task) if old_task.status == TaskStatus.DONE else None
+    bump_version(Task)
+    await apply_status_change("tasks", old_task.status, task.status)
+    await apply_task_transition(task, old_task.status, old_completed_day)
     return task
+
+
+@router.post("/tasks/bulk", response_model=BulkUpdateResponse)
+async def bulk_update_tasks(
+    data: BulkTaskUpdateRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Apply many task PATCHes with one activity insert_many.
+
+    Items that leave the status alone share one bulk_write. Status changes
+    each go through the same atomic update as PATCH, at most
+    BULK_WRITE_CONCURRENCY at a time, so the counters and burnup rollups
+    move from the status each write replaced rather than from an earlier
+    read. If an item fails outright, the writes that did land are still
+    accounted for before the error is raised.
+    """
+    ids, failures = parse_bulk_ids([item.id for item in data.items])
+    collection = Task.get_motor_collection()
+    
+    # One read to report missing targets and stale revisions up front
+    valid_ids = [oid for oid in ids if oid is not None]
+    current = {
+        doc["_id"]: doc.get("revision", 0)
+        for doc in await collection.find({"_id": {"$in": valid_ids}}, {"revision": 1}).to_list(length=None)
+    }
+    
+    now = datetime.utcnow()
+    status_items = []
+    other_items = []
+    for index, (item, oid) in enumerate(zip(data.items, ids)):
+        if index in failures:
+            continue
+        if oid not in current:
+            failures[index] = BulkItemStatus.NOT_FOUND
+            continue
+        if item.revision is not None and current[oid] != item.revision:
+            failures[index] = BulkItemStatus.CONFLICT
+            continue
+        fields = item.dict(exclude_unset=True, exclude={"id", "revision"})
+        update = revision_update(fields, completion_update(item.status, fields, now))
+        (status_items if item.status is not None else other_items).append((index, item, oid, update))
+    
+    written = await gather_bounded([
+        collection.find_one_and_update(
+            revision_filter(oid, item.revision), update,
+            projection={"name": 1, "status": 1, "completedAt": 1},
+            return_document=ReturnDocument.BEFORE,
+        )
+        for _, item, oid, update in status_items
+    ], settings.BULK_WRITE_CONCURRENCY)
+    
+    error = None
+    unmatched = []
+    transitions = []
+    completion_deltas: Dict[str, int] = {}
+    activities = []
+    for (index, item, oid, _), old in zip(status_items, written):
+        if isinstance(old, Exception):
+            error = error or old
+            continue
+        if old is None:
+            unmatched.append((index, oid))
+            continue
+        old_status = TaskStatus(old["status"])
+        if item.status == old_status:
+            continue
+        transitions.append((old_status, item.status))
+        old_completed_day = None
+        if old_status == TaskStatus.DONE:
+            old_completed_day = (old.get("completedAt") or oid.generation_time).strftime("%Y-%m-%d")
+        for day, delta in transition_delta(old_status, item.status, old_completed_day, now.strftime("%Y-%m-%d")).items():
+            completion_deltas[day] = completion_deltas.get(day, 0) + delta
+        activities.append(build_activity(
+            user=current_user,
+            action=ActionType.TASK_STATUS_UPDATE,
+            target_type=TargetType.TASK,
+            target_id=oid,
+            target_name=old["name"],
+            details={"oldStatus": old_status.value, "newStatus": item.status.value}
+        ))
+    
+    try:
+        if other_items and error is None:
+            result = await collection.bulk_write([
+                UpdateOne(revision_filter(oid, item.revision), update) for _, item, oid, update in other_items
+            ], ordered=False)
+            if result.matched_count < len(other_items):
+                # Something changed between the read and the write; find out what
+                after = {
+                    doc["_id"]: doc.get("revision", 0)
+                    for doc in await collection.find(
+                        {"_id": {"$in": [oid for _, _, oid, _ in other_items]}}, {"revision": 1}
+                    ).to_list(length=None)
+                }
+                for index, item, oid, _ in other_items:
+                    if oid not in after:
+                        failures[index] = BulkItemStatus.NOT_FOUND
+                    elif item.revision is not None and after[oid] != item.revision + 1:
+                        failures[index] = BulkItemStatus.CONFLICT
+        if unmatched:
+            existing = {
+                doc["_id"]
+                for doc in await collection.find(
+                    {"_id": {"$in": [oid for _, oid in unmatched]}}, {"_id": 1}
+                ).to_list(length=None)
+            }
+            for index, oid in unmatched:
+                failures[index] = BulkItemStatus.CONFLICT if oid in existing else BulkItemStatus.NOT_FOUND
+    finally:
+        if status_items or other_items:
+            bump_version(Task)
+        await apply_status_changes("tasks", transitions)
+        await record_completion_changes(completion_deltas)
+        await log_activities(activities)
+    if error is not None:
+        raise error
+    
+    results = [
+        BulkItemResult(id=item.id, result=failures.get(index, BulkItemStatus.UPDATED))
+        for index, item in enumerate(data.items)
+    ]
+    updated = sum(1 for r in results if r.result == BulkItemStatus.UPDATED)
+    return BulkUpdateResponse(updated=updated, results=results)
@@ -2,10 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from typing import List
 from pydantic import BaseModel, EmailStr
 from beanie import PydanticObjectId
-from app.auth import get_current_user, require_role
-from app.models.user import User, UserRole
+from app.auth import get_current_user, require_role, invalidate_user, user_cache
+from app.models.user import User, UserRole, UserSummary
 from app.models.activity import ActionType, TargetType
-from app.utils.security import hash_password
+from app.utils.security import hash_password_async, token_cache
 from app.utils.activity_logger import log_activity
 
 router = APIRouter()
@@ -24,7 +24,7 @@ class UserResponse(BaseModel):
 
 @router.get("/", response_model=List[UserResponse])
 async def list_users(current_user: User = Depends(require_role([UserRole.MANAGER]))):
-    users = await User.find_all().to_list()
+    users = await User.find_all().project(UserSummary).to_list()
     return [
         UserResponse(
             id=str(u.id),
@@ -35,6 +35,11 @@ async def list_users(current_user: User = Depends(require_role([UserRole.MANAGER
         for u in users
     ]
 
+@router.get("/cache/stats")
+async def get_user_cache_stats(current_user: User = Depends(require_role([UserRole.MANAGER]))):
+    """Hit/miss counters for the user and verified-token caches. Manager only."""
+    return {"users": user_cache.stats(), "tokens": token_cache.stats()}
+
 @router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def create_user(
     data: CreateUserRequest,
@@ -49,10 +54,11 @@ async def create_user(
     new_user = User(
         email=data.email,
         name=data.name,
-        password_hash=hash_password(data.password),
+        password_hash=await hash_password_async(data.password),
         role=data.role
     )
     await new_user.insert()
+    invalidate_user(new_user.id)
     
     # Log USER_CREATED activity
     await log_activity(
@@ -90,6 +96,7 @@ async def delete_user(
     
     user_name = user.name
     await user.delete()
+    invalidate_user(user_id)
     
     # Log USER_DELETED activity
     await log_activity(
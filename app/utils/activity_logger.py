@@ -1,7 +1,212 @@
 from app.models.activity import ActivityLog, ActionType, TargetType
 from app.models.user import User
-from typing import Optional, Dict, Any
+from app.config import settings
+from app.utils.activity_stats import invalidate_late_activity
+from datetime import datetime
+from typing import Optional, Dict, Any, List
 from beanie import PydanticObjectId
+from pymongo.errors import BulkWriteError
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Pauses before each retry of a failed flush; the queue keeps filling meanwhile
+FLUSH_RETRY_BACKOFF_SECONDS = (0.1, 0.5, 2.0)
+DUPLICATE_KEY = 11000
+
+
+def stamp_inserted(activities: List[ActivityLog]) -> List[ActivityLog]:
+    """Record the write time the live stream orders and resumes by, right before inserting."""
+    now = datetime.utcnow()
+    now = now.replace(microsecond=now.microsecond // 1000 * 1000)  # Mongo keeps milliseconds
+    for activity in activities:
+        activity.insertedAt = now
+    return activities
+
+
+class ActivityWriter:
+    """
+    Write-behind pipeline for activity logs.
+
+    Callers enqueue ActivityLog documents and a background task drains the
+    queue with `insert_many`, flushing when `batch_size` entries are waiting or
+    `flush_interval` seconds have passed. When the queue is full the entry is
+    inserted inline instead, so overflow applies backpressure rather than
+    dropping logs. Until `start()` is called (e.g. in scripts) every entry is
+    inserted directly.
+
+    A batch is inserted unordered, so one bad entry doesn't hold back the
+    rest, and whatever did not get written is retried with backoff before it
+    is given up on.
+    """
+
+    def __init__(self, max_size: int = 10000, batch_size: int = 100, flush_interval: float = 1.0):
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing: Optional[asyncio.Event] = None
+        self.flushed = 0
+        self.overflows = 0
+        self.failed = 0
+        self.retries = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._closing = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="activity-writer")
+
+    async def stop(self) -> None:
+        """Stop the flusher and write out everything still queued."""
+        if self._task is None:
+            return
+        self._closing.set()
+        await self._task
+        self._task = None
+        while self._queue.qsize():
+            await self._flush(self._drain(self.batch_size))
+        self._queue = None
+
+    async def enqueue(self, activity: ActivityLog) -> None:
+        if not self.running:
+            stamp_inserted([activity])
+            await activity.insert()
+            await invalidate_late_activity([activity])
+            return
+        try:
+            self._queue.put_nowait(activity)
+        except asyncio.QueueFull:
+            self.overflows += 1
+            stamp_inserted([activity])
+            await activity.insert()
+            await invalidate_late_activity([activity])
+
+    def _drain(self, limit: Optional[int] = None) -> List[ActivityLog]:
+        batch = []
+        while self._queue is not None and not self._queue.empty():
+            if limit is not None and len(batch) >= limit:
+                break
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self) -> None:
+        while not self._closing.is_set():
+            await self._flush(await self._collect())
+
+    async def _collect(self) -> List[ActivityLog]:
+        """Wait until a batch fills up or the flush interval elapses."""
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _insert(self, batch: List[ActivityLog]) -> List[ActivityLog]:
+        """
+        Insert `batch` unordered and return the entries that were not written.
+
+        IDs are assigned up front, so an entry an earlier attempt already
+        wrote comes back as a duplicate key and counts as written. Errors that
+        are not per entry (e.g. the server is unreachable) propagate.
+        """
+        try:
+            await ActivityLog.insert_many(stamp_inserted(batch), ordered=False)
+        except BulkWriteError as exc:
+            failed = {
+                error["index"] for error in exc.details.get("writeErrors", [])
+                if error.get("code") != DUPLICATE_KEY
+            }
+            return [activity for index, activity in enumerate(batch) if index in failed]
+        return []
+
+    async def _flush(self, batch: List[ActivityLog]) -> None:
+        if not batch:
+            return
+        started = time.perf_counter()
+        pending = batch
+        for delay in (0,) + FLUSH_RETRY_BACKOFF_SECONDS:
+            if delay:
+                self.retries += 1
+                await asyncio.sleep(delay)
+            try:
+                pending = await self._insert(pending)
+            except Exception:
+                logger.warning("Flushing %d activity logs failed", len(pending), exc_info=True)
+                continue
+            if not pending:
+                break
+        written = len(batch) - len(pending)
+        self.flushed += written
+        if pending:
+            self.failed += len(pending)
+            logger.error(
+                "Dropped %d activity logs after %d retries: %s",
+                len(pending), len(FLUSH_RETRY_BACKOFF_SECONDS), [str(activity.id) for activity in pending],
+            )
+        if written:
+            dropped = {activity.id for activity in pending}
+            await invalidate_late_activity([activity for activity in batch if activity.id not in dropped])
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.last_flush_ms = elapsed_ms
+        self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+
+    def stats(self) -> dict:
+        return {
+            "queueDepth": self._queue.qsize() if self._queue is not None else 0,
+            "maxSize": self.max_size,
+            "flushed": self.flushed,
+            "overflows": self.overflows,
+            "failed": self.failed,
+            "retries": self.retries,
+            "lastFlushMs": round(self.last_flush_ms, 3),
+            "maxFlushMs": round(self.max_flush_ms, 3),
+        }
+
+
+activity_writer = ActivityWriter(
+    max_size=settings.ACTIVITY_QUEUE_MAX_SIZE,
+    batch_size=settings.ACTIVITY_FLUSH_BATCH_SIZE,
+    flush_interval=settings.ACTIVITY_FLUSH_INTERVAL_SECONDS,
+)
+
+
+def build_activity(
+    user: User,
+    action: ActionType,
+    target_type: Optional[TargetType] = None,
+    target_id: Optional[PydanticObjectId] = None,
+    target_name: Optional[str] = None,
+    details: Optional[Dict[str, Any]] = None
+) -> ActivityLog:
+    """Build an ActivityLog for `user` with its ID assigned up front."""
+    return ActivityLog(
+        id=PydanticObjectId(),
+        userId=user.id,
+        userName=user.name,
+        userRole=user.role.value,
+        action=action,
+        targetType=target_type,
+        targetId=target_id,
+        targetName=target_name,
+        details=details
+    )
 
 
 async def log_activity(
@@ -14,7 +219,10 @@ async def log_activity(
 ) -> ActivityLog:
     """
     Log a user activity to the database.
-    
+
+    The entry is handed to the write-behind queue, so it is persisted shortly
+    after this returns rather than on the request's critical path.
+
     Args:
         user: The user performing the action
         action: The type of action (from ActionType enum)
@@ -22,19 +230,17 @@ async def log_activity(
         target_id: The ID of the target entity
         target_name: Human-readable name of the target
         details: Additional context about the action
-    
+
     Returns:
-        The created ActivityLog document
+        The ActivityLog document (its ID is assigned up front)
     """
-    activity = ActivityLog(
-        userId=user.id,
-        userName=user.name,
-        userRole=user.role.value,
-        action=action,
-        targetType=target_type,
-        targetId=target_id,
-        targetName=target_name,
-        details=details
-    )
-    await activity.insert()
+    activity = build_activity(user, action, target_type, target_id, target_name, details)
+    await activity_writer.enqueue(activity)
     return activity
+
+
+async def log_activities(activities: List[ActivityLog]) -> None:
+    """Persist a batch of activities built with `build_activity` in one insert_many."""
+    if activities:
+        await ActivityLog.insert_many(stamp_inserted(activities))
+        await invalidate_late_activity(activities)
@@ -0,0 +1,194 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+from pymongo import ASCENDING, UpdateOne
+import asyncio
+import logging
+import time
+
+from app.models.activity import ActivityLog, ActivityDailyRollup
+from app.config import settings
+from app.database import declared_indexes
+
+logger = logging.getLogger(__name__)
+
+TTL_INDEX_NAME = "timestamp_ttl"
+ROLLUP_BATCH_SIZE = 1000
+
+_DAY_FORMAT = "%Y-%m-%d"
+
+
+def _day_start(moment: datetime) -> datetime:
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _rollup_pipeline(match: dict) -> List[dict]:
+    return [
+        {"$match": match},
+        # Sorted so $last picks the user's name and role as of their latest entry
+        {"$sort": {"timestamp": 1}},
+        {"$group": {
+            "_id": {
+                "day": {"$dateToString": {"format": _DAY_FORMAT, "date": "$timestamp"}},
+                "userId": "$userId",
+                "action": "$action",
+            },
+            "total": {"$sum": 1},
+            "userName": {"$last": "$userName"},
+            "userRole": {"$last": "$userRole"},
+            "firstAt": {"$min": "$timestamp"},
+            "lastAt": {"$max": "$timestamp"},
+        }},
+    ]
+
+
+async def last_rolled_up_day() -> Optional[str]:
+    doc = await ActivityDailyRollup.get_motor_collection().find_one({}, {"day": 1}, sort=[("day", -1)])
+    return doc["day"] if doc else None
+
+
+async def rollup_activities(now: Optional[datetime] = None) -> int:
+    """
+    Summarise every complete UTC day of activity logs not rolled up yet.
+
+    A day counts as complete ACTIVITY_ROLLUP_DELAY_SECONDS after midnight, so
+    late write-behind flushes land first. Buckets are upserted with `$set`,
+    which makes re-running a day (the latest one is always re-read) and
+    concurrent runs from several workers harmless. Returns the buckets written.
+    """
+    now = now or datetime.utcnow()
+    until = _day_start(now - timedelta(seconds=settings.ACTIVITY_ROLLUP_DELAY_SECONDS))
+    match = {"timestamp": {"$lt": until}}
+
+    last_day = await last_rolled_up_day()
+    if last_day is not None:
+        start = datetime.strptime(last_day, _DAY_FORMAT)
+        if settings.ACTIVITY_RETENTION_DAYS is not None:
+            expired_before = now - timedelta(days=settings.ACTIVITY_RETENTION_DAYS)
+            if start < expired_before:
+                # Part of that day has expired already; keep its existing counts
+                start += timedelta(days=1)
+        match["timestamp"]["$gte"] = start
+        if start >= until:
+            return 0
+
+    collection = ActivityDailyRollup.get_motor_collection()
+    written = 0
+    ops = []
+    async for row in ActivityLog.get_motor_collection().aggregate(_rollup_pipeline(match), allowDiskUse=True):
+        ops.append(UpdateOne(row.pop("_id"), {"$set": row}, upsert=True))
+        if len(ops) >= ROLLUP_BATCH_SIZE:
+            await collection.bulk_write(ops, ordered=False)
+            written += len(ops)
+            ops = []
+    if ops:
+        await collection.bulk_write(ops, ordered=False)
+        written += len(ops)
+    return written
+
+
+async def ensure_ttl_index() -> None:
+    """
+    Create, retune or drop the TTL index on `activity_logs.timestamp` to match
+    ACTIVITY_RETENTION_DAYS. Mongo's TTL monitor then deletes expired logs.
+    """
+    collection = ActivityLog.get_motor_collection()
+    current = (await collection.index_information()).get(TTL_INDEX_NAME)
+
+    if settings.ACTIVITY_RETENTION_DAYS is None:
+        if current is not None:
+            await collection.drop_index(TTL_INDEX_NAME)
+            logger.info("Activity log retention disabled; dropped TTL index")
+        return
+
+    expire_after = settings.ACTIVITY_RETENTION_DAYS * 86400
+    if current is None:
+        await collection.create_index(
+            [("timestamp", ASCENDING)], name=TTL_INDEX_NAME, expireAfterSeconds=expire_after
+        )
+        logger.info("Activity logs now expire after %d days", settings.ACTIVITY_RETENTION_DAYS)
+    elif current.get("expireAfterSeconds") != expire_after:
+        await collection.database.command({
+            "collMod": collection.name,
+            "index": {"name": TTL_INDEX_NAME, "expireAfterSeconds": expire_after},
+        })
+        logger.info("Activity log retention changed to %d days", settings.ACTIVITY_RETENTION_DAYS)
+
+
+class ActivityRetention:
+    """
+    Background job that rolls activity logs up into daily summaries.
+
+    Runs every `interval` seconds. The TTL index is only synced after the first
+    successful rollup, so enabling retention on an existing database summarises
+    the whole backlog before Mongo starts expiring it. Days are rolled up as
+    soon as they end, well ahead of expiry (retention is at least two days).
+    """
+
+    def __init__(self, interval: float = 3600.0):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self._ttl_synced = False
+        self.runs = 0
+        self.failures = 0
+        self.buckets_written = 0
+        self.last_run_at: Optional[datetime] = None
+        self.last_run_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run(), name="activity-retention")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def run_once(self) -> int:
+        started = time.perf_counter()
+        if not self._ttl_synced:
+            # Workers may roll up concurrently; the unique bucket index must
+            # exist before the first upsert even when index sync is deferred
+            await ActivityDailyRollup.get_motor_collection().create_indexes(
+                declared_indexes(ActivityDailyRollup)
+            )
+        written = await rollup_activities()
+        if not self._ttl_synced:
+            await ensure_ttl_index()
+            self._ttl_synced = True
+        self.runs += 1
+        self.buckets_written += written
+        self.last_run_at = datetime.utcnow()
+        self.last_run_ms = (time.perf_counter() - started) * 1000
+        return written
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.failures += 1
+                logger.exception("Activity rollup failed")
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> dict:
+        return {
+            "retentionDays": settings.ACTIVITY_RETENTION_DAYS,
+            "runs": self.runs,
+            "failures": self.failures,
+            "bucketsWritten": self.buckets_written,
+            "lastRunAt": self.last_run_at,
+            "lastRunMs": round(self.last_run_ms, 3),
+            "ttlIndexSynced": self._ttl_synced,
+        }
+
+
+activity_retention = ActivityRetention(interval=settings.ACTIVITY_ROLLUP_INTERVAL_SECONDS)
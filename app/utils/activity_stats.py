@@ -0,0 +1,126 @@
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import List, Optional
+
+from app.config import settings
+from app.models.activity import ActivityLog
+from app.utils.etag import bump_version
+from app.utils.response_cache import response_cache
+
+STATS_CACHE_KEY = "activities:stats"
+_EPOCH = datetime(1970, 1, 1)
+
+
+class StatsWindow(str, Enum):
+    """Rolling windows the stats endpoint serves; a fixed set keeps the cache bounded"""
+    DAY = "24h"
+    WEEK = "7d"
+    MONTH = "30d"
+    QUARTER = "90d"
+
+
+WINDOW_LENGTHS = {
+    StatsWindow.DAY: timedelta(hours=24),
+    StatsWindow.WEEK: timedelta(days=7),
+    StatsWindow.MONTH: timedelta(days=30),
+    StatsWindow.QUARTER: timedelta(days=90),
+}
+
+
+def window_end(now: Optional[datetime] = None) -> datetime:
+    """
+    End of the stats windows served at `now`: the latest multiple of
+    ACTIVITY_STATS_BUCKET_SECONDS. Every request within a bucket gets the
+    same result, so it is computed once per bucket rather than invalidated
+    on every write.
+    """
+    bucket = settings.ACTIVITY_STATS_BUCKET_SECONDS
+    elapsed = int(((now or datetime.utcnow()) - _EPOCH).total_seconds())
+    return _EPOCH + timedelta(seconds=elapsed - elapsed % bucket)
+
+
+def stats_metric_key(window: StatsWindow) -> str:
+    """Key the window's cache hits and misses are counted under, whatever the bucket."""
+    return f"{STATS_CACHE_KEY}:{window.value}"
+
+
+def stats_cache_key(window: StatsWindow, until: datetime) -> str:
+    return f"{stats_metric_key(window)}:{until.isoformat()}"
+
+
+async def invalidate_late_activity(activities: List[ActivityLog]) -> None:
+    """
+    Drop the current bucket's cached stats if any of `activities`, just
+    written, falls inside it.
+
+    Entries normally land after the bucket they were logged in has ended,
+    but the write-behind queue can flush one late (flush interval, retries),
+    after the bucket's result was cached.
+    """
+    until = window_end()
+    if not any(activity.timestamp < until for activity in activities):
+        return
+    bump_version(ActivityLog)
+    await response_cache.invalidate(*(stats_cache_key(window, until) for window in StatsWindow))
+
+
+def _count(field: str) -> List[dict]:
+    return [
+        {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+        {"$sort": {"count": -1, "_id": 1}},
+    ]
+
+
+def _stats_pipeline(since: datetime, until: datetime) -> List[dict]:
+    # The range match runs on the timestamp index; each facet then groups the
+    # same matched documents, so the collection is read once
+    return [
+        {"$match": {"timestamp": {"$gte": since, "$lt": until}}},
+        {"$facet": {
+            "byAction": _count("action"),
+            "byTargetType": _count("targetType"),
+            "byUser": [
+                # Only this facet needs order, for `$last` to pick the user's latest name
+                {"$sort": {"timestamp": 1}},
+                {"$group": {
+                    "_id": "$userId",
+                    "userName": {"$last": "$userName"},
+                    "count": {"$sum": 1},
+                }},
+                {"$sort": {"count": -1, "_id": 1}},
+            ],
+            "byDay": [
+                {"$group": {
+                    "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp"}},
+                    "count": {"$sum": 1},
+                }},
+                {"$sort": {"_id": 1}},
+            ],
+        }},
+    ]
+
+
+async def load_activity_stats(window: StatsWindow, until: datetime) -> dict:
+    """Activity counts over the window ending at `until`, grouped four ways in one aggregation."""
+    since = until - WINDOW_LENGTHS[window]
+    result = await ActivityLog.get_motor_collection().aggregate(
+        _stats_pipeline(since, until), allowDiskUse=True
+    ).to_list(length=None)
+    facets = result[0] if result else {}
+
+    by_action = [{"action": row["_id"], "count": row["count"]} for row in facets.get("byAction", [])]
+    return {
+        "window": window.value,
+        "since": since,
+        "until": until,
+        "total": sum(row["count"] for row in by_action),
+        "byAction": by_action,
+        "byUser": [
+            {"userId": str(row["_id"]), "userName": row["userName"], "count": row["count"]}
+            for row in facets.get("byUser", [])
+        ],
+        "byTargetType": [
+            {"targetType": row["_id"], "count": row["count"]} for row in facets.get("byTargetType", [])
+        ],
+        "byDay": [{"day": row["_id"], "count": row["count"]} for row in facets.get("byDay", [])],
+    }
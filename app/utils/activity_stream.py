@@ -0,0 +1,220 @@
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional, Set, Tuple
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ASCENDING
+from pymongo.errors import OperationFailure
+import asyncio
+import logging
+
+from app.models.activity import ActivityLog
+from app.config import settings
+from app.utils.pagination import decode_cursor, encode_cursor
+
+logger = logging.getLogger(__name__)
+
+# Server error codes: change streams need a replica set; resume token too old
+CHANGE_STREAMS_UNSUPPORTED = 40573
+CHANGE_STREAM_HISTORY_LOST = 286
+
+RETRY_BACKOFF_SECONDS = (1, 2, 5, 10)
+POLL_SEEN_MAX = 10000
+
+# Events are ordered by when the activity was written, not by `_id`: IDs are
+# assigned when an activity is built, but the write-behind queue inserts it
+# up to a flush interval later
+STREAM_ORDER = [("insertedAt", ASCENDING), ("_id", ASCENDING)]
+
+
+def stream_position(doc: dict) -> Tuple[datetime, ObjectId]:
+    """Where `doc` falls in STREAM_ORDER."""
+    inserted_at = doc.get("insertedAt") or doc["_id"].generation_time.replace(tzinfo=None)
+    return inserted_at, doc["_id"]
+
+
+def event_id(doc: dict) -> str:
+    """The SSE event ID of `doc`, which a reconnecting client sends back as Last-Event-ID."""
+    return encode_cursor(*stream_position(doc))
+
+
+def written_after(last_event_id: str) -> dict:
+    """
+    Filter for activities written after the event `last_event_id`.
+
+    Also accepts a bare activity ID, as sent before events carried their
+    write time. Raises ValueError on malformed input.
+    """
+    try:
+        inserted_at, doc_id = decode_cursor(last_event_id)
+    except ValueError:
+        try:
+            doc_id = ObjectId(last_event_id)
+        except (InvalidId, TypeError):
+            raise ValueError("Invalid Last-Event-ID")
+        inserted_at = doc_id.generation_time.replace(tzinfo=None)
+    return {
+        "$or": [
+            {"insertedAt": {"$gt": inserted_at}},
+            {"insertedAt": inserted_at, "_id": {"$gt": doc_id}},
+        ]
+    }
+
+
+class Subscription:
+    """One connected client: its filters and a bounded queue of raw activity documents."""
+
+    def __init__(self, user_id: Optional[ObjectId], action: Optional[str], max_size: int):
+        self.user_id = user_id
+        self.action = action
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        # Set when events were dropped on a full queue; the stream then ends so
+        # the client reconnects with Last-Event-ID and backfills from the DB
+        self.lagged = False
+
+    def matches(self, doc: dict) -> bool:
+        if self.user_id is not None and doc.get("userId") != self.user_id:
+            return False
+        if self.action is not None and doc.get("action") != self.action:
+            return False
+        return True
+
+    def offer(self, doc: dict) -> None:
+        try:
+            self.queue.put_nowait(doc)
+        except asyncio.QueueFull:
+            self.lagged = True
+
+
+class ActivityBroadcaster:
+    """
+    Fans new activity logs out to every connected subscriber.
+
+    A single watcher task follows `activity_logs` with a change stream and
+    resumes from its last token after transient errors. On a standalone
+    server, where change streams are unavailable, it polls for recent inserts
+    instead. The watcher runs only while someone is subscribed.
+    """
+
+    def __init__(self, queue_size: int = 100, poll_interval: float = 2.0):
+        self.queue_size = queue_size
+        self.poll_interval = poll_interval
+        self._subscribers: Set[Subscription] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._resume_token: Optional[dict] = None
+        self.mode: Optional[str] = None  # "changeStream" or "polling"
+        self.published = 0
+        self.lagged = 0
+
+    def subscribe(self, user_id: Optional[ObjectId] = None, action: Optional[str] = None) -> Subscription:
+        subscription = Subscription(user_id, action, self.queue_size)
+        self._subscribers.add(subscription)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="activity-broadcaster")
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+        if not self._subscribers and self._task is not None:
+            self._task.cancel()
+            self._task = None
+            # The next subscriber starts from "now", not from where this one left
+            self._resume_token = None
+
+    async def stop(self) -> None:
+        self._subscribers.clear()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def publish(self, doc: dict) -> None:
+        self.published += 1
+        for subscription in list(self._subscribers):
+            if subscription.matches(doc):
+                was_lagged = subscription.lagged
+                subscription.offer(doc)
+                if subscription.lagged and not was_lagged:
+                    self.lagged += 1
+
+    async def _run(self) -> None:
+        attempt = 0
+        while True:
+            try:
+                if self.mode == "polling":
+                    await self._poll()
+                else:
+                    await self._watch()
+                attempt = 0
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as exc:
+                if exc.code == CHANGE_STREAMS_UNSUPPORTED:
+                    logger.info("Change streams unavailable; polling activity_logs instead")
+                    self.mode = "polling"
+                    continue
+                if exc.code == CHANGE_STREAM_HISTORY_LOST:
+                    logger.warning("Activity change stream token expired; restarting from now")
+                    self._resume_token = None
+                    continue
+                logger.exception("Activity watcher failed")
+            except Exception:
+                # Never let the watcher die silently; subscribers would just stall
+                logger.exception("Activity watcher failed")
+            await asyncio.sleep(RETRY_BACKOFF_SECONDS[min(attempt, len(RETRY_BACKOFF_SECONDS) - 1)])
+            attempt += 1
+
+    async def _watch(self) -> None:
+        collection = ActivityLog.get_motor_collection()
+        async with collection.watch(
+            [{"$match": {"operationType": "insert"}}],
+            resume_after=self._resume_token,
+        ) as stream:
+            self.mode = "changeStream"
+            async for change in stream:
+                self._resume_token = stream.resume_token
+                self.publish(change["fullDocument"])
+
+    async def _poll(self) -> None:
+        """
+        Publish documents written since the previous poll.
+
+        `insertedAt` is stamped just before the insert commits, so each poll
+        looks back over a short grace window and skips IDs already published.
+        """
+        collection = ActivityLog.get_motor_collection()
+        grace = timedelta(seconds=self.poll_interval + 1)
+        seen: "OrderedDict[ObjectId, None]" = OrderedDict()
+        since = datetime.utcnow()
+        # What is already in the window predates the subscribers; don't replay it
+        for doc in await collection.find(
+            {"insertedAt": {"$gte": since - grace}}, {"_id": 1}
+        ).to_list(length=None):
+            seen[doc["_id"]] = None
+
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            window_start = since - grace
+            since = datetime.utcnow()
+            docs = await collection.find({"insertedAt": {"$gte": window_start}}).sort(STREAM_ORDER).to_list(length=None)
+            for doc in docs:
+                if doc["_id"] in seen:
+                    continue
+                seen[doc["_id"]] = None
+                self.publish(doc)
+            while len(seen) > POLL_SEEN_MAX:
+                seen.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "lagged": self.lagged,
+        }
+
+
+activity_broadcaster = ActivityBroadcaster(
+    queue_size=settings.ACTIVITY_STREAM_QUEUE_SIZE,
+    poll_interval=settings.ACTIVITY_STREAM_POLL_INTERVAL_SECONDS,
+)
@@ -0,0 +1,166 @@
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+import logging
+
+from app.models.dashboard import DashboardCounters, KPI
+from app.models.task import Task, TaskStatus
+from app.models.feature import Feature, FeatureStatusEnum
+from app.models.report import IncidentReport, ReportStatus
+from app.utils.etag import bump_version
+from app.utils.response_cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+COUNTERS_KEY = "global"
+KPI_CACHE_KEY = "dashboard:kpi"
+
+# Counter group name -> (document model, status enum)
+COUNTER_GROUPS = {
+    "tasks": (Task, TaskStatus),
+    "features": (Feature, FeatureStatusEnum),
+    "reports": (IncidentReport, ReportStatus),
+}
+
+
+def known_status(status_enum: Type[Enum], value: Any) -> Optional[Enum]:
+    """`value` as a `status_enum` member, or None if it is missing or unknown (and so not counted)."""
+    try:
+        return status_enum(value)
+    except ValueError:
+        return None
+
+
+def status_delta(group: str, old: Optional[Enum], new: Optional[Enum]) -> Dict[str, int]:
+    """`$inc` fields for a document moving from `old` to `new` status (None = absent)."""
+    delta: Dict[str, int] = {}
+    if old == new:
+        return delta
+    if old is not None:
+        delta[f"{group}.{old.name}"] = -1
+    if new is not None:
+        delta[f"{group}.{new.name}"] = delta.get(f"{group}.{new.name}", 0) + 1
+    return delta
+
+
+async def apply_status_change(group: str, old: Optional[Enum], new: Optional[Enum]) -> None:
+    """Atomically apply a status transition to the materialized counters."""
+    await apply_status_changes(group, [(old, new)])
+
+
+async def apply_status_changes(group: str, transitions: Iterable[Tuple[Optional[Enum], Optional[Enum]]]) -> None:
+    """Apply many status transitions to the counters in a single `$inc`."""
+    delta: Dict[str, int] = {}
+    for old, new in transitions:
+        for field, change in status_delta(group, old, new).items():
+            delta[field] = delta.get(field, 0) + change
+    delta = {field: change for field, change in delta.items() if change}
+    if not delta:
+        return
+    await DashboardCounters.get_motor_collection().update_one(
+        {"key": COUNTERS_KEY},
+        {"$inc": delta},
+        upsert=True,
+    )
+    bump_version(DashboardCounters)
+    await response_cache.invalidate(KPI_CACHE_KEY)
+
+
+async def count_statuses() -> Tuple[Dict[str, Dict[str, int]], Dict[str, Dict[Any, int]]]:
+    """
+    Recount every status from the source collections.
+
+    Returns the counts per group, and separately the number of documents per
+    group whose status is missing or not a valid value, keyed by that value;
+    those are left out of the counts.
+    """
+    counts: Dict[str, Dict[str, int]] = {}
+    invalid: Dict[str, Dict[Any, int]] = {}
+    for group, (model, status_enum) in COUNTER_GROUPS.items():
+        rows = await model.get_motor_collection().aggregate(
+            [{"$group": {"_id": "$status", "count": {"$sum": 1}}}]
+        ).to_list(length=None)
+        counts[group] = {}
+        for row in rows:
+            try:
+                counts[group][status_enum(row["_id"]).name] = row["count"]
+            except ValueError:
+                invalid.setdefault(group, {})[row["_id"]] = row["count"]
+    return counts, invalid
+
+
+async def compute_counters() -> Dict[str, Dict[str, int]]:
+    """Recount every valid status from the source collections."""
+    counts, _ = await count_statuses()
+    return counts
+
+
+async def get_counters() -> DashboardCounters:
+    counters = await DashboardCounters.find_one(DashboardCounters.key == COUNTERS_KEY)
+    return counters or DashboardCounters(key=COUNTERS_KEY)
+
+
+def _nonzero(counts: Dict[str, int]) -> Dict[str, int]:
+    return {k: v for k, v in counts.items() if v}
+
+
+async def rebuild_counters() -> List[str]:
+    """
+    Replace the stored counters with a fresh recount.
+
+    Returns the groups whose stored values had drifted from the recount, or
+    that hold documents with a missing or unknown status (logged; they are
+    not counted).
+    """
+    fresh, invalid = await count_statuses()
+    for group, statuses in invalid.items():
+        logger.warning("%s with a missing or unknown status, not counted: %s", group, statuses)
+    stored = await get_counters()
+    drifted = [
+        group for group in COUNTER_GROUPS
+        if _nonzero(getattr(stored, group)) != _nonzero(fresh[group]) or group in invalid
+    ]
+    await DashboardCounters.get_motor_collection().update_one(
+        {"key": COUNTERS_KEY},
+        {"$set": fresh},
+        upsert=True,
+    )
+    bump_version(DashboardCounters)
+    await response_cache.invalidate(KPI_CACHE_KEY)
+    return drifted
+
+
+async def ensure_counters() -> None:
+    """
+    Create the counters from a recount if there are none yet, e.g. on the first
+    start against an existing database; otherwise the first `$inc` would
+    start them from zero.
+
+    Runs before serving, and another process that got there first wins.
+    """
+    if await DashboardCounters.find_one(DashboardCounters.key == COUNTERS_KEY):
+        return
+    fresh, invalid = await count_statuses()
+    for group, statuses in invalid.items():
+        logger.warning("%s with a missing or unknown status, not counted: %s", group, statuses)
+    await DashboardCounters.get_motor_collection().update_one(
+        {"key": COUNTERS_KEY},
+        {"$setOnInsert": fresh},
+        upsert=True,
+    )
+    bump_version(DashboardCounters)
+    await response_cache.invalidate(KPI_CACHE_KEY)
+
+
+def counters_to_kpis(counters: DashboardCounters) -> List[KPI]:
+    tasks = counters.tasks
+    total_tasks = sum(tasks.values())
+    done_tasks = tasks.get(TaskStatus.DONE.name, 0)
+    completion = round(100 * done_tasks / total_tasks) if total_tasks else 0
+    return [
+        KPI(label="Overall Completion", value=f"{completion}%", trend="neutral"),
+        KPI(label="Open Tasks", value=str(total_tasks - done_tasks), trend="neutral"),
+        KPI(label="Blocked Tasks", value=str(tasks.get(TaskStatus.BLOCKED.name, 0)), trend="neutral"),
+        KPI(label="Critical Features", value=str(counters.features.get(FeatureStatusEnum.CRITICAL.name, 0)), trend="neutral"),
+        KPI(label="Degraded Features", value=str(counters.features.get(FeatureStatusEnum.DEGRADED.name, 0)), trend="neutral"),
+        KPI(label="Pending Reports", value=str(counters.reports.get(ReportStatus.PENDING.name, 0)), trend="neutral"),
+    ]
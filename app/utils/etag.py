@@ -0,0 +1,58 @@
+from fastapi import Request, Response
+from collections import defaultdict
+from typing import Optional
+import threading
+import time
+import uuid
+
+from app.config import settings
+
+# Per-collection write counters. They are process-local, so a restart (new
+# boot id) or the max-age epoch rolling over invalidates every tag; the epoch
+# also bounds staleness after out-of-band writes such as `seed.py`.
+_boot_id = uuid.uuid4().hex[:8]
+_versions: "defaultdict[str, int]" = defaultdict(int)
+_lock = threading.Lock()
+
+
+def _collection(model) -> str:
+    return model.Settings.name
+
+
+def bump_version(*models) -> None:
+    """Record a write to the given document models' collections."""
+    with _lock:
+        for model in models:
+            _versions[_collection(model)] += 1
+
+
+def current_etag(*models, variant: str = "") -> str:
+    epoch = int(time.time() // settings.ETAG_MAX_AGE_SECONDS)
+    parts = [f"{_collection(m)}.{_versions[_collection(m)]}" for m in models]
+    tag = "-".join([_boot_id, str(epoch), *parts])
+    if variant:
+        tag = f"{tag}-{variant}"
+    return f'W/"{tag}"'
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def check_etag(request: Request, response: Response, *models, variant: str = "") -> Optional[Response]:
+    """
+    Tag a read response with the current version of `models`.
+
+    Returns a 304 response when the client's If-None-Match already matches,
+    in which case the caller should return it without querying Mongo.
+    Compute this before running the query so the tag never runs ahead of
+    the data it labels.
+    """
+    etag = current_etag(*models, variant=variant)
+    if _matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return None
@@ -0,0 +1,71 @@
+from typing import Any, Dict, List, Type
+from beanie import Document
+from bson import ObjectId
+from fastapi import Response
+from pydantic import BaseModel
+from pydantic_core import PydanticUndefined
+import orjson
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """orjson encoding with ObjectId support; naive datetimes stay offset-free like Pydantic's."""
+    return orjson.dumps(content, default=_default)
+
+
+class FastJSONResponse(Response):
+    """
+    JSON response for raw Mongo documents, encoded with orjson.
+
+    Returning it from an endpoint bypasses `response_model` validation, so it
+    is only for data read straight from the database; the declared
+    `response_model` still documents the shape.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def fast_json_response(content: Any, response: Response) -> FastJSONResponse:
+    """Wrap `content`, keeping headers (ETag, cursors) set on the injected `response`."""
+    fast = FastJSONResponse(content)
+    fast.raw_headers.extend(response.raw_headers)
+    return fast
+
+
+def projection_of(model: Type[BaseModel]) -> Dict[str, int]:
+    """Mongo projection selecting exactly the (aliased) fields of `model`."""
+    return {field.alias or name: 1 for name, field in model.model_fields.items()}
+
+
+def document_fields(model: Type[Document]) -> List[tuple]:
+    """(stored key, default) pairs in the order a Document serializes its fields."""
+    fields = []
+    for name, field in model.model_fields.items():
+        if name in Document.model_fields and name != "id":
+            continue  # Beanie bookkeeping, never part of responses
+        if field.default_factory is not None:
+            default = field.default_factory()
+        elif field.default is PydanticUndefined:
+            default = None
+        else:
+            default = field.default
+        fields.append((field.alias or name, default))
+    return fields
+
+
+def complete_documents(docs: List[dict], fields: List[tuple]) -> List[dict]:
+    """
+    Fill fields missing from older documents with their model defaults.
+
+    Matches what validating into the Document and dumping it would produce,
+    without the per-item validation cost.
+    """
+    return [{key: doc.get(key, default) for key, default in fields} for doc in docs]
@@ -0,0 +1,243 @@
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+from bson import Binary
+from pymongo import UpdateOne
+import logging
+import numpy as np
+
+from app.models.feature import Feature, FeatureStatusEnum
+
+logger = logging.getLogger(__name__)
+
+HISTORY_DAYS = 60
+UPTIME_WINDOWS = (7, 30, HISTORY_DAYS)
+
+# Feature history is stored as `historyStart` (YYYY-MM-DD) plus `historyCodes`,
+# one status code byte per day from that date; NO_ENTRY marks days on which no
+# status was recorded. Responses still carry the `history` entry list.
+# Documents written before that stored a `history` entry list; converting one
+# keeps the original list as `legacyHistory`, since only the last
+# HISTORY_DAYS days fit in the codes.
+NO_ENTRY = 0
+STATUS_CODES = {
+    FeatureStatusEnum.OPERATIONAL: 1,
+    FeatureStatusEnum.DEGRADED: 2,
+    FeatureStatusEnum.CRITICAL: 3,
+}
+CODE_STATUSES = {code: status.value for status, code in STATUS_CODES.items()}
+
+HISTORY_FIELDS = ("historyStart", "historyCodes", "history")
+HISTORY_PROJECTION = {field: 1 for field in HISTORY_FIELDS}
+
+History = Tuple[Optional[str], bytes]
+
+
+def _trim(first: date, codes: bytearray) -> History:
+    """Keep the newest HISTORY_DAYS days and drop leading days without an entry."""
+    drop = max(0, len(codes) - HISTORY_DAYS)
+    while drop < len(codes) and codes[drop] == NO_ENTRY:
+        drop += 1
+    if drop == len(codes):
+        return None, b""
+    return (first + timedelta(days=drop)).isoformat(), bytes(codes[drop:])
+
+
+def encode_history(entries: Iterable) -> History:
+    """
+    Pack `{date, status}` entries (dicts or models) into (start day, codes).
+
+    Requests are validated before they get here; entries from legacy data
+    without an ISO date or a feature status are logged and skipped.
+    """
+    days: Dict[date, int] = {}
+    for entry in entries:
+        if hasattr(entry, "model_dump"):
+            entry = entry.model_dump()
+        try:
+            day = entry["date"] if isinstance(entry["date"], date) else date.fromisoformat(entry["date"])
+            days[day] = STATUS_CODES[FeatureStatusEnum(entry["status"])]
+        except (KeyError, TypeError, ValueError):
+            logger.warning("Skipping invalid feature history entry %r", entry)
+    if not days:
+        return None, b""
+    first = min(days)
+    codes = bytearray((max(days) - first).days + 1)
+    for day, code in days.items():
+        codes[(day - first).days] = code
+    return _trim(first, codes)
+
+
+@lru_cache(maxsize=256)
+def _day_strings(start: str) -> Tuple[str, ...]:
+    # Features updated on the same days share a start, so this is mostly a hit
+    first = date.fromisoformat(start)
+    return tuple((first + timedelta(days=offset)).isoformat() for offset in range(HISTORY_DAYS))
+
+
+def decode_history(start: Optional[str], codes: Optional[bytes]) -> List[dict]:
+    """Unpack (start day, codes) into the `{date, status}` entries the API returns."""
+    if not start or not codes:
+        return []
+    days = _day_strings(start)
+    return [
+        {"date": day, "status": CODE_STATUSES[code]}
+        for day, code in zip(days, codes)
+        if code in CODE_STATUSES
+    ]
+
+
+def stored_history(doc: dict) -> History:
+    """(start day, codes) of a raw feature document, converting a legacy `history` list."""
+    if doc.get("historyCodes") is not None:
+        return doc.get("historyStart"), bytes(doc["historyCodes"])
+    return encode_history(doc.get("history") or [])
+
+
+def record_status(history: History, status: FeatureStatusEnum, today: date) -> History:
+    """Set `today`'s code, replacing any earlier entry for the same day."""
+    start, codes = history
+    if not start or not codes:
+        return today.isoformat(), bytes([STATUS_CODES[status]])
+    first = date.fromisoformat(start)
+    offset = (today - first).days
+    if offset < 0:
+        # Today precedes the stored start (clock change); rebuild from entries
+        return encode_history(decode_history(start, codes) + [{"date": today.isoformat(), "status": status}])
+    buffer = bytearray(codes)
+    if offset >= len(buffer):
+        buffer.extend(bytes(offset - len(buffer) + 1))
+    buffer[offset] = STATUS_CODES[status]
+    return _trim(first, buffer)
+
+
+def is_legacy(doc: dict) -> bool:
+    return doc.get("historyCodes") is None
+
+
+def history_guard(doc: dict, today: date) -> dict:
+    """
+    Filter matching a packed feature while its history is as read in `doc`,
+    or as any other status write made today would have left it.
+
+    Writers on the same day only differ in today's code, so they need not
+    retry for each other; a mismatch means the start moved or a write from
+    another day got in between.
+    """
+    read = stored_history(doc)
+    states = {read} | {record_status(read, status, today) for status in STATUS_CODES}
+    return {"$or": [{"historyStart": start, "historyCodes": Binary(codes)} for start, codes in states]}
+
+
+def history_set_fields(history: History) -> dict:
+    start, codes = history
+    return {"historyStart": start, "historyCodes": Binary(codes)}
+
+
+def feature_to_dict(doc: dict) -> dict:
+    """A raw feature document with its packed history converted to `history` entries."""
+    history = stored_history(doc)
+    converted = {key: value for key, value in doc.items() if key not in HISTORY_FIELDS}
+    converted["history"] = decode_history(*history)
+    return converted
+
+
+def legacy_conversion(doc: dict) -> Tuple[dict, dict]:
+    """
+    Filter and update packing the legacy `history` list of `doc`, moving the
+    list to `legacyHistory`.
+
+    Guarded on the document still being unpacked, so whichever conversion
+    gets there first wins.
+    """
+    update = {"$set": history_set_fields(stored_history(doc))}
+    if "history" in doc:
+        update["$rename"] = {"history": "legacyHistory"}
+    return {"_id": doc["_id"], "historyCodes": {"$exists": False}}, update
+
+
+async def convert_legacy_history(doc: dict) -> None:
+    await Feature.get_motor_collection().update_one(*legacy_conversion(doc))
+
+
+async def migrate_feature_history() -> int:
+    """
+    Pack features still storing a legacy `history` list. Returns the number converted.
+
+    Entries older than HISTORY_DAYS are not packed; they stay in `legacyHistory`.
+    """
+    collection = Feature.get_motor_collection()
+    legacy = await collection.find(
+        {"history": {"$exists": True}, "historyCodes": {"$exists": False}}, {"history": 1}
+    ).to_list(length=None)
+    if not legacy:
+        return 0
+    await collection.bulk_write([UpdateOne(*legacy_conversion(doc)) for doc in legacy], ordered=False)
+    return len(legacy)
+
+
+def status_matrix(docs: List[dict], today: date) -> np.ndarray:
+    """
+    Daily status codes of every feature as a (features x HISTORY_DAYS) array
+    ending today.
+
+    A status holds until the next recorded change, so days without an entry
+    take the previous day's code. Today's column falls back to the current
+    status. Days before a feature's first entry stay NO_ENTRY.
+    """
+    histories = [stored_history(doc) for doc in docs]
+    lengths = np.array([len(codes) for _, codes in histories], dtype=np.int64)
+    starts = np.array([start or today.isoformat() for start, _ in histories], dtype="datetime64[D]")
+    codes = np.frombuffer(b"".join(codes for _, codes in histories), dtype=np.uint8)
+
+    # Column of each packed byte: its feature's start column plus its offset
+    first_columns = HISTORY_DAYS - 1 - (np.datetime64(today, "D") - starts).astype(np.int64)
+    row_offsets = np.cumsum(lengths) - lengths
+    rows = np.repeat(np.arange(len(docs)), lengths)
+    columns = np.repeat(first_columns - row_offsets, lengths) + np.arange(len(codes))
+    inside = (columns >= 0) & (columns < HISTORY_DAYS)
+
+    matrix = np.zeros((len(docs), HISTORY_DAYS), dtype=np.uint8)
+    matrix[rows[inside], columns[inside]] = codes[inside]
+
+    current = np.array([STATUS_CODES.get(doc.get("status"), NO_ENTRY) for doc in docs], dtype=np.uint8)
+    matrix[:, -1] = np.where(matrix[:, -1] == NO_ENTRY, current, matrix[:, -1])
+
+    # Forward-fill: index of the latest recorded day at or before each column
+    latest = np.where(matrix != NO_ENTRY, np.arange(HISTORY_DAYS), 0)
+    np.maximum.accumulate(latest, axis=1, out=latest)
+    return np.take_along_axis(matrix, latest, axis=1)
+
+
+def uptime_summary(docs: List[dict], today: date) -> List[dict]:
+    """Share of days operational, degraded and critical per feature over each UPTIME_WINDOWS window."""
+    if not docs:
+        return []
+    matrix = status_matrix(docs, today)
+    per_window = {}
+    for days in UPTIME_WINDOWS:
+        window = matrix[:, -days:]
+        known = np.count_nonzero(window, axis=1)
+        counts = np.stack([np.count_nonzero(window == code, axis=1) for code in CODE_STATUSES], axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            percentages = np.round(counts * 100.0 / known[:, None], 2)
+        per_window[days] = (known.tolist(), percentages.tolist())
+
+    results = []
+    for index, doc in enumerate(docs):
+        windows = {}
+        for days, (known, percentages) in per_window.items():
+            uptime, degraded, critical = percentages[index] if known[index] else (None, None, None)
+            windows[f"{days}d"] = {
+                "uptime": uptime,
+                "degraded": degraded,
+                "critical": critical,
+                "daysWithData": known[index],
+            }
+        results.append({
+            "id": str(doc["_id"]),
+            "name": doc["name"],
+            "status": doc["status"],
+            "windows": windows,
+        })
+    return results
@@ -0,0 +1,205 @@
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from pymongo import monitoring
+import threading
+import time
+
+# Upper bounds in seconds; Prometheus' defaults plus finer steps for Mongo round trips
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# "METHOD /path" of the request being served; Motor copies the context into
+# its worker threads, so command listeners can attribute commands to it
+current_request: ContextVar[Optional[str]] = ContextVar("current_request", default=None)
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram in the Prometheus layout."""
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Labels, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def format_histogram(name: str, help_text: str, series: Dict[Labels, Histogram]) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for labels, histogram in sorted(series.items()):
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, histogram.counts):
+            cumulative += count
+            bucket_labels = _labels(labels, f'le="{bound}"')
+            lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+        inf_labels = _labels(labels, 'le="+Inf"')
+        lines.append(f"{name}_bucket{inf_labels} {histogram.count}")
+        lines.append(f"{name}_sum{_labels(labels)} {histogram.sum:.6f}")
+        lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+    return lines
+
+
+def format_metric(name: str, kind: str, help_text: str, series: Dict[Labels, float]) -> List[str]:
+    """Lines for a counter or gauge; `series` maps label tuples to values."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for labels, value in sorted(series.items()):
+        lines.append(f"{name}{_labels(labels)} {value}")
+    return lines
+
+
+class RequestMetrics:
+    """
+    Per-route request latency, status counts and in-flight requests.
+
+    Routes are labelled by their path template (e.g. `/features/{id}`), so
+    label cardinality is bounded by the number of routes.
+    """
+
+    def __init__(self):
+        self.in_flight = 0
+        self.latency: Dict[Labels, Histogram] = {}
+        self.responses: Dict[Labels, int] = {}
+
+    def observe(self, method: str, route: str, status: int, seconds: float) -> None:
+        key = (("method", method), ("route", route))
+        histogram = self.latency.get(key)
+        if histogram is None:
+            histogram = self.latency[key] = Histogram()
+        histogram.observe(seconds)
+        status_key = key + (("status", str(status)),)
+        self.responses[status_key] = self.responses.get(status_key, 0) + 1
+
+    def render(self) -> List[str]:
+        return (
+            format_metric("http_requests_in_flight", "gauge", "Requests currently being served",
+                          {(): self.in_flight})
+            + format_metric("http_responses_total", "counter", "Responses by route and status code",
+                            self.responses)
+            + format_histogram("http_request_duration_seconds", "Request latency by route",
+                               self.latency)
+        )
+
+
+class MetricsMiddleware:
+    """ASGI middleware feeding `request_metrics`; runs outside any routing work."""
+
+    def __init__(self, app, metrics: Optional[RequestMetrics] = None):
+        self.app = app
+        self.metrics = metrics or request_metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = self.metrics
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        current_request.set(f"{scope['method']} {scope['path']}")
+        metrics.in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.in_flight -= 1
+            metrics.observe(scope["method"], route_template(scope), status_code, time.perf_counter() - started)
+
+
+def route_template(scope) -> str:
+    """
+    The matched route's path template, e.g. `/features/{id}`.
+
+    Read from the route's `path_format`. FastAPI versions that include routers
+    lazily leave the router prefix off the route itself and put the full
+    template on the effective route context instead, so that is preferred
+    when present. Requests no route matched share one label.
+    """
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    effective = scope.get("fastapi", {}).get("effective_route_context")
+    return getattr(effective, "path_format", None) or route.path_format
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """
+    Per-collection, per-command Mongo durations.
+
+    Only collections registered with `track_collections` are recorded, which
+    keeps handshakes, pings and other admin commands out of the series.
+    Listener callbacks run on the driver's threads, hence the lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._collections: Set[str] = set()
+        self._pending: Dict[Tuple, str] = {}
+        self.latency: Dict[Labels, Histogram] = {}
+        self.failures: Dict[Labels, int] = {}
+
+    def track_collections(self, names: Iterable[str]) -> None:
+        self._collections = set(names)
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        if event.command_name == "getMore":
+            collection = event.command.get("collection")
+        if isinstance(collection, str) and collection in self._collections:
+            with self._lock:
+                self._pending[(event.connection_id, event.request_id)] = collection
+
+    def _finish(self, event, failed: bool):
+        with self._lock:
+            collection = self._pending.pop((event.connection_id, event.request_id), None)
+            if collection is None:
+                return
+            key = (("collection", collection), ("command", event.command_name))
+            histogram = self.latency.get(key)
+            if histogram is None:
+                histogram = self.latency[key] = Histogram()
+            histogram.observe(event.duration_micros / 1e6)
+            if failed:
+                self.failures[key] = self.failures.get(key, 0) + 1
+
+    def succeeded(self, event):
+        self._finish(event, failed=False)
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            return (
+                format_histogram("mongo_command_duration_seconds", "Mongo command latency by collection",
+                                 self.latency)
+                + format_metric("mongo_command_failures_total", "counter", "Failed Mongo commands",
+                                self.failures)
+            )
+
+
+request_metrics = RequestMetrics()
+command_metrics = CommandMetrics()
@@ -0,0 +1,39 @@
+from beanie import PydanticObjectId
+from datetime import datetime
+from typing import Tuple
+import base64
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+
+def encode_cursor(sort_value: datetime, doc_id: PydanticObjectId) -> str:
+    """Build an opaque cursor from a document's sort key and ID."""
+    raw = f"{sort_value.isoformat()}|{doc_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, PydanticObjectId]:
+    """Inverse of `encode_cursor`. Raises ValueError on malformed input."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        sort_raw, id_raw = raw.split("|", 1)
+        return datetime.fromisoformat(sort_raw), PydanticObjectId(id_raw)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def keyset_after(field: str, cursor: str) -> dict:
+    """
+    Filter matching documents strictly after `cursor` in (-field, -_id) order.
+
+    Combine with the caller's own filters and sort by `-field, -_id`.
+    """
+    sort_value, doc_id = decode_cursor(cursor)
+    return {
+        "$or": [
+            {field: {"$lt": sort_value}},
+            {field: sort_value, "_id": {"$lt": doc_id}},
+        ]
+    }
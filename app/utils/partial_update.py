@@ -0,0 +1,122 @@
+import asyncio
+from fastapi import HTTPException, status
+from beanie import Document, PydanticObjectId
+from pydantic import field_validator
+from pymongo import ReturnDocument
+from typing import Any, Awaitable, Dict, List, Optional, Tuple, Type, TypeVar
+
+from app.models.bulk import BulkItemStatus
+
+DocumentT = TypeVar("DocumentT", bound=Document)
+
+
+def reject_null(*fields: str):
+    """
+    Field validator for PATCH models rejecting an explicit null for `fields`.
+
+    Updates are built with `exclude_unset`, so `{"name": null}` would otherwise
+    be written into a field the document requires.
+    """
+    def check(cls, value):
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
+    return field_validator(*fields, mode="before")(check)
+
+
+def revision_filter(id: PydanticObjectId, expected_revision: Optional[int] = None) -> Dict[str, Any]:
+    """Match a document, optionally only at `expected_revision`."""
+    query: Dict[str, Any] = {"_id": id}
+    if expected_revision is not None:
+        # Documents written before revisions existed have no field; treat as 0
+        query["revision"] = expected_revision if expected_revision else {"$in": [0, None]}
+    return query
+
+
+def revision_update(fields: Dict[str, Any], extra_set: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """Pipeline update setting `fields` literally and bumping the revision."""
+    set_stage = {field: {"$literal": value} for field, value in fields.items()}
+    set_stage["revision"] = {"$add": [{"$ifNull": ["$revision", 0]}, 1]}
+    if extra_set:
+        set_stage.update(extra_set)
+    return [{"$set": set_stage}]
+
+
+async def update_with_revision(
+    model: Type[DocumentT],
+    id: PydanticObjectId,
+    fields: Dict[str, Any],
+    expected_revision: Optional[int] = None,
+    extra_set: Optional[Dict[str, Any]] = None,
+    not_found: str = "Document not found",
+) -> Tuple[DocumentT, DocumentT]:
+    """
+    Apply a partial update as a single `$set` and bump the document's revision.
+
+    When `expected_revision` is given the write only matches that revision and
+    a mismatch raises 409. `extra_set` adds raw aggregation expressions that
+    are evaluated against the pre-update document.
+
+    Returns the document before and after the update. The "after" copy is
+    derived locally from the "before" image, so callers that use `extra_set`
+    must mirror those fields on it themselves.
+    """
+    collection = model.get_motor_collection()
+    before = await collection.find_one_and_update(
+        revision_filter(id, expected_revision),
+        revision_update(fields, extra_set),
+        return_document=ReturnDocument.BEFORE,
+    )
+    if before is None:
+        if expected_revision is not None and await collection.count_documents({"_id": id}, limit=1):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Document was modified by another request"
+            )
+        raise HTTPException(status_code=404, detail=not_found)
+
+    after = {**before, **fields, "revision": before.get("revision", 0) + 1}
+    return model.model_validate(before), model.model_validate(after)
+
+
+def parse_bulk_ids(raw_ids: List[str]) -> Tuple[List[Optional[PydanticObjectId]], Dict[int, BulkItemStatus]]:
+    """
+    Parse the item IDs of a bulk request.
+
+    Returns the parsed IDs by position (None where unusable) and the failure
+    status for invalid or repeated IDs; only the first occurrence of an ID is
+    applied.
+    """
+    ids: List[Optional[PydanticObjectId]] = []
+    failures: Dict[int, BulkItemStatus] = {}
+    seen = set()
+    for index, raw in enumerate(raw_ids):
+        try:
+            oid = PydanticObjectId(raw)
+        except Exception:
+            failures[index] = BulkItemStatus.INVALID_ID
+            ids.append(None)
+            continue
+        if oid in seen:
+            failures[index] = BulkItemStatus.DUPLICATE
+            ids.append(None)
+            continue
+        seen.add(oid)
+        ids.append(oid)
+    return ids, failures
+
+
+async def gather_bounded(awaitables: List[Awaitable[Any]], limit: int) -> List[Any]:
+    """
+    Await bulk item writes concurrently, at most `limit` at a time.
+
+    Returns each result or the exception it raised, by position, so one
+    failing item does not hide what the others wrote.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def bounded(awaitable: Awaitable[Any]) -> Any:
+        async with semaphore:
+            return await awaitable
+
+    return await asyncio.gather(*(bounded(awaitable) for awaitable in awaitables), return_exceptions=True)
@@ -0,0 +1,96 @@
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+from collections import defaultdict
+
+from app.config import settings
+from app.utils.cache import TTLCache
+
+
+class CacheBackend(ABC):
+    """
+    Storage for cached responses.
+
+    The default backend is in-process. A shared store (e.g. Redis) can be
+    plugged in with `response_cache.set_backend(...)` so that invalidations
+    made by one worker are seen by all of them.
+    """
+
+    @abstractmethod
+    async def get(self, key: Hashable) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, key: Hashable) -> None:
+        ...
+
+
+class MemoryCacheBackend(CacheBackend):
+    def __init__(self, max_size: int = 256):
+        self._cache = TTLCache(max_size=max_size)
+
+    async def get(self, key: Hashable) -> Optional[Any]:
+        return self._cache.get(key)
+
+    async def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        self._cache.set(key, value, ttl=ttl)
+
+    async def delete(self, key: Hashable) -> None:
+        self._cache.invalidate(key)
+
+
+class ResponseCache:
+    """
+    Read-through cache for endpoint payloads with per-key hit/miss counters.
+
+    Counters are kept per `metric_key` when one is given, so keys that embed
+    a changing part (e.g. a time bucket) don't grow the counters or the
+    /metrics labels without bound.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float = 30.0):
+        self.backend = backend
+        self.ttl = ttl
+        self._hits: Dict[Hashable, int] = defaultdict(int)
+        self._misses: Dict[Hashable, int] = defaultdict(int)
+
+    def set_backend(self, backend: CacheBackend) -> None:
+        self.backend = backend
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None,
+        metric_key: Optional[Hashable] = None
+    ) -> Any:
+        metric_key = key if metric_key is None else metric_key
+        value = await self.backend.get(key)
+        if value is not None:
+            self._hits[metric_key] += 1
+            return value
+        self._misses[metric_key] += 1
+        value = await loader()
+        if value is not None:
+            await self.backend.set(key, value, self.ttl if ttl is None else ttl)
+        return value
+
+    async def invalidate(self, *keys: Hashable) -> None:
+        for key in keys:
+            await self.backend.delete(key)
+
+    def stats(self) -> dict:
+        keys = set(self._hits) | set(self._misses)
+        return {
+            str(key): {"hits": self._hits[key], "misses": self._misses[key]}
+            for key in sorted(keys, key=str)
+        }
+
+
+response_cache = ResponseCache(
+    MemoryCacheBackend(max_size=settings.RESPONSE_CACHE_MAX_SIZE),
+    ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+)
@@ -1,17 +1,57 @@
 from passlib.context import CryptContext
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
+import asyncio
+import hashlib
+import time
 import jwt
 from app.config import settings
+from app.utils.cache import TTLCache
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt is CPU bound and releases the GIL, so run it off the event loop on a
+# small dedicated pool; callers beyond the pool size wait in its queue.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="bcrypt",
+)
+_hash_in_flight = 0
+
+# Already-verified token payloads keyed by a digest of the token
+token_cache = TTLCache(max_size=settings.TOKEN_CACHE_MAX_SIZE)
+
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+async def _run_in_hash_pool(func, *args):
+    global _hash_in_flight
+    _hash_in_flight += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_hash_executor, func, *args)
+    finally:
+        _hash_in_flight -= 1
+
+async def hash_password_async(password: str) -> str:
+    return await _run_in_hash_pool(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_in_hash_pool(verify_password, plain_password, hashed_password)
+
+def password_pool_stats() -> dict:
+    """In-flight and queued bcrypt calls on the hashing pool."""
+    workers = settings.PASSWORD_HASH_WORKERS
+    return {
+        "workers": workers,
+        "inFlight": _hash_in_flight,
+        "queueDepth": max(0, _hash_in_flight - workers),
+    }
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     if expires_delta:
@@ -23,10 +63,24 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 def decode_access_token(token: str) -> Optional[dict]:
+    key = hashlib.sha256(token.encode()).digest()
+    cached = token_cache.get(key)
+    if cached is not None:
+        # The cache deadline is monotonic; re-check the wall-clock `exp` so a
+        # cached token can never outlive the token itself.
+        if cached["exp"] > time.time():
+            return dict(cached)
+        token_cache.invalidate(key)
+        return None
+
     try:
         payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
-        return payload
     except jwt.ExpiredSignatureError:
         return None
     except jwt.InvalidTokenError:
         return None
+
+    exp = payload.get("exp")
+    if exp is not None:
+        token_cache.set(key, dict(payload), ttl=exp - time.time())
+    return payload
@@ -0,0 +1,207 @@
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set
+from bson import json_util
+from pymongo import monitoring
+import asyncio
+import itertools
+import json
+import logging
+import threading
+
+from app.config import settings
+from app.utils.metrics import current_request
+
+logger = logging.getLogger(__name__)
+
+# Commands `explain` accepts; explaining a write only plans it, nothing is modified
+EXPLAINABLE_COMMANDS = {"find", "aggregate", "count", "distinct", "update", "delete", "findAndModify"}
+
+# Driver/session fields that `explain` rejects or that don't affect the plan
+_SESSION_FIELDS = {"lsid", "$db", "$clusterTime", "$readPreference", "txnNumber", "readConcern", "writeConcern"}
+
+MAX_CONCURRENT_EXPLAINS = 2
+
+
+def _json_safe(value: Any) -> Any:
+    """BSON values (ObjectId, datetime) as relaxed extended JSON."""
+    return json.loads(json_util.dumps(value))
+
+
+def _query_shape(command_name: str, command: dict) -> Dict[str, Any]:
+    """The parts of a command that decide its plan."""
+    if command_name in ("update", "delete"):
+        statements = command.get("updates") or command.get("deletes") or [{}]
+        return {"filter": statements[0].get("q"), "statements": len(statements)}
+    if command_name == "aggregate":
+        return {"pipeline": command.get("pipeline")}
+    shape = {"filter": command.get("filter", command.get("query"))}
+    for field in ("sort", "projection", "limit", "skip", "key"):
+        if field in command:
+            shape[field] = command[field]
+    return shape
+
+
+def _find_key(document: Any, key: str) -> Optional[Any]:
+    """Depth-first search for `key` in nested explain output."""
+    if isinstance(document, dict):
+        if key in document:
+            return document[key]
+        values: Iterable = document.values()
+    elif isinstance(document, list):
+        values = document
+    else:
+        return None
+    for value in values:
+        found = _find_key(value, key)
+        if found is not None:
+            return found
+    return None
+
+
+def summarize_plan(explain: dict) -> Dict[str, Any]:
+    """Stage chain and index usage of the winning plan."""
+    winning = _find_key(explain, "winningPlan") or {}
+    stages = []
+    indexes = []
+    node = winning.get("queryPlan", winning)
+    while isinstance(node, dict) and node:
+        if "stage" in node:
+            stages.append(node["stage"])
+        if "indexName" in node:
+            indexes.append(node["indexName"])
+        node = node.get("inputStage") or (node.get("inputStages") or [None])[0]
+    return {
+        "stages": stages,
+        "indexes": indexes,
+        "collectionScan": "COLLSCAN" in stages,
+        "winningPlan": _json_safe(winning),
+    }
+
+
+class SlowCommandLog(monitoring.CommandListener):
+    """
+    Ring buffer of Mongo commands slower than a threshold.
+
+    Each entry records the collection, query shape, duration and the request
+    that issued it. For read and write commands the query plan is then
+    captured with `explain` on the event loop, off the request path; at most
+    MAX_CONCURRENT_EXPLAINS run at once and further plans are skipped.
+    """
+
+    def __init__(self, threshold_ms: Optional[float], max_entries: int = 200, explain: bool = True):
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self._entries: deque = deque(maxlen=max_entries)
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._collections: Set[str] = set()
+        self._pending: Dict[tuple, tuple] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._database = None
+        self._explaining = 0
+        self.recorded = 0
+        self.explains_skipped = 0
+
+    def track_collections(self, names: Iterable[str], database, loop: asyncio.AbstractEventLoop) -> None:
+        """Watch these collections and run explains through `database` on `loop`."""
+        self._collections = set(names)
+        self._database = database
+        self._loop = loop
+
+    def started(self, event):
+        if self.threshold_ms is None:
+            return
+        collection = event.command.get(event.command_name)
+        if event.command_name == "getMore":
+            collection = event.command.get("collection")
+        if isinstance(collection, str) and collection in self._collections:
+            with self._lock:
+                self._pending[(event.connection_id, event.request_id)] = (
+                    collection, event.command, current_request.get()
+                )
+
+    def _finish(self, event, failed: bool):
+        with self._lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+        duration_ms = event.duration_micros / 1000
+        if duration_ms < self.threshold_ms:
+            return
+
+        collection, command, request = pending
+        entry = {
+            "id": next(self._ids),
+            "at": datetime.utcnow().isoformat(),
+            "collection": collection,
+            "command": event.command_name,
+            "durationMs": round(duration_ms, 3),
+            "request": request,
+            "failed": failed,
+            "query": _json_safe(_query_shape(event.command_name, command)),
+            "plan": None,
+        }
+        with self._lock:
+            self._entries.append(entry)
+            self.recorded += 1
+        logger.warning("Slow Mongo %s on %s: %.1f ms (%s)", event.command_name, collection, duration_ms, request)
+
+        if self.explain and event.command_name in EXPLAINABLE_COMMANDS and self._loop is not None:
+            self._schedule_explain(entry, command)
+
+    def _schedule_explain(self, entry: dict, command: dict) -> None:
+        with self._lock:
+            if self._explaining >= MAX_CONCURRENT_EXPLAINS:
+                self.explains_skipped += 1
+                return
+            self._explaining += 1
+        explained = {key: value for key, value in command.items() if key not in _SESSION_FIELDS}
+        try:
+            asyncio.run_coroutine_threadsafe(self._explain(entry, explained), self._loop)
+        except RuntimeError:
+            # Loop already closed (shutdown)
+            with self._lock:
+                self._explaining -= 1
+
+    async def _explain(self, entry: dict, command: dict) -> None:
+        try:
+            result = await self._database.command({"explain": command, "verbosity": "queryPlanner"})
+            entry["plan"] = summarize_plan(result)
+        except Exception as exc:
+            entry["plan"] = {"error": f"{type(exc).__name__}: {exc}"}
+        finally:
+            with self._lock:
+                self._explaining -= 1
+
+    def succeeded(self, event):
+        self._finish(event, failed=False)
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
+    def entries(self, limit: Optional[int] = None) -> List[dict]:
+        """Newest first."""
+        with self._lock:
+            entries = list(reversed(self._entries))
+        return entries[:limit] if limit is not None else entries
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "thresholdMs": self.threshold_ms,
+            "size": len(self._entries),
+            "maxSize": self._entries.maxlen,
+            "recorded": self.recorded,
+            "explainsSkipped": self.explains_skipped,
+        }
+
+
+slow_command_log = SlowCommandLog(
+    threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+    max_entries=settings.SLOW_QUERY_LOG_SIZE,
+    explain=settings.SLOW_QUERY_EXPLAIN,
+)
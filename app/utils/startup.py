@@ -0,0 +1,53 @@
+from contextlib import contextmanager
+from typing import Awaitable, Dict, Set
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Phase name -> duration in milliseconds, reported at /health/startup
+startup_timings: Dict[str, float] = {}
+_background_tasks: Set[asyncio.Task] = set()
+
+
+def record_timing(phase: str, started: float) -> None:
+    startup_timings[phase] = round((time.perf_counter() - started) * 1000, 3)
+
+
+@contextmanager
+def timed(phase: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_timing(phase, started)
+
+
+def run_in_background(phase: str, work: Awaitable) -> None:
+    """Run non-critical startup work after the app starts serving, timing it."""
+    async def runner():
+        started = time.perf_counter()
+        try:
+            await work
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Background startup step %s failed", phase)
+        else:
+            record_timing(phase, started)
+            logger.info("Background startup step %s took %.1f ms", phase, startup_timings[phase])
+
+    task = asyncio.create_task(runner(), name=f"startup-{phase}")
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+def pending_background_steps() -> list:
+    return sorted(task.get_name().removeprefix("startup-") for task in _background_tasks)
+
+
+async def cancel_background_tasks() -> None:
+    for task in list(_background_tasks):
+        task.cancel()
+    await asyncio.gather(*_background_tasks, return_exceptions=True)
@@ -0,0 +1,158 @@
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+from pymongo import UpdateOne
+
+from app.config import settings
+from app.models.dashboard import ChartDataPoint
+from app.models.task import Task, TaskDailyRollup, TaskStatus
+from app.utils.etag import bump_version
+from app.utils.response_cache import response_cache
+
+BURNUP_CACHE_KEY = "dashboard:charts:burnup"
+VELOCITY_CACHE_KEY = "dashboard:charts:velocity"
+
+# Tasks carry no created timestamp, so scope is dated by the ObjectId. Done
+# tasks without `completedAt` (e.g. seeded ones) count as done on that day too.
+_ROLLUP_PIPELINE = [
+    {"$project": {
+        "created": {"$dateToString": {"format": "%Y-%m-%d", "date": {"$toDate": "$_id"}}},
+        "done": {"$cond": [
+            {"$eq": ["$status", TaskStatus.DONE.value]},
+            {"$dateToString": {
+                "format": "%Y-%m-%d",
+                "date": {"$ifNull": ["$completedAt", {"$toDate": "$_id"}]},
+            }},
+            None,
+        ]},
+    }},
+    {"$facet": {
+        "scope": [{"$group": {"_id": "$created", "count": {"$sum": 1}}}],
+        "done": [
+            {"$match": {"done": {"$ne": None}}},
+            {"$group": {"_id": "$done", "count": {"$sum": 1}}},
+        ],
+    }},
+]
+
+
+def completion_day(task: Task) -> str:
+    """The rollup day a done task's completion is counted on."""
+    completed_at = task.completedAt or task.id.generation_time
+    return completed_at.strftime("%Y-%m-%d")
+
+
+async def _invalidate_charts() -> None:
+    bump_version(TaskDailyRollup)
+    await response_cache.invalidate(BURNUP_CACHE_KEY, VELOCITY_CACHE_KEY)
+
+
+def transition_delta(
+    old_status: TaskStatus,
+    new_status: TaskStatus,
+    old_completed_day: Optional[str],
+    new_completed_day: Optional[str],
+) -> Dict[str, int]:
+    """Per-day completion changes for one task status transition."""
+    if old_status != TaskStatus.DONE and new_status == TaskStatus.DONE:
+        return {new_completed_day: 1}
+    if old_status == TaskStatus.DONE and new_status != TaskStatus.DONE:
+        return {old_completed_day: -1}
+    return {}
+
+
+async def record_completion_changes(deltas: Dict[str, int]) -> None:
+    """Atomically add completions to each day's bucket in one bulk write."""
+    ops = [
+        UpdateOne(
+            {"day": day},
+            {"$inc": {"completed": delta}, "$setOnInsert": {"scopeAdded": 0}},
+            upsert=True,
+        )
+        for day, delta in deltas.items() if delta
+    ]
+    if not ops:
+        return
+    await TaskDailyRollup.get_motor_collection().bulk_write(ops, ordered=False)
+    await _invalidate_charts()
+
+
+async def apply_task_transition(task: Task, old_status: TaskStatus, old_completed_day: Optional[str]) -> None:
+    """Update the rollups after `task` moved from `old_status` to its current status."""
+    new_completed_day = completion_day(task) if task.status == TaskStatus.DONE else None
+    await record_completion_changes(
+        transition_delta(old_status, task.status, old_completed_day, new_completed_day)
+    )
+
+
+async def rebuild_task_rollups() -> int:
+    """
+    Recompute every daily bucket from the tasks collection. Returns the bucket count.
+
+    Buckets are overwritten in place and stale days removed afterwards, so the
+    charts never read an empty or half-written collection meanwhile.
+    """
+    result = await Task.get_motor_collection().aggregate(_ROLLUP_PIPELINE).to_list(length=None)
+    facets = result[0] if result else {"scope": [], "done": []}
+
+    buckets: Dict[str, Dict[str, int]] = {}
+    for row in facets["scope"]:
+        buckets.setdefault(row["_id"], {"scopeAdded": 0, "completed": 0})["scopeAdded"] = row["count"]
+    for row in facets["done"]:
+        buckets.setdefault(row["_id"], {"scopeAdded": 0, "completed": 0})["completed"] = row["count"]
+
+    collection = TaskDailyRollup.get_motor_collection()
+    if buckets:
+        await collection.bulk_write([
+            UpdateOne({"day": day}, {"$set": counts}, upsert=True) for day, counts in buckets.items()
+        ], ordered=False)
+    await collection.delete_many({"day": {"$nin": list(buckets)}})
+    await _invalidate_charts()
+    return len(buckets)
+
+
+async def ensure_task_rollups() -> None:
+    """
+    Build the rollups if there are none yet, e.g. on the first start against
+    an existing database; otherwise completions would be counted onto empty
+    buckets with no scope.
+    """
+    if await TaskDailyRollup.find_one() is None:
+        await rebuild_task_rollups()
+
+
+async def load_burnup() -> List[ChartDataPoint]:
+    """Cumulative scope and completion per active day within the burnup window."""
+    cutoff = (datetime.utcnow().date() - timedelta(days=settings.BURNUP_WINDOW_DAYS)).isoformat()
+    collection = TaskDailyRollup.get_motor_collection()
+    # Days before the window only contribute their totals
+    before = await collection.aggregate([
+        {"$match": {"day": {"$lt": cutoff}}},
+        {"$group": {"_id": None, "scopeAdded": {"$sum": "$scopeAdded"}, "completed": {"$sum": "$completed"}}},
+    ]).to_list(length=1)
+    total_scope = before[0]["scopeAdded"] if before else 0
+    completed = before[0]["completed"] if before else 0
+
+    points = []
+    async for rollup in collection.find({"day": {"$gte": cutoff}}).sort("day", 1):
+        total_scope += rollup["scopeAdded"]
+        completed += rollup["completed"]
+        points.append(ChartDataPoint(name=rollup["day"], totalScope=total_scope, completed=completed))
+    return points
+
+
+async def load_velocity() -> List[ChartDataPoint]:
+    """Completions per sprint for the most recent VELOCITY_SPRINTS sprints."""
+    sprint_start = date.fromisoformat(settings.SPRINT_START_DATE)
+    length = settings.SPRINT_LENGTH_DAYS
+    current = (datetime.utcnow().date() - sprint_start).days // length
+    # Only the buckets of the sprints shown are read, however long the project has run
+    first_sprint = max(0, current - settings.VELOCITY_SPRINTS + 1)
+    first_day = (sprint_start + timedelta(days=first_sprint * length)).isoformat()
+    rollups = await TaskDailyRollup.find(TaskDailyRollup.day >= first_day).sort("day").to_list()
+
+    per_sprint: Dict[int, int] = {}
+    for rollup in rollups:
+        sprint = (date.fromisoformat(rollup.day) - sprint_start).days // length
+        per_sprint[sprint] = per_sprint.get(sprint, 0) + rollup.completed
+
+    return [ChartDataPoint(name=f"Sprint {s + 1}", velocity=per_sprint[s]) for s in sorted(per_sprint)]
@@ -0,0 +1,70 @@
+"""
+Feature history: stored size of the legacy entry list vs the packed codes, and
+the cost of the uptime computation.
+
+    python benchmarks/feature_history.py --features 5000 --rounds 10
+
+Sizes are BSON-encoded `history` vs `historyStart` + `historyCodes` for 60
+days of history. Uptime times `uptime_summary` over every feature at once,
+as GET /features/uptime does.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+import bson
+from bson import ObjectId
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+
+from app.models.feature import FeatureStatusEnum  # noqa: E402
+from app.utils.feature_history import HISTORY_DAYS, encode_history, uptime_summary  # noqa: E402
+
+
+def legacy_history(rng: random.Random, today: date) -> list:
+    statuses = [status.value for status in FeatureStatusEnum]
+    return [
+        {"date": (today - timedelta(days=d)).isoformat(), "status": rng.choices(statuses, [0.85, 0.1, 0.05])[0]}
+        for d in range(HISTORY_DAYS - 1, -1, -1)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--features", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    today = date.today()
+    docs = []
+    legacy_bytes = packed_bytes = 0
+    for i in range(args.features):
+        history = legacy_history(rng, today)
+        start, codes = encode_history(history)
+        legacy_bytes += len(bson.encode({"history": history}))
+        packed_bytes += len(bson.encode({"historyStart": start, "historyCodes": codes}))
+        docs.append({
+            "_id": ObjectId(), "name": f"Feature {i}", "status": history[-1]["status"],
+            "historyStart": start, "historyCodes": codes,
+        })
+
+    print(f"history bytes/feature: legacy {legacy_bytes / args.features:.0f}, "
+          f"packed {packed_bytes / args.features:.0f} ({legacy_bytes / packed_bytes:.1f}x smaller)")
+
+    timings = []
+    for _ in range(args.rounds):
+        started = time.perf_counter()
+        uptime_summary(docs, today)
+        timings.append(time.perf_counter() - started)
+    median = statistics.median(timings)
+    print(f"uptime for {args.features} features: {median * 1000:.1f} ms ({median / args.features * 1e6:.2f} µs/feature)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,542 @@
+"""
+End-to-end load benchmark for every router.
+
+Seeds a dedicated database with generated data, drives each endpoint with
+concurrent clients and reports req/s and p50/p95/p99 latency per endpoint.
+
+    # In-process against a local mongod (the database is wiped and reseeded)
+    python benchmarks/load_suite.py --mongo-uri mongodb://localhost:27017
+
+    # In-process against an in-memory mock (pip install mongomock-motor)
+    python benchmarks/load_suite.py --mock
+
+    # Against a running server that uses the same database
+    python benchmarks/load_suite.py --mongo-uri mongodb://localhost:27017 --base-url http://localhost:8080
+
+Save a baseline and compare a later run against it (the committed
+benchmarks/load_baseline.json is a mock run made this way; compare with the
+same flags on comparable hardware):
+
+    python benchmarks/load_suite.py --mock --scale 0.05 --save-baseline benchmarks/load_baseline.json
+    python benchmarks/load_suite.py --mock --scale 0.05 --compare benchmarks/load_baseline.json
+
+The mock cannot evaluate aggregation-pipeline updates or rebuild the chart
+and activity rollups, so endpoints that rely on them are skipped or served
+empty with --mock; use a real mongod for full coverage.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+BENCH_DATABASE = "jobpromax_bench"
+BENCH_PASSWORD = "bench123"
+INSERT_BATCH = 1000
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+# ---------------------------------------------------------------------------
+# Data generation
+# ---------------------------------------------------------------------------
+
+@dataclass
+class SeedSizes:
+    users: int = 25
+    features: int = 60
+    tasks: int = 2000
+    roadmap: int = 12
+    pipeline: int = 50
+    reports: int = 5000
+    activities: int = 50000
+
+    def scaled(self, factor: float) -> "SeedSizes":
+        return SeedSizes(**{name: max(1, int(value * factor)) for name, value in vars(self).items()})
+
+
+@dataclass
+class SeedIds:
+    """IDs of generated documents that scenarios pick targets from."""
+    users: List[str] = field(default_factory=list)
+    features: List[str] = field(default_factory=list)
+    tasks: List[str] = field(default_factory=list)
+    roadmap: List[str] = field(default_factory=list)
+    pipeline: List[str] = field(default_factory=list)
+    reports: List[str] = field(default_factory=list)
+
+
+def generate_users(rng: random.Random, count: int, password_hash: str):
+    from app.models.user import User, UserRole
+
+    roles = list(UserRole)
+    yield User(email="manager@bench.jobpromax.com", name="Bench Manager", password_hash=password_hash, role=UserRole.MANAGER)
+    for i in range(1, count):
+        yield User(
+            email=f"user{i}@bench.jobpromax.com",
+            name=f"Bench User {i}",
+            password_hash=password_hash,
+            role=rng.choice(roles),
+        )
+
+
+def generate_features(rng: random.Random, count: int, today: datetime):
+    from app.models.feature import Feature, FeatureStatusEnum, HistoryEntry
+    from app.utils.feature_history import HISTORY_DAYS, encode_history
+
+    statuses = list(FeatureStatusEnum)
+    weights = [0.85, 0.1, 0.05]
+    for i in range(count):
+        history = [
+            HistoryEntry(
+                date=(today - timedelta(days=d)).strftime("%Y-%m-%d"),
+                status=rng.choices(statuses, weights)[0].value,
+            )
+            for d in range(HISTORY_DAYS - 1, -1, -1)
+        ]
+        history_start, history_codes = encode_history(history)
+        yield Feature(
+            name=f"Feature {i}",
+            status=rng.choices(statuses, weights)[0],
+            publicNote=f"Status note for feature {i}",
+            linkedTicket=f"JPM-{1000 + i}" if rng.random() < 0.3 else None,
+            historyStart=history_start,
+            historyCodes=history_codes,
+        )
+
+
+def generate_tasks(rng: random.Random, count: int, today: datetime):
+    from app.models.task import Task, TaskStatus, TaskPriority
+
+    statuses = list(TaskStatus)
+    for i in range(count):
+        status = rng.choice(statuses)
+        yield Task(
+            name=f"Task {i}",
+            assignee=f"Bench User {rng.randrange(1, 25)}",
+            status=status,
+            dueDate=(today + timedelta(days=rng.randrange(-30, 60))).strftime("%Y-%m-%d"),
+            priority=rng.choice(list(TaskPriority)),
+            completedAt=today - timedelta(days=rng.randrange(0, 90)) if status == TaskStatus.DONE else None,
+        )
+
+
+def generate_roadmap(rng: random.Random, count: int):
+    from app.models.roadmap import RoadmapPhase, Deliverable, DeliverableStatus, PhaseStatus, HealthStatus
+
+    for i in range(count):
+        yield RoadmapPhase(
+            phase=f"Phase {i + 1}",
+            date=f"Q{i % 4 + 1} {2024 + i // 4}",
+            title=f"Milestone {i + 1}",
+            description=f"Deliverables planned for milestone {i + 1}.",
+            status=rng.choice(list(PhaseStatus)),
+            health=rng.choice(list(HealthStatus)),
+            deliverables=[
+                Deliverable(text=f"Deliverable {i + 1}.{d + 1}", status=rng.choice(list(DeliverableStatus)))
+                for d in range(rng.randrange(2, 8))
+            ],
+        )
+
+
+def generate_pipeline(rng: random.Random, count: int):
+    from app.models.dashboard import PipelineItem, PipelineType, PipelinePriority
+
+    for i in range(count):
+        if rng.random() < 0.5:
+            yield PipelineItem(title=f"Wish {i}", type=PipelineType.WISHLIST, requester=f"Customer {i}", dateAdded="2024-08-01")
+        else:
+            yield PipelineItem(
+                title=f"Request {i}", type=PipelineType.INCOMING,
+                priority=rng.choice(list(PipelinePriority)), estEffort=f"{rng.randrange(1, 10)} Days",
+            )
+
+
+def generate_reports(rng: random.Random, count: int, feature_ids: List, today: datetime):
+    from app.models.report import IncidentReport, Reporter, ImpactLevel, ReportStatus
+
+    for i in range(count):
+        created = today - timedelta(minutes=rng.randrange(0, 90 * 24 * 60))
+        status = rng.choices(list(ReportStatus), [0.5, 0.3, 0.2])[0]
+        yield IncidentReport(
+            featureId=rng.choice(feature_ids) if feature_ids and rng.random() < 0.8 else None,
+            reporter=Reporter(name=f"Reporter {i % 300}", email=f"reporter{i % 300}@example.com"),
+            impactLevel=rng.choice(list(ImpactLevel)),
+            description=f"Incident {i}: " + "details " * rng.randrange(5, 40),
+            status=status,
+            createdAt=created,
+            resolvedAt=created + timedelta(hours=4) if status == ReportStatus.ADDRESSED else None,
+            adminNotes=[],
+        )
+
+
+def generate_activities(rng: random.Random, count: int, users: List, today: datetime):
+    from app.models.activity import ActivityLog, ActionType, TargetType
+
+    actions = list(ActionType)
+    for _ in range(count):
+        user = rng.choice(users)
+        yield ActivityLog(
+            userId=user.id,
+            userName=user.name,
+            userRole=user.role.value,
+            action=rng.choice(actions),
+            targetType=rng.choice(list(TargetType)),
+            targetName="Generated target",
+            details={"source": "bench"},
+            timestamp=today - timedelta(seconds=rng.randrange(0, 90 * 24 * 3600)),
+        )
+
+
+async def insert_generated(model, documents) -> List:
+    """Insert a generator of documents in batches and return their IDs."""
+    ids = []
+    batch = []
+    for document in documents:
+        batch.append(document)
+        if len(batch) >= INSERT_BATCH:
+            result = await model.insert_many(batch)
+            ids.extend(result.inserted_ids)
+            batch = []
+    if batch:
+        result = await model.insert_many(batch)
+        ids.extend(result.inserted_ids)
+    return ids
+
+
+async def seed(sizes: SeedSizes, seed_value: int, rollups: bool = True) -> SeedIds:
+    from app.database import DOCUMENT_MODELS
+    from app.models.user import User
+    from app.models.feature import Feature
+    from app.models.task import Task
+    from app.models.roadmap import RoadmapPhase
+    from app.models.dashboard import PipelineItem
+    from app.models.report import IncidentReport
+    from app.models.activity import ActivityLog
+    from app.utils.security import hash_password_async
+    from app.utils.counters import rebuild_counters
+    from app.utils.task_rollups import rebuild_task_rollups
+    from app.utils.activity_retention import rollup_activities
+
+    rng = random.Random(seed_value)
+    today = datetime.utcnow()
+
+    for model in DOCUMENT_MODELS:
+        await model.delete_all()
+
+    # One hash for every account: bcrypt would otherwise dominate seeding
+    password_hash = await hash_password_async(BENCH_PASSWORD)
+    users = list(generate_users(rng, sizes.users, password_hash))
+    user_ids = await insert_generated(User, iter(users))
+    for user, user_id in zip(users, user_ids):
+        user.id = user_id
+
+    ids = SeedIds(users=[str(i) for i in user_ids])
+    feature_ids = await insert_generated(Feature, generate_features(rng, sizes.features, today))
+    ids.features = [str(i) for i in feature_ids]
+    ids.tasks = [str(i) for i in await insert_generated(Task, generate_tasks(rng, sizes.tasks, today))]
+    ids.roadmap = [str(i) for i in await insert_generated(RoadmapPhase, generate_roadmap(rng, sizes.roadmap))]
+    ids.pipeline = [str(i) for i in await insert_generated(PipelineItem, generate_pipeline(rng, sizes.pipeline))]
+    ids.reports = [str(i) for i in await insert_generated(
+        IncidentReport, generate_reports(rng, sizes.reports, feature_ids, today)
+    )]
+    await insert_generated(ActivityLog, generate_activities(rng, sizes.activities, users, today))
+
+    await rebuild_counters()
+    if rollups:
+        await rebuild_task_rollups()
+        await rollup_activities()
+    return ids
+
+
+# ---------------------------------------------------------------------------
+# Scenarios
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    json: Optional[dict] = None
+
+
+@dataclass
+class Scenario:
+    router: str
+    name: str
+    build: Callable[[random.Random, SeedIds, int], Request]
+    requests: Optional[int] = None  # Overrides --requests (e.g. bcrypt-bound endpoints)
+    needs_pipeline_updates: bool = False  # Not supported by the in-memory mock
+
+
+TASK_STATUSES = ["In Progress", "In Review", "Blocked", "Done"]
+FEATURE_STATUSES = ["operational", "degraded", "critical"]
+REPORT_STATUSES = ["pending", "acknowledged", "addressed"]
+
+
+def _get(path: str) -> Callable[[random.Random, SeedIds, int], Request]:
+    return lambda rng, ids, n: Request("GET", path)
+
+
+SCENARIOS = [
+    Scenario("auth", "POST /auth/login", lambda rng, ids, n: Request(
+        "POST", "/auth/login", {"email": "manager@bench.jobpromax.com", "password": BENCH_PASSWORD}
+    ), requests=100),
+    Scenario("auth", "GET /auth/me", _get("/auth/me")),
+
+    Scenario("features", "GET /features", _get("/features")),
+    Scenario("features", "GET /features?include=history", _get("/features?include=history")),
+    Scenario("features", "GET /features/uptime", _get("/features/uptime")),
+    Scenario("features", "PATCH /features/{id}", lambda rng, ids, n: Request(
+        "PATCH", f"/features/{rng.choice(ids.features)}",
+        {"status": rng.choice(FEATURE_STATUSES), "publicNote": f"bench update {n}"}
+    ), needs_pipeline_updates=True),
+    Scenario("features", "POST /features/bulk", lambda rng, ids, n: Request(
+        "POST", "/features/bulk",
+        {"items": [{"id": i, "status": rng.choice(FEATURE_STATUSES)} for i in rng.sample(ids.features, min(10, len(ids.features)))]}
+    ), needs_pipeline_updates=True),
+
+    Scenario("reports", "GET /api/reports", _get("/api/reports/")),
+    Scenario("reports", "GET /api/reports?status=pending", _get("/api/reports/?status=pending&limit=50")),
+    Scenario("reports", "POST /api/reports", lambda rng, ids, n: Request(
+        "POST", "/api/reports/",
+        {"featureId": rng.choice(ids.features), "reporterName": "Bench", "impactLevel": "high", "description": f"bench report {n}"}
+    )),
+    Scenario("reports", "PATCH /api/reports/{id}/status", lambda rng, ids, n: Request(
+        "PATCH", f"/api/reports/{rng.choice(ids.reports)}/status", {"status": rng.choice(REPORT_STATUSES)}
+    )),
+    Scenario("reports", "POST /api/reports/{id}/notes", lambda rng, ids, n: Request(
+        "POST", f"/api/reports/{rng.choice(ids.reports)}/notes", {"note": f"bench note {n}"}
+    )),
+
+    Scenario("activities", "GET /api/activities", _get("/api/activities/")),
+    Scenario("activities", "GET /api/activities?action=LOGIN", _get("/api/activities/?action=LOGIN")),
+    Scenario("activities", "GET /api/activities/user/{id}", lambda rng, ids, n: Request(
+        "GET", f"/api/activities/user/{rng.choice(ids.users)}"
+    )),
+    Scenario("activities", "GET /api/activities/me", _get("/api/activities/me")),
+    Scenario("activities", "GET /api/activities/daily", _get("/api/activities/daily")),
+    Scenario("activities", "GET /api/activities/stats?window=30d", _get("/api/activities/stats?window=30d")),
+
+    Scenario("dashboard", "GET /dashboard/kpi", _get("/dashboard/kpi")),
+    Scenario("dashboard", "GET /pipeline", _get("/pipeline")),
+    Scenario("dashboard", "GET /dashboard/charts/burnup", _get("/dashboard/charts/burnup")),
+    Scenario("dashboard", "GET /dashboard/charts/velocity", _get("/dashboard/charts/velocity")),
+    Scenario("dashboard", "PATCH /pipeline/{id}", lambda rng, ids, n: Request(
+        "PATCH", f"/pipeline/{rng.choice(ids.pipeline)}", {"estEffort": f"{n % 10 + 1} Days"}
+    ), needs_pipeline_updates=True),
+
+    Scenario("roadmap", "GET /roadmap", _get("/roadmap")),
+    Scenario("roadmap", "PATCH /roadmap/{id}", lambda rng, ids, n: Request(
+        "PATCH", f"/roadmap/{rng.choice(ids.roadmap)}", {"health": rng.choice(["on-track", "at-risk", "delayed"])}
+    ), needs_pipeline_updates=True),
+
+    Scenario("tasks", "GET /tasks", _get("/tasks")),
+    Scenario("tasks", "PATCH /tasks/{id}", lambda rng, ids, n: Request(
+        "PATCH", f"/tasks/{rng.choice(ids.tasks)}", {"status": rng.choice(TASK_STATUSES)}
+    ), needs_pipeline_updates=True),
+    Scenario("tasks", "POST /tasks/bulk", lambda rng, ids, n: Request(
+        "POST", "/tasks/bulk",
+        {"items": [{"id": i, "status": rng.choice(TASK_STATUSES)} for i in rng.sample(ids.tasks, min(25, len(ids.tasks)))]}
+    ), needs_pipeline_updates=True),
+
+    Scenario("users", "GET /users", _get("/users/")),
+    Scenario("users", "POST /users", lambda rng, ids, n: Request(
+        "POST", "/users/",
+        {"name": f"Created {n}", "email": f"created{n}-{rng.randrange(10 ** 9)}@bench.jobpromax.com", "role": "developer", "password": "pw123456"}
+    ), requests=50),
+]
+
+
+@dataclass
+class ScenarioResult:
+    router: str
+    name: str
+    requests: int
+    seconds: float
+    latencies_ms: List[float]
+    statuses: Dict[int, int]
+
+    def summary(self) -> dict:
+        errors = sum(count for code, count in self.statuses.items() if code >= 400)
+        return {
+            "router": self.router,
+            "requests": self.requests,
+            "reqPerSec": round(self.requests / self.seconds, 1) if self.seconds else 0.0,
+            "p50Ms": round(percentile(self.latencies_ms, 50), 2),
+            "p95Ms": round(percentile(self.latencies_ms, 95), 2),
+            "p99Ms": round(percentile(self.latencies_ms, 99), 2),
+            "errors": errors,
+            "statuses": {str(code): count for code, count in sorted(self.statuses.items())},
+        }
+
+
+async def run_scenario(client, scenario: Scenario, ids: SeedIds, total: int, concurrency: int, seed_value: int) -> ScenarioResult:
+    rng = random.Random(f"{seed_value}:{scenario.name}")
+    requests = [scenario.build(rng, ids, n) for n in range(total)]
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    queue = iter(requests)
+
+    async def worker():
+        for request in queue:
+            started = time.perf_counter()
+            resp = await client.request(request.method, request.path, json=request.json)
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[resp.status_code] = statuses.get(resp.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, total))))
+    return ScenarioResult(scenario.router, scenario.name, total, time.perf_counter() - started, latencies, statuses)
+
+
+# ---------------------------------------------------------------------------
+# Reporting
+# ---------------------------------------------------------------------------
+
+def print_results(results: Dict[str, dict], baseline: Optional[Dict[str, dict]] = None) -> None:
+    header = f"{'endpoint':<44} {'req/s':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'err':>5}"
+    if baseline:
+        header += f" {'Δreq/s':>8} {'Δp95':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, row in results.items():
+        line = (f"{name:<44} {row['reqPerSec']:>9.1f} {row['p50Ms']:>8.1f}ms "
+                f"{row['p95Ms']:>7.1f}ms {row['p99Ms']:>7.1f}ms {row['errors']:>5}")
+        if baseline:
+            base = baseline.get(name)
+            if base and base["reqPerSec"] and base["p95Ms"]:
+                line += (f" {(row['reqPerSec'] / base['reqPerSec'] - 1) * 100:>+7.0f}%"
+                         f" {(row['p95Ms'] / base['p95Ms'] - 1) * 100:>+7.0f}%")
+            else:
+                line += f" {'new':>8}"
+        print(line)
+
+
+def regressions(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    """Endpoints whose p95 grew by more than `tolerance` (a fraction) over the baseline."""
+    return [
+        name for name, row in results.items()
+        if name in baseline and baseline[name]["p95Ms"]
+        and row["p95Ms"] > baseline[name]["p95Ms"] * (1 + tolerance)
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Setup
+# ---------------------------------------------------------------------------
+
+def configure_environment(args) -> None:
+    """Point the app settings at the benchmark database before `app` is imported."""
+    os.environ["DATABASE_NAME"] = args.database
+    os.environ["MONGODB_URI"] = args.mongo_uri or os.environ.get("MONGODB_URI") or "mongodb://localhost:27017"
+    # Keep startup deterministic: indexes must exist before queries are timed
+    os.environ["DEFER_INDEX_SYNC"] = "false"
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--mongo-uri", help="Mongo to seed and serve from (its benchmark database is wiped)")
+    target.add_argument("--mock", action="store_true", help="use an in-memory mongomock-motor client")
+    parser.add_argument("--database", default=BENCH_DATABASE)
+    parser.add_argument("--base-url", help="drive a running server instead of the app in-process")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply the default seed volumes")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for data and request generation")
+    parser.add_argument("--requests", type=int, default=500, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--router", action="append", help="only run these routers (repeatable)")
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--compare", metavar="PATH", help="baseline file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p95 growth vs the baseline")
+    args = parser.parse_args()
+    if args.mock and args.base_url:
+        parser.error("--mock runs in-process and cannot be combined with --base-url")
+
+    configure_environment(args)
+
+    import httpx
+    from app import database
+    from app.main import app
+
+    if args.mock:
+        from mongomock_motor import AsyncMongoMockClient
+        # init_db reuses an existing client instead of connecting
+        database._client = AsyncMongoMockClient()
+
+    for handler in app.router.on_startup:
+        await handler()
+
+    try:
+        sizes = SeedSizes().scaled(args.scale)
+        seed_started = time.perf_counter()
+        # The mock lacks $toDate, so chart and activity rollups stay empty there
+        ids = await seed(sizes, args.seed, rollups=not args.mock)
+        print(f"seeded {vars(sizes)} in {time.perf_counter() - seed_started:.1f}s")
+
+        transport = None if args.base_url else httpx.ASGITransport(app=app)
+        base_url = args.base_url or "http://bench"
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=60, limits=limits) as client:
+            resp = await client.post("/auth/login", json={"email": "manager@bench.jobpromax.com", "password": BENCH_PASSWORD})
+            resp.raise_for_status()
+            client.headers["Authorization"] = f"Bearer {resp.cookies.get('auth-token')}"
+
+            results: Dict[str, dict] = {}
+            for scenario in SCENARIOS:
+                if args.router and scenario.router not in args.router:
+                    continue
+                if args.mock and scenario.needs_pipeline_updates:
+                    print(f"skipping {scenario.name}: pipeline updates are not supported by the mock")
+                    continue
+                total = scenario.requests or args.requests
+                result = await run_scenario(client, scenario, ids, total, args.concurrency, args.seed)
+                results[scenario.name] = result.summary()
+    finally:
+        for handler in app.router.on_shutdown:
+            await handler()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+    print()
+    print_results(results, baseline)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({
+                "createdAt": datetime.utcnow().isoformat(),
+                "python": platform.python_version(),
+                "target": "mock" if args.mock else ("server" if args.base_url else "in-process"),
+                "seedSizes": vars(sizes),
+                "requests": args.requests,
+                "concurrency": args.concurrency,
+                "results": results,
+            }, f, indent=2)
+        print(f"\nbaseline written to {args.save_baseline}")
+
+    if baseline:
+        slower = regressions(results, baseline, args.tolerance)
+        if slower:
+            print(f"\np95 regressed by more than {args.tolerance:.0%}: {', '.join(slower)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
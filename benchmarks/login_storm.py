@@ -0,0 +1,189 @@
+"""
+Measure /features latency while a burst of logins hits the API.
+
+Run against a live server seeded with `seed.py`:
+
+    python -m uvicorn app.main:app --port 8080
+    python benchmarks/login_storm.py --base-url http://localhost:8080
+
+Or in-process against an in-memory mock (pip install mongomock-motor), which
+runs the storm twice: once verifying bcrypt inline on the event loop, as login
+did before the hashing pool, and once on the pool. The committed
+benchmarks/login_storm_results.json was made this way:
+
+    python benchmarks/login_storm.py --mock --logins 40 --save benchmarks/login_storm_results.json
+
+With 4 hashing workers and 5 pollers, /features p99 went from 12572 ms inline
+(the event loop is blocked for the whole storm) to 134.5 ms on the pool, which
+queued up to 36 verifications. Logins ran slightly slower on the pool,
+3.2/s inline vs 2.4/s, as they now share the CPU with the requests they used
+to block.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def login_storm(client: httpx.AsyncClient, email: str, password: str, logins: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one_login():
+        async with semaphore:
+            await client.post("/auth/login", json={"email": email, "password": password})
+
+    await asyncio.gather(*(one_login() for _ in range(logins)))
+
+
+async def poll_features(client: httpx.AsyncClient, token: str, stop: asyncio.Event, samples: list[float]):
+    headers = {"Authorization": f"Bearer {token}"}
+    while not stop.is_set():
+        started = time.perf_counter()
+        # Yield first: in-process against mongomock a request may never suspend,
+        # and time spent waiting for a blocked event loop counts as latency
+        await asyncio.sleep(0)
+        await client.get("/features", headers=headers)
+        samples.append((time.perf_counter() - started) * 1000)
+
+
+async def watch_hash_queue(stop: asyncio.Event, depths: list[int]):
+    """Sample the hashing pool's queue depth (in-process runs only)."""
+    from app.utils.security import password_pool_stats
+    while not stop.is_set():
+        depths.append(password_pool_stats()["queueDepth"])
+        await asyncio.sleep(0.01)
+
+
+async def run(client: httpx.AsyncClient, args, in_process: bool) -> dict:
+    resp = await client.post("/auth/login", json={"email": args.email, "password": args.password})
+    resp.raise_for_status()
+    token = resp.cookies.get("auth-token")
+
+    samples: list[float] = []
+    depths: list[int] = []
+    stop = asyncio.Event()
+    pollers = [asyncio.create_task(poll_features(client, token, stop, samples)) for _ in range(args.pollers)]
+    if in_process:
+        pollers.append(asyncio.create_task(watch_hash_queue(stop, depths)))
+
+    started = time.perf_counter()
+    await login_storm(client, args.email, args.password, args.logins, args.concurrency)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await asyncio.gather(*pollers)
+
+    result = {
+        "logins": args.logins,
+        "loginsPerSecond": round(args.logins / elapsed, 1),
+        "samples": len(samples),
+        "p50Ms": round(statistics.median(samples), 1) if samples else 0.0,
+        "p95Ms": round(percentile(samples, 95), 1),
+        "p99Ms": round(percentile(samples, 99), 1),
+        "maxFeaturesMs": round(max(samples), 1) if samples else 0.0,
+    }
+    if in_process:
+        result["maxHashQueueDepth"] = max(depths, default=0)
+    return result
+
+
+def print_result(label: str, result: dict) -> None:
+    print(f"{label}: {result['logins']} logins ({result['loginsPerSecond']}/s), "
+          f"/features samples={result['samples']} p50={result['p50Ms']}ms "
+          f"p95={result['p95Ms']}ms p99={result['p99Ms']}ms max={result['maxFeaturesMs']}ms"
+          + (f" hashQueue<={result['maxHashQueueDepth']}" if "maxHashQueueDepth" in result else ""))
+
+
+async def run_mock(args) -> dict:
+    """Both modes in-process against mongomock, seeded by the load suite."""
+    from load_suite import BENCH_PASSWORD, SeedSizes, configure_environment, seed
+
+    args.database = "jobpromax_bench"
+    args.mongo_uri = None
+    configure_environment(args)
+
+    from mongomock_motor import AsyncMongoMockClient
+    from app import database
+    from app.main import app
+    import app.routes.auth as auth_routes
+    from app.utils.security import verify_password
+
+    database._client = AsyncMongoMockClient()
+    for handler in app.router.on_startup:
+        await handler()
+    try:
+        await seed(SeedSizes().scaled(args.scale), 42, rollups=False)
+        args.email, args.password = "manager@bench.jobpromax.com", BENCH_PASSWORD
+
+        async def verify_inline(plain_password: str, hashed_password: str) -> bool:
+            return verify_password(plain_password, hashed_password)
+
+        pooled = auth_routes.verify_password_async
+        results = {}
+        transport = httpx.ASGITransport(app=app)
+        for mode, verify in (("inline", verify_inline), ("pool", pooled)):
+            auth_routes.verify_password_async = verify
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+                results[mode] = await run(client, args, in_process=True)
+            print_result(mode, results[mode])
+        auth_routes.verify_password_async = pooled
+        return results
+    finally:
+        for handler in app.router.on_shutdown:
+            await handler()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--base-url", default="http://localhost:8080")
+    target.add_argument("--mock", action="store_true", help="in-process against mongomock-motor, inline vs pool")
+    parser.add_argument("--email", default="manager@jobpromax.com")
+    parser.add_argument("--password", default="manager123")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--pollers", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=0.05, help="seed volume for --mock (see load_suite.py)")
+    parser.add_argument("--save", metavar="PATH", help="write the results as JSON")
+    args = parser.parse_args()
+
+    if args.mock:
+        results = await run_mock(args)
+    else:
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as client:
+            results = {"server": await run(client, args, in_process=False)}
+        print_result("server", results["server"])
+
+    if args.save:
+        from app.config import settings
+        with open(args.save, "w") as f:
+            json.dump({
+                "createdAt": datetime.utcnow().isoformat(),
+                "python": platform.python_version(),
+                "target": "mock" if args.mock else "server",
+                "passwordHashWorkers": settings.PASSWORD_HASH_WORKERS,
+                "concurrency": args.concurrency,
+                "pollers": args.pollers,
+                "results": results,
+            }, f, indent=2)
+        print(f"\nresults written to {args.save}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
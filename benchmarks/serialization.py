@@ -0,0 +1,155 @@
+"""
+Per-item serialization cost: Beanie/Pydantic path vs raw documents + orjson.
+
+Documents are generated in the shape Motor returns them. Beanie still has to
+be initialised before Document models can be validated; that uses
+mongomock-motor when installed, otherwise the server at MONGODB_URI.
+
+    python benchmarks/serialization.py --items 2000 --rounds 20
+
+The "pydantic" column validates each raw document into its Document model,
+converts it to the response model and encodes the list the way FastAPI does
+(`response_model` serialization + stdlib json). The "raw" column is the fast
+path used by the list endpoints.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from beanie import init_beanie
+from bson import ObjectId
+from pydantic import TypeAdapter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+
+from app.database import DOCUMENT_MODELS  # noqa: E402
+from app.models.activity import ActivityLog  # noqa: E402
+from app.models.feature import FeatureWithHistory  # noqa: E402
+from app.models.report import ReportSummary  # noqa: E402
+from app.models.task import Task  # noqa: E402
+from app.routes.activities import ActivityResponse, activity_to_dict  # noqa: E402
+from app.routes.reports import ReportResponse, report_to_response, report_document_to_dict  # noqa: E402
+from app.routes.tasks import TASK_FIELDS  # noqa: E402
+from app.utils.fast_json import dumps, complete_documents  # noqa: E402
+from app.utils.feature_history import encode_history, feature_to_dict  # noqa: E402
+
+
+def activity_docs(n: int) -> List[dict]:
+    now = datetime.utcnow()
+    return [{
+        "_id": ObjectId(), "userId": ObjectId(), "userName": "Bench User", "userRole": "manager",
+        "action": "FEATURE_STATUS_UPDATE", "targetType": "feature", "targetId": ObjectId(),
+        "targetName": "Reporting", "details": {"oldStatus": "operational", "newStatus": "degraded"},
+        "timestamp": now - timedelta(seconds=i),
+    } for i in range(n)]
+
+
+def task_docs(n: int) -> List[dict]:
+    return [{
+        "_id": ObjectId(), "name": f"Task {i}", "assignee": "Jane", "status": "In Progress",
+        "dueDate": "2024-08-15", "priority": "High", "revision": 3,
+    } for i in range(n)]
+
+
+def feature_docs(n: int) -> List[dict]:
+    today = datetime.utcnow()
+    history_start, history_codes = encode_history(
+        {"date": (today - timedelta(days=d)).strftime("%Y-%m-%d"), "status": "operational"} for d in range(60)
+    )
+    return [{
+        "_id": ObjectId(), "name": f"Feature {i}", "status": "operational", "publicNote": "All good",
+        "linkedTicket": None, "historyStart": history_start, "historyCodes": history_codes,
+        "lastUpdatedBy": {"userId": ObjectId(), "userName": "Bench", "updatedAt": today},
+    } for i in range(n)]
+
+
+def report_docs(n: int) -> List[dict]:
+    now = datetime.utcnow()
+    return [{
+        "_id": ObjectId(), "featureId": ObjectId(), "reporter": {"id": None, "name": "Reporter", "email": "r@example.com"},
+        "impactLevel": "high", "description": "Something broke " * 5, "status": "pending",
+        "createdAt": now - timedelta(minutes=i), "resolvedAt": None,
+    } for i in range(n)]
+
+
+def pydantic_activities(docs):
+    items = []
+    for doc in docs:
+        a = ActivityLog.model_validate(doc)
+        items.append(ActivityResponse(
+            id=str(a.id), userId=str(a.userId), userName=a.userName, userRole=a.userRole,
+            action=a.action.value, targetType=a.targetType.value if a.targetType else None,
+            targetId=str(a.targetId) if a.targetId else None, targetName=a.targetName,
+            details=a.details, timestamp=a.timestamp,
+        ))
+    return json.dumps(ACTIVITIES.dump_python(items, mode="json")).encode()
+
+
+def pydantic_tasks(docs):
+    return json.dumps(TASKS.dump_python([Task.model_validate(d) for d in docs], mode="json", by_alias=True)).encode()
+
+
+def pydantic_features(docs):
+    items = [FeatureWithHistory.model_validate(feature_to_dict(d)) for d in docs]
+    return json.dumps(FEATURES.dump_python(items, mode="json", by_alias=True, exclude_unset=True)).encode()
+
+
+def pydantic_reports(docs):
+    items = [report_to_response(ReportSummary.model_validate(d)) for d in docs]
+    return json.dumps(REPORTS.dump_python(items, mode="json", exclude_unset=True)).encode()
+
+
+ACTIVITIES = TypeAdapter(List[ActivityResponse])
+TASKS = TypeAdapter(List[Task])
+FEATURES = TypeAdapter(List[FeatureWithHistory])
+REPORTS = TypeAdapter(List[ReportResponse])
+
+CASES = [
+    ("activities", activity_docs, pydantic_activities, lambda docs: dumps([activity_to_dict(d) for d in docs])),
+    ("tasks", task_docs, pydantic_tasks, lambda docs: dumps(complete_documents(docs, TASK_FIELDS))),
+    ("features+history", feature_docs, pydantic_features, lambda docs: dumps([feature_to_dict(d) for d in docs])),
+    ("reports", report_docs, pydantic_reports, lambda docs: dumps([report_document_to_dict(d) for d in docs])),
+]
+
+
+def per_item_us(fn, docs, rounds: int) -> float:
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn(docs)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) / len(docs) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    try:
+        from mongomock_motor import AsyncMongoMockClient as client_class
+    except ImportError:
+        from motor.motor_asyncio import AsyncIOMotorClient as client_class
+    client = client_class(os.environ["MONGODB_URI"])
+    asyncio.run(init_beanie(database=client["serialization_bench"], document_models=DOCUMENT_MODELS, skip_indexes=True))
+
+    print(f"{'endpoint':<18} {'pydantic µs/item':>17} {'raw µs/item':>12} {'speedup':>8}")
+    for name, generate, slow, fast in CASES:
+        docs = generate(args.items)
+        if json.loads(slow(docs[:5])) != json.loads(fast(docs[:5])):
+            print(f"{name}: outputs differ")
+        slow_us = per_item_us(slow, docs, args.rounds)
+        fast_us = per_item_us(fast, docs, args.rounds)
+        print(f"{name:<18} {slow_us:>17.2f} {fast_us:>12.2f} {slow_us / fast_us:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Measure cold-start cost: `import app.main` and time until /health/ready.
+
+    MONGODB_URI=... python benchmarks/startup_time.py --runs 5
+    MONGODB_URI=... python benchmarks/startup_time.py --server --max-ready-ms 3000
+
+Each run uses a fresh interpreter. With --max-import-ms / --max-ready-ms the
+script exits non-zero when the median exceeds the budget, so it can gate CI.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = (
+    "import time; started = time.perf_counter(); import app.main; "
+    "print((time.perf_counter() - started) * 1000)"
+)
+
+
+def measure_import() -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def fetch_json(url: str):
+    with urllib.request.urlopen(url, timeout=2) as resp:
+        return resp.status, json.loads(resp.read())
+
+
+def measure_ready(port: int, timeout: float) -> tuple[float, dict]:
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                status, _ = fetch_json(f"http://127.0.0.1:{port}/health/ready")
+                if status == 200:
+                    ready_ms = (time.perf_counter() - started) * 1000
+                    _, report = fetch_json(f"http://127.0.0.1:{port}/health/startup")
+                    return ready_ms, report
+            except OSError:
+                pass
+            time.sleep(0.02)
+        raise TimeoutError(f"server not ready after {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--server", action="store_true", help="also measure time until /health/ready")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--max-import-ms", type=float)
+    parser.add_argument("--max-ready-ms", type=float)
+    args = parser.parse_args()
+
+    failed = False
+
+    imports = [measure_import() for _ in range(args.runs)]
+    import_median = statistics.median(imports)
+    print(f"import app.main: median={import_median:.1f}ms min={min(imports):.1f}ms max={max(imports):.1f}ms")
+    if args.max_import_ms is not None and import_median > args.max_import_ms:
+        print(f"FAIL: import median exceeds {args.max_import_ms}ms")
+        failed = True
+
+    if args.server:
+        readies = []
+        for _ in range(args.runs):
+            ready_ms, report = measure_ready(args.port, args.timeout)
+            readies.append(ready_ms)
+            print(f"ready in {ready_ms:.1f}ms; startup report: {report}")
+        ready_median = statistics.median(readies)
+        print(f"time to ready: median={ready_median:.1f}ms min={min(readies):.1f}ms max={max(readies):.1f}ms")
+        if args.max_ready_ms is not None and ready_median > args.max_ready_ms:
+            print(f"FAIL: time to ready exceeds {args.max_ready_ms}ms")
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+import asyncio
+from app.database import init_db
+from app.utils.counters import rebuild_counters
+from app.utils.task_rollups import rebuild_task_rollups
+
+async def main():
+    await init_db()
+    
+    drifted = await rebuild_counters()
+    if drifted:
+        print(f"Counters rebuilt. Drift corrected in: {', '.join(drifted)}")
+    else:
+        print("Counters rebuilt. Stored values matched a full recount.")
+    
+    buckets = await rebuild_task_rollups()
+    print(f"Task chart rollups rebuilt: {buckets} daily buckets.")
+
+if __name__ == "__main__":
+    asyncio.run(main())
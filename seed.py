@@ -3,9 +3,11 @@ from app.database import init_db
 from app.models.task import Task, TaskStatus, TaskPriority
 from app.models.roadmap import RoadmapPhase, Deliverable, DeliverableStatus, PhaseStatus, HealthStatus
 from app.models.feature import Feature, FeatureStatusEnum
-from app.models.dashboard import KPI, PipelineItem, PipelineType, PipelinePriority, ChartData, ChartDataPoint
+from app.models.dashboard import KPI, PipelineItem, PipelineType, PipelinePriority, ChartData
 from app.models.user import User, UserRole
-from app.utils.security import hash_password
+from app.utils.security import hash_password_async
+from app.utils.counters import rebuild_counters
+from app.utils.task_rollups import rebuild_task_rollups
 
 async def seed_data():
     await init_db()
@@ -24,19 +26,19 @@ async def seed_data():
         User(
             email="manager@jobpromax.com",
             name="Manager User",
-            password_hash=hash_password("manager123"),
+            password_hash=await hash_password_async("manager123"),
             role=UserRole.MANAGER
         ),
         User(
             email="developer@jobpromax.com",
             name="Developer User",
-            password_hash=hash_password("dev123"),
+            password_hash=await hash_password_async("dev123"),
             role=UserRole.DEVELOPER
         ),
         User(
             email="leadership@jobpromax.com",
             name="Leadership User",
-            password_hash=hash_password("lead123"),
+            password_hash=await hash_password_async("lead123"),
             role=UserRole.LEADERSHIP
         )
     ]
@@ -87,15 +89,9 @@ async def seed_data():
         await feature.insert()
     print("Features seeded.")
 
-    # Dashboard - KPIs
-    kpis = [
-        KPI(label="Overall Completion", value="68%", change="+5%", trend="up"),
-        KPI(label="Current Sprint", value="12/20 Tasks", change="", trend="neutral"),
-        KPI(label="Velocity", value="45 pts", change="+2 pts", trend="up")
-    ]
-    for kpi in kpis:
-        await kpi.insert()
-    print("KPIs seeded.")
+    # Dashboard - KPIs are computed from counters over the seeded data
+    await rebuild_counters()
+    print("KPI counters rebuilt.")
 
     # Dashboard - Pipeline
     pipeline = [
@@ -106,23 +102,9 @@ async def seed_data():
         await item.insert()
     print("Pipeline seeded.")
     
-    # Dashboard - Charts
-    # Burnup
-    burnup_data = [
-        ChartDataPoint(name="Week 1", totalScope=50, completed=10),
-        ChartDataPoint(name="Week 2", totalScope=50, completed=25),
-        ChartDataPoint(name="Week 3", totalScope=55, completed=40)
-    ]
-    await ChartData(chart_type="burnup", data_points=burnup_data).insert()
-
-    # Velocity
-    velocity_data = [
-        ChartDataPoint(name="Sprint 1", velocity=30),
-        ChartDataPoint(name="Sprint 2", velocity=45),
-        ChartDataPoint(name="Sprint 3", velocity=40)
-    ]
-    await ChartData(chart_type="velocity", data_points=velocity_data).insert()
-    print("Charts seeded.")
+    # Dashboard - Charts are derived from task rollups
+    await rebuild_task_rollups()
+    print("Chart rollups rebuilt.")
 
 if __name__ == "__main__":
     asyncio.run(seed_data())
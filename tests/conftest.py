@@ -0,0 +1,85 @@
+"""
+Shared fixtures; install requirements-dev.txt to run the suite.
+
+`mock_db` runs against mongomock-motor and suits request validation and
+plain CRUD. Tests that depend on real server behaviour (query plans,
+concurrent atomic updates) use `mongo_db`, which needs a mongod: set
+TEST_MONGODB_URI, or have pymongo_inmemory download one. Those tests are
+skipped when neither is available, or fail instead if TEST_REQUIRE_MONGOD
+is set (e.g. in CI).
+"""
+import os
+import uuid
+
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+
+import httpx
+import mongomock_motor
+import pymongo_inmemory
+import pytest
+import pytest_asyncio
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo_inmemory.context import Context
+
+from app.database import DOCUMENT_MODELS, sync_indexes
+from app.main import app
+from app.models.user import User, UserRole
+from app.utils.security import create_access_token
+
+
+@pytest.fixture(scope="session")
+def mongod_uri():
+    uri = os.environ.get("TEST_MONGODB_URI")
+    if uri:
+        yield uri
+        return
+    try:
+        mongod = pymongo_inmemory.Mongod(Context())
+        mongod.start()
+    except Exception as exc:
+        if os.environ.get("TEST_REQUIRE_MONGOD"):
+            pytest.fail(f"no mongod available: {exc}")
+        pytest.skip(f"no mongod available: {exc}")
+    yield mongod.connection_string
+    mongod.stop()
+
+
+@pytest_asyncio.fixture
+async def mock_db():
+    database = mongomock_motor.AsyncMongoMockClient()["test"]
+    await init_beanie(database=database, document_models=DOCUMENT_MODELS)
+    yield database
+
+
+@pytest_asyncio.fixture
+async def mongo_db(mongod_uri):
+    client = AsyncIOMotorClient(mongod_uri)
+    database = client[f"test_{uuid.uuid4().hex[:12]}"]
+    await init_beanie(database=database, document_models=DOCUMENT_MODELS)
+    await sync_indexes()
+    yield database
+    await client.drop_database(database.name)
+    client.close()
+
+
+async def create_user(role: UserRole = UserRole.MANAGER) -> User:
+    user = User(email=f"{uuid.uuid4().hex[:8]}@example.com", name="Test User", password_hash="x", role=role)
+    await user.insert()
+    return user
+
+
+@pytest_asyncio.fixture
+async def api():
+    """
+    Client for the app, authenticated as a manager. Request the database
+    fixture first; startup events do not run, so activity logs are written
+    inline.
+    """
+    user = await create_user()
+    token = create_access_token({"sub": str(user.id)})
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://test", headers={"Authorization": f"Bearer {token}"}
+    ) as client:
+        yield client
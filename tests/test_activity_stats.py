@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import app.routes.activities as activities_routes
+
+from app.config import settings
+from app.models.activity import ActionType, ActivityLog
+from app.utils.activity_logger import build_activity, log_activities
+from app.utils.activity_stats import window_end
+from app.utils.response_cache import MemoryCacheBackend, ResponseCache, response_cache
+from tests.conftest import create_user
+
+
+@pytest.fixture(autouse=True)
+def fresh_response_cache(monkeypatch):
+    fresh = ResponseCache(MemoryCacheBackend())
+    for attribute in ("backend", "_hits", "_misses"):
+        monkeypatch.setattr(response_cache, attribute, getattr(fresh, attribute))
+
+
+def test_window_end_is_shared_within_a_bucket(monkeypatch):
+    monkeypatch.setattr(settings, "ACTIVITY_STATS_BUCKET_SECONDS", 60)
+
+    assert window_end(datetime(2025, 1, 1, 12, 0, 59)) == datetime(2025, 1, 1, 12, 0)
+    assert window_end(datetime(2025, 1, 1, 12, 1, 0)) == datetime(2025, 1, 1, 12, 1)
+
+
+@pytest.mark.asyncio
+async def test_stats_are_cached_for_the_bucket(mock_db, api, monkeypatch):
+    monkeypatch.setattr(settings, "ACTIVITY_STATS_BUCKET_SECONDS", 3600)
+    user = await create_user()
+    until = window_end()
+    earlier = build_activity(user, ActionType.LOGIN)
+    earlier.timestamp = until - timedelta(minutes=5)
+    renamed = build_activity(user, ActionType.LOGIN)
+    renamed.userName = "Renamed"
+    renamed.timestamp = until - timedelta(minutes=1)
+    await log_activities([renamed, earlier])
+
+    first = await api.get("/api/activities/stats", params={"window": "24h"})
+    await log_activities([build_activity(user, ActionType.LOGIN)])
+    second = await api.get("/api/activities/stats", params={"window": "24h"})
+    revalidated = await api.get(
+        "/api/activities/stats", params={"window": "24h"}, headers={"If-None-Match": first.headers["ETag"]}
+    )
+
+    assert first.status_code == 200
+    body = first.json()
+    assert body["total"] == 2
+    assert body["byUser"] == [{"userId": str(user.id), "userName": "Renamed", "count": 2}]
+    assert second.json() == body
+    assert revalidated.status_code == 304
+    assert await ActivityLog.count() == 3
+
+
+@pytest.mark.asyncio
+async def test_late_logs_replace_the_cached_bucket(mock_db, api, monkeypatch):
+    monkeypatch.setattr(settings, "ACTIVITY_STATS_BUCKET_SECONDS", 3600)
+    user = await create_user()
+    first = await api.get("/api/activities/stats", params={"window": "24h"})
+
+    # Flushed from the write-behind queue after the bucket was cached
+    late = build_activity(user, ActionType.LOGIN)
+    late.timestamp = window_end() - timedelta(seconds=1)
+    await log_activities([late])
+    second = await api.get(
+        "/api/activities/stats", params={"window": "24h"}, headers={"If-None-Match": first.headers["ETag"]}
+    )
+
+    assert first.json()["total"] == 0
+    assert second.status_code == 200
+    assert second.json()["total"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stats_cache_metrics_are_counted_per_window(mock_db, api, monkeypatch):
+    buckets = iter([datetime(2025, 1, 1, 12, 0), datetime(2025, 1, 1, 12, 1)])
+    monkeypatch.setattr(activities_routes, "window_end", lambda: next(buckets))
+
+    for _ in range(2):
+        assert (await api.get("/api/activities/stats", params={"window": "30d"})).status_code == 200
+
+    stats = response_cache.stats()
+    assert stats["activities:stats:30d"]["misses"] == 2
+    assert not [key for key in stats if key.startswith("activities:stats:30d:")]
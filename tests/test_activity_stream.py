@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta
+
+import pytest
+from beanie import PydanticObjectId
+
+from app.config import settings
+from app.models.activity import ActionType, ActivityLog
+from app.routes.activities import stream_activities
+from app.utils.activity_logger import build_activity
+from app.utils.activity_stream import STREAM_ORDER, activity_broadcaster, event_id, written_after
+from tests.conftest import create_user
+
+
+async def insert_activities(user, count: int, inserted_at: datetime) -> list:
+    activities = [build_activity(user, ActionType.LOGIN) for _ in range(count)]
+    for activity in activities:
+        activity.insertedAt = inserted_at
+    await ActivityLog.insert_many(activities)
+    return [await ActivityLog.get_motor_collection().find_one({"_id": a.id}) for a in activities]
+
+
+async def first_events(response, count: int) -> list:
+    events = []
+    try:
+        async for chunk in response.body_iterator:
+            if chunk.startswith(("id:", "event:")):
+                events.append(chunk)
+            if len(events) == count:
+                break
+    finally:
+        await response.body_iterator.aclose()
+        await activity_broadcaster.stop()
+    return events
+
+
+@pytest.mark.asyncio
+async def test_resume_follows_insert_order_not_id_order(mock_db):
+    user = await create_user()
+    now = datetime(2025, 1, 1, 12)
+    # Built first (lower _id) but written after the event the client last saw
+    late = build_activity(user, ActionType.LOGIN)
+    [seen] = await insert_activities(user, 1, now)
+    late.insertedAt = now + timedelta(seconds=1)
+    await late.insert()
+
+    resumed = await ActivityLog.get_motor_collection().find(written_after(event_id(seen))).sort(
+        STREAM_ORDER
+    ).to_list(length=None)
+
+    assert late.id < seen["_id"]
+    assert [doc["_id"] for doc in resumed] == [late.id]
+
+
+@pytest.mark.asyncio
+async def test_legacy_last_event_id_is_accepted(mock_db):
+    user = await create_user()
+    [doc] = await insert_activities(user, 1, datetime.utcnow() + timedelta(minutes=1))
+
+    query = written_after(str(PydanticObjectId()))
+
+    assert [d["_id"] for d in await ActivityLog.get_motor_collection().find(query).to_list(length=None)] == [doc["_id"]]
+    with pytest.raises(ValueError):
+        written_after("not-an-id")
+
+
+@pytest.mark.asyncio
+async def test_replay_beyond_limit_sends_reset(mock_db, monkeypatch):
+    monkeypatch.setattr(settings, "ACTIVITY_STREAM_REPLAY_LIMIT", 2)
+    user = await create_user()
+    now = datetime(2025, 1, 1, 12)
+    [seen] = await insert_activities(user, 1, now)
+    missed = await insert_activities(user, 3, now + timedelta(seconds=1))
+
+    response = await stream_activities(user_id=None, action=None, last_event_id=event_id(seen), current_user=user)
+    [reset] = await first_events(response, 1)
+
+    assert "event: reset" in reset
+    assert f"id: {event_id(missed[-1])}" in reset
+
+
+@pytest.mark.asyncio
+async def test_replay_within_limit_sends_missed_events(mock_db, monkeypatch):
+    monkeypatch.setattr(settings, "ACTIVITY_STREAM_REPLAY_LIMIT", 5)
+    user = await create_user()
+    now = datetime(2025, 1, 1, 12)
+    [seen] = await insert_activities(user, 1, now)
+    missed = await insert_activities(user, 3, now + timedelta(seconds=1))
+
+    response = await stream_activities(user_id=None, action=None, last_event_id=event_id(seen), current_user=user)
+    events = await first_events(response, 3)
+
+    assert [event.split("\n", 1)[0] for event in events] == [f"id: {event_id(doc)}" for doc in missed]
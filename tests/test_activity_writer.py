@@ -0,0 +1,68 @@
+import pytest
+from pymongo.errors import AutoReconnect
+
+import app.utils.activity_logger as activity_logger
+from app.models.activity import ActionType, ActivityLog
+from app.utils.activity_logger import ActivityWriter, build_activity
+from tests.conftest import create_user
+
+
+@pytest.fixture(autouse=True)
+def quick_retries(monkeypatch):
+    monkeypatch.setattr(activity_logger, "FLUSH_RETRY_BACKOFF_SECONDS", (0.001, 0.001, 0.001))
+
+
+def flaky_insert_many(monkeypatch, failures: int):
+    """Make the next `failures` insert_many calls fail as if the server were unreachable."""
+    real_insert_many = ActivityLog.insert_many
+    calls = []
+
+    async def insert_many(documents, **kwargs):
+        calls.append(len(documents))
+        if len(calls) <= failures:
+            raise AutoReconnect("connection reset")
+        return await real_insert_many(documents, **kwargs)
+
+    monkeypatch.setattr(ActivityLog, "insert_many", insert_many)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_flush_retries_transient_failures(mock_db, monkeypatch):
+    user = await create_user()
+    batch = [build_activity(user, ActionType.LOGIN) for _ in range(3)]
+    calls = flaky_insert_many(monkeypatch, failures=2)
+    writer = ActivityWriter()
+
+    await writer._flush(batch)
+
+    assert calls == [3, 3, 3]
+    assert (writer.flushed, writer.failed, writer.retries) == (3, 0, 2)
+    assert await ActivityLog.count() == 3
+
+
+@pytest.mark.asyncio
+async def test_flush_counts_entries_written_by_an_earlier_attempt(mock_db):
+    user = await create_user()
+    batch = [build_activity(user, ActionType.LOGIN) for _ in range(3)]
+    await batch[1].insert()
+    writer = ActivityWriter()
+
+    await writer._flush(batch)
+
+    assert (writer.flushed, writer.failed, writer.retries) == (3, 0, 0)
+    assert await ActivityLog.count() == 3
+
+
+@pytest.mark.asyncio
+async def test_flush_gives_up_after_the_last_retry(mock_db, monkeypatch):
+    user = await create_user()
+    batch = [build_activity(user, ActionType.LOGIN) for _ in range(2)]
+    calls = flaky_insert_many(monkeypatch, failures=10)
+    writer = ActivityWriter()
+
+    await writer._flush(batch)
+
+    assert len(calls) == 1 + len(activity_logger.FLUSH_RETRY_BACKOFF_SECONDS)
+    assert (writer.flushed, writer.failed) == (0, 2)
+    assert await ActivityLog.count() == 0
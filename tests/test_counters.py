@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+from app.models.report import IncidentReport, Reporter
+from app.models.task import Task, TaskStatus
+from app.utils.counters import apply_status_change, compute_counters, ensure_counters, get_counters, rebuild_counters
+
+
+def nonzero(counts: dict) -> dict:
+    return {status: count for status, count in counts.items() if count}
+
+
+@pytest.mark.asyncio
+async def test_rebuild_skips_missing_and_unknown_statuses(mock_db):
+    await Task(name="t", assignee="a", status=TaskStatus.DONE, dueDate="2025-01-01").insert()
+    collection = Task.get_motor_collection()
+    await collection.insert_many([
+        {"name": "no status", "assignee": "a", "dueDate": "2025-01-01"},
+        {"name": "null status", "assignee": "a", "status": None, "dueDate": "2025-01-01"},
+        {"name": "retired status", "assignee": "a", "status": "Archived", "dueDate": "2025-01-01"},
+    ])
+
+    drifted = await rebuild_counters()
+
+    assert "tasks" in drifted
+    assert (await compute_counters())["tasks"] == {TaskStatus.DONE.name: 1}
+    assert (await get_counters()).tasks == {TaskStatus.DONE.name: 1}
+
+
+@pytest.mark.asyncio
+async def test_ensure_counters_recounts_an_existing_database(mock_db):
+    await Task(name="t", assignee="a", status=TaskStatus.BLOCKED, dueDate="2025-01-01").insert()
+
+    await ensure_counters()
+    await apply_status_change("tasks", TaskStatus.BLOCKED, TaskStatus.DONE)
+    await ensure_counters()
+
+    assert (await get_counters()).tasks == {TaskStatus.BLOCKED.name: 0, TaskStatus.DONE.name: 1}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_report_changes_count_each_transition_once(mongo_db, api):
+    report = await IncidentReport(reporter=Reporter(name="r"), description="d").insert()
+    await rebuild_counters()
+
+    await asyncio.gather(*(
+        api.patch(f"/api/reports/{report.id}/status", json={"status": status})
+        for status in ("acknowledged", "addressed", "acknowledged", "addressed")
+    ))
+    deletes = await asyncio.gather(*(api.delete(f"/api/reports/{report.id}") for _ in range(3)))
+
+    assert sorted(r.status_code for r in deletes) == [200, 404, 404]
+    assert nonzero((await get_counters()).reports) == {}
@@ -0,0 +1,17 @@
+import pytest
+
+from app.models.user import UserRole
+from app.utils.security import create_access_token
+from tests.conftest import create_user
+
+
+@pytest.mark.asyncio
+async def test_cache_stats_require_manager(mock_db, api):
+    developer = await create_user(UserRole.DEVELOPER)
+    token = create_access_token({"sub": str(developer.id)})
+
+    denied = await api.get("/dashboard/cache/stats", headers={"Authorization": f"Bearer {token}"})
+    allowed = await api.get("/dashboard/cache/stats")
+
+    assert denied.status_code == 403
+    assert allowed.status_code == 200
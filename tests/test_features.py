@@ -0,0 +1,295 @@
+import asyncio
+from collections import Counter
+from datetime import date, timedelta
+
+import pytest
+from beanie import PydanticObjectId
+from fastapi import HTTPException
+from bson import Binary
+from pymongo import MongoClient
+
+import app.routes.features as features_routes
+
+from app.models.activity import ActivityLog
+from app.models.feature import Feature, FeatureStatusEnum
+from app.utils.counters import compute_counters, get_counters
+from app.utils.feature_history import migrate_feature_history
+
+
+def nonzero(counts: dict) -> dict:
+    return {status: count for status, count in counts.items() if count}
+
+
+async def assert_counters_match():
+    stored = await get_counters()
+    assert nonzero(stored.features) == nonzero((await compute_counters())["features"])
+
+
+async def create_feature(api, name: str = "Feature", status: str = "operational") -> str:
+    response = await api.post("/features", json={"name": name, "status": status, "publicNote": "note"})
+    assert response.status_code == 200
+    return response.json()["_id"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("body", [{"status": None}, {"publicNote": None}])
+async def test_patch_feature_rejects_null_for_required_fields(mock_db, api, body):
+    feature = await Feature(name="f", status=FeatureStatusEnum.DEGRADED, publicNote="n").insert()
+
+    response = await api.patch(f"/features/{feature.id}", json=body)
+
+    assert response.status_code == 422
+    stored = await Feature.get(feature.id)
+    assert (stored.status, stored.publicNote) == (FeatureStatusEnum.DEGRADED, "n")
+
+
+@pytest.mark.asyncio
+async def test_bulk_feature_update_rejects_null_status(mock_db, api):
+    feature = await Feature(name="f", status=FeatureStatusEnum.DEGRADED, publicNote="n").insert()
+
+    response = await api.post("/features/bulk", json={"items": [{"id": str(feature.id), "status": None}]})
+
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_bulk_feature_update_reports_what_was_written(mongo_db, api):
+    changed = await create_feature(api, "changed")
+    noted = await create_feature(api, "noted")
+    unchanged = await create_feature(api, "unchanged")
+    missing = str(PydanticObjectId())
+
+    response = await api.post("/features/bulk", json={"items": [
+        {"id": changed, "status": "critical"},
+        {"id": noted, "publicNote": "updated"},
+        {"id": unchanged, "status": "operational"},
+        {"id": missing, "status": "degraded"},
+        {"id": str(PydanticObjectId()), "publicNote": "x"},
+    ]})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["result"] for item in body["results"]] == ["updated", "updated", "updated", "not_found", "not_found"]
+    assert body["updated"] == 3
+
+    feature = await Feature.get(PydanticObjectId(changed))
+    assert feature.status == FeatureStatusEnum.CRITICAL
+    assert feature.lastUpdatedBy.previousStatus == FeatureStatusEnum.OPERATIONAL
+    assert (await Feature.get(PydanticObjectId(noted))).publicNote == "updated"
+
+    logs = await ActivityLog.find({"targetId": PydanticObjectId(changed)}).to_list()
+    assert [log.details for log in logs] == [{"oldStatus": "operational", "newStatus": "critical"}]
+    await assert_counters_match()
+
+
+@pytest.mark.asyncio
+async def test_parallel_patches_keep_history_and_counters_consistent(mongo_db, api):
+    today = date.today()
+    earlier = [
+        {"date": (today - timedelta(days=offset)).isoformat(), "status": "degraded"}
+        for offset in (3, 2, 1)
+    ]
+    response = await api.post("/features", json={
+        "name": "contended", "status": "operational", "publicNote": "note", "history": earlier
+    })
+    feature_id = response.json()["_id"]
+    statuses = [status.value for status in FeatureStatusEnum]
+    requested = [statuses[i % len(statuses)] for i in range(30)]
+
+    responses = await asyncio.gather(*(
+        api.patch(f"/features/{feature_id}", json={"status": status}) for status in requested
+    ))
+
+    assert all(r.status_code == 200 for r in responses)
+    feature = await Feature.get(PydanticObjectId(feature_id))
+    history = (await api.get("/features", params={"include": "history"})).json()[0]["history"]
+    assert history[:3] == earlier
+    assert history[3:] == [{"date": today.isoformat(), "status": feature.status.value}]
+
+    # Every write saw the status left by exactly one other write (or the
+    # initial one), so the logged transitions chain from start to finish
+    assert feature.lastUpdatedBy.previousStatus in FeatureStatusEnum
+    logs = await ActivityLog.find({"targetId": PydanticObjectId(feature_id)}).to_list()
+    net = Counter()
+    for log in logs:
+        net[log.details["newStatus"]] += 1
+        net[log.details["oldStatus"]] -= 1
+    expected = Counter({feature.status.value: 1})
+    expected["operational"] -= 1
+    assert +net == +expected and -net == -expected
+    await assert_counters_match()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("entry", [
+    {"date": "last tuesday", "status": "degraded"},
+    {"date": "2025-01-01T00:00:00Z", "status": "broken"},
+    {"date": "2000-01-01", "status": "degraded"},
+    {"date": (date.today() + timedelta(days=1)).isoformat(), "status": "degraded"},
+])
+async def test_create_feature_rejects_invalid_history(mock_db, api, entry):
+    response = await api.post("/features", json={
+        "name": "f", "status": "operational", "publicNote": "n", "history": [entry]
+    })
+
+    assert response.status_code == 422
+    assert await Feature.count() == 0
+
+
+@pytest.mark.asyncio
+async def test_list_features_skips_invalid_legacy_history(mock_db, api):
+    today = date.today().isoformat()
+    await Feature.get_motor_collection().insert_one({
+        "name": "legacy", "status": "operational", "publicNote": "n",
+        "history": [
+            {"date": "not a date", "status": "operational"},
+            {"date": today, "status": "unknown"},
+            {"date": today, "status": "degraded"},
+        ],
+    })
+
+    response = await api.get("/features", params={"include": "history"})
+
+    assert response.status_code == 200
+    assert response.json()[0]["history"] == [{"date": today, "status": "degraded"}]
+
+
+@pytest.mark.asyncio
+async def test_patch_retries_when_history_changes_underneath(mongod_uri, mongo_db, api, monkeypatch):
+    feature_id = await create_feature(api)
+    yesterday = (date.today() - timedelta(days=1)).isoformat()
+    real_record_status = features_routes.record_status
+    calls = []
+
+    def record_status_racing(history, status, today):
+        calls.append(status)
+        if len(calls) == 1:
+            # Another writer repacks the history between our read and write
+            with MongoClient(mongod_uri) as client:
+                client[mongo_db.name][Feature.get_settings().name].update_one(
+                    {"_id": PydanticObjectId(feature_id)},
+                    {"$set": {"historyStart": yesterday, "historyCodes": Binary(bytes([3]))}},
+                )
+        return real_record_status(history, status, today)
+
+    monkeypatch.setattr(features_routes, "record_status", record_status_racing)
+
+    response = await api.patch(f"/features/{feature_id}", json={"status": "degraded"})
+
+    assert response.status_code == 200
+    assert len(calls) == 2
+    assert response.json()["history"] == [
+        {"date": yesterday, "status": "critical"},
+        {"date": date.today().isoformat(), "status": "degraded"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_patch_does_not_retry_for_writes_from_the_same_day(mongod_uri, mongo_db, api, monkeypatch):
+    feature_id = await create_feature(api)
+    today = date.today().isoformat()
+    real_record_status = features_routes.record_status
+    calls = []
+
+    def record_status_racing(history, status, day):
+        calls.append(status)
+        if len(calls) == 1:
+            # Another PATCH records today's status between our read and write
+            with MongoClient(mongod_uri) as client:
+                client[mongo_db.name][Feature.get_settings().name].update_one(
+                    {"_id": PydanticObjectId(feature_id)},
+                    {"$set": {"historyStart": today, "historyCodes": Binary(bytes([3]))}},
+                )
+        return real_record_status(history, status, day)
+
+    monkeypatch.setattr(features_routes, "record_status", record_status_racing)
+
+    response = await api.patch(f"/features/{feature_id}", json={"status": "degraded"})
+
+    assert response.status_code == 200
+    assert len(calls) == 1
+    assert response.json()["history"] == [{"date": today, "status": "degraded"}]
+
+
+@pytest.mark.asyncio
+async def test_bulk_feature_update_reports_conflicts_and_keeps_the_other_writes(mongo_db, api, monkeypatch):
+    contended = await create_feature(api, "contended")
+    changed = await create_feature(api, "changed")
+    real_apply = features_routes.apply_feature_update
+
+    async def apply_feature_update(id, feature_data, current_user):
+        if str(id) == contended:
+            raise HTTPException(status_code=409, detail="conflict")
+        return await real_apply(id, feature_data, current_user)
+
+    monkeypatch.setattr(features_routes, "apply_feature_update", apply_feature_update)
+
+    response = await api.post("/features/bulk", json={"items": [
+        {"id": contended, "status": "critical"},
+        {"id": changed, "status": "critical"},
+    ]})
+
+    assert response.status_code == 200
+    assert [item["result"] for item in response.json()["results"]] == ["conflict", "updated"]
+    logs = await ActivityLog.find({"targetId": PydanticObjectId(changed)}).to_list()
+    assert [log.details for log in logs] == [{"oldStatus": "operational", "newStatus": "critical"}]
+    await assert_counters_match()
+
+
+@pytest.mark.asyncio
+async def test_bulk_feature_update_accounts_for_writes_before_raising(mongo_db, api, monkeypatch):
+    failing = await create_feature(api, "failing")
+    changed = await create_feature(api, "changed")
+    real_apply = features_routes.apply_feature_update
+
+    async def apply_feature_update(id, feature_data, current_user):
+        if str(id) == failing:
+            raise RuntimeError("connection reset")
+        return await real_apply(id, feature_data, current_user)
+
+    monkeypatch.setattr(features_routes, "apply_feature_update", apply_feature_update)
+
+    with pytest.raises(RuntimeError):
+        await api.post("/features/bulk", json={"items": [
+            {"id": failing, "status": "critical"},
+            {"id": changed, "status": "critical"},
+        ]})
+
+    assert (await Feature.get(PydanticObjectId(changed))).status == FeatureStatusEnum.CRITICAL
+    assert await ActivityLog.find({"targetId": PydanticObjectId(changed)}).count() == 1
+    await assert_counters_match()
+
+
+@pytest.mark.asyncio
+async def test_migration_keeps_legacy_entries(mongo_db):
+    today = date.today().isoformat()
+    legacy = [
+        {"date": "2020-01-01", "status": "degraded"},
+        {"date": "31/12/2024", "status": "operational"},
+        {"date": today, "status": "critical"},
+    ]
+    result = await Feature.get_motor_collection().insert_one({
+        "name": "legacy", "status": "operational", "publicNote": "n", "history": legacy,
+    })
+
+    assert await migrate_feature_history() == 1
+    doc = await Feature.get_motor_collection().find_one({"_id": result.inserted_id})
+    assert "history" not in doc
+    assert (doc["historyStart"], bytes(doc["historyCodes"])) == (today, bytes([3]))
+    assert doc["legacyHistory"] == legacy
+
+
+@pytest.mark.asyncio
+async def test_patch_packs_legacy_history_and_keeps_the_list(mongo_db, api):
+    legacy = [{"date": "2020-01-01", "status": "degraded"}]
+    result = await Feature.get_motor_collection().insert_one({
+        "name": "legacy", "status": "degraded", "publicNote": "n", "history": legacy,
+    })
+
+    response = await api.patch(f"/features/{result.inserted_id}", json={"status": "operational"})
+
+    assert response.status_code == 200
+    assert response.json()["history"] == [{"date": date.today().isoformat(), "status": "operational"}]
+    doc = await Feature.get_motor_collection().find_one({"_id": result.inserted_id})
+    assert "history" not in doc
+    assert doc["legacyHistory"] == legacy
@@ -0,0 +1,108 @@
+"""
+Every hot query the routes run must be answered from an index.
+
+Each case is explained against a real mongod with the declared indexes
+created; the test fails if the winning plan contains a COLLSCAN. Full reads
+of small collections (GET /tasks, /roadmap, /features) are not listed.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from beanie import PydanticObjectId
+
+from app.models.activity import ActionType, ActivityDailyRollup, ActivityLog
+from app.models.dashboard import DashboardCounters
+from app.models.report import ImpactLevel, IncidentReport, ReportStatus
+from app.models.task import TaskDailyRollup
+from app.models.user import User
+from app.utils.activity_retention import _rollup_pipeline
+from app.utils.activity_stats import StatsWindow, WINDOW_LENGTHS, _stats_pipeline
+from app.utils.pagination import keyset_after, encode_cursor
+
+NOW = datetime(2025, 1, 1)
+USER_ID = PydanticObjectId()
+NEWEST_FIRST = [("timestamp", -1), ("_id", -1)]
+REPORTS_NEWEST_FIRST = [("createdAt", -1), ("_id", -1)]
+
+FIND_CASES = {
+    "login by email": (User, {"email": "a@example.com"}, None),
+    "activities": (ActivityLog, {}, NEWEST_FIRST),
+    "activities by user": (ActivityLog, {"userId": USER_ID}, NEWEST_FIRST),
+    "activities by action": (ActivityLog, {"action": ActionType.TASK_STATUS_UPDATE.value}, NEWEST_FIRST),
+    "activities by user and action": (ActivityLog, {"userId": USER_ID, "action": ActionType.TASK_STATUS_UPDATE.value}, NEWEST_FIRST),
+    "activities after cursor": (
+        ActivityLog, {"userId": USER_ID, **keyset_after("timestamp", encode_cursor(NOW, PydanticObjectId()))}, NEWEST_FIRST
+    ),
+    "rollups by user": (ActivityDailyRollup, {"userId": USER_ID, "day": {"$gte": "2025-01-01"}}, [("day", -1)]),
+    "rollups by action": (ActivityDailyRollup, {"action": ActionType.TASK_STATUS_UPDATE.value}, [("day", -1)]),
+    "reports": (IncidentReport, {}, REPORTS_NEWEST_FIRST),
+    "reports by status": (IncidentReport, {"status": {"$in": [ReportStatus.PENDING.value, ReportStatus.ACKNOWLEDGED.value]}}, REPORTS_NEWEST_FIRST),
+    "reports by impact": (IncidentReport, {"impactLevel": {"$in": [ImpactLevel.HIGH.value]}}, REPORTS_NEWEST_FIRST),
+    "reports by feature": (IncidentReport, {"featureId": PydanticObjectId()}, REPORTS_NEWEST_FIRST),
+    "reports created since": (IncidentReport, {"createdAt": {"$gte": NOW}}, REPORTS_NEWEST_FIRST),
+    "dashboard counters": (DashboardCounters, {"key": "global"}, None),
+    "velocity rollups": (TaskDailyRollup, {"day": {"$gte": "2025-01-01"}}, [("day", 1)]),
+}
+
+
+def winning_stages(explain) -> list:
+    """Every plan stage name in `explain`, skipping rejected plans."""
+    stages = []
+    if isinstance(explain, dict):
+        for key, value in explain.items():
+            if key == "rejectedPlans":
+                continue
+            if key == "stage" and isinstance(value, str):
+                stages.append(value)
+            else:
+                stages.extend(winning_stages(value))
+    elif isinstance(explain, list):
+        for value in explain:
+            stages.extend(winning_stages(value))
+    return stages
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("case", sorted(FIND_CASES))
+async def test_find_uses_an_index(mongo_db, case):
+    model, query, sort = FIND_CASES[case]
+    cursor = model.get_motor_collection().find(query)
+    if sort:
+        cursor = cursor.sort(sort)
+    stages = winning_stages(await cursor.limit(50).explain())
+
+    assert "COLLSCAN" not in stages, stages
+    assert any(stage in ("IXSCAN", "IDHACK", "EXPRESS_IXSCAN") for stage in stages), stages
+
+
+@pytest.mark.asyncio
+async def test_report_count_uses_an_index(mongo_db):
+    collection = IncidentReport.get_motor_collection()
+    explain = await mongo_db.command(
+        {"explain": {"count": collection.name, "query": {"status": {"$in": [ReportStatus.PENDING.value]}}}}
+    )
+
+    assert "COLLSCAN" not in winning_stages(explain)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("window", list(StatsWindow))
+async def test_activity_stats_match_uses_an_index(mongo_db, window):
+    collection = ActivityLog.get_motor_collection()
+    pipeline = _stats_pipeline(NOW - WINDOW_LENGTHS[window], NOW)
+    explain = await mongo_db.command(
+        {"explain": {"aggregate": collection.name, "pipeline": pipeline, "cursor": {}}}
+    )
+
+    assert "COLLSCAN" not in winning_stages(explain)
+
+
+@pytest.mark.asyncio
+async def test_activity_rollup_match_uses_an_index(mongo_db):
+    collection = ActivityLog.get_motor_collection()
+    pipeline = _rollup_pipeline({"timestamp": {"$gte": NOW - timedelta(days=1), "$lt": NOW}})
+    explain = await mongo_db.command(
+        {"explain": {"aggregate": collection.name, "pipeline": pipeline, "cursor": {}}}
+    )
+
+    assert "COLLSCAN" not in winning_stages(explain)
@@ -0,0 +1,31 @@
+import pytest
+
+import app.utils.security as security
+
+from app.config import settings
+from app.utils.metrics import request_metrics
+
+
+def routes_seen() -> set:
+    return {dict(labels)["route"] for labels in request_metrics.latency}
+
+
+@pytest.mark.asyncio
+async def test_requests_are_labelled_by_route_template(mock_db, api):
+    # A parameter value equal to a literal path segment must not be mistaken for it
+    await api.get("/api/activities/user/user")
+    await api.patch("/features/features", json={})
+    await api.get("/no/such/route")
+
+    seen = routes_seen()
+    assert {"/api/activities/user/{user_id}", "/features/{id}", "unmatched"} <= seen
+    assert not any("/user/user" in route or "features/features" in route for route in seen)
+
+
+@pytest.mark.asyncio
+async def test_password_hash_queue_depth_is_exported(mock_db, api, monkeypatch):
+    monkeypatch.setattr(security, "_hash_in_flight", settings.PASSWORD_HASH_WORKERS + 3)
+
+    lines = (await api.get("/metrics")).text.splitlines()
+
+    assert "password_hash_queue_depth 3" in lines
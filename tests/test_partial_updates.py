@@ -0,0 +1,59 @@
+import pytest
+
+from app.models.dashboard import PipelineItem, PipelineType
+from app.models.roadmap import PhaseStatus, RoadmapPhase
+from app.models.task import Task, TaskStatus
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("body", [{"name": None}, {"status": None}, {"assignee": "b", "dueDate": None}])
+async def test_patch_task_rejects_null_for_required_fields(mock_db, api, body):
+    task = await Task(name="t", assignee="a", status=TaskStatus.IN_PROGRESS, dueDate="2025-01-01").insert()
+
+    response = await api.patch(f"/tasks/{task.id}", json=body)
+
+    assert response.status_code == 422
+    stored = await Task.get(task.id)
+    assert stored.model_dump() == task.model_dump()
+
+
+@pytest.mark.asyncio
+async def test_patch_task_allows_null_for_optional_fields(mock_db, api):
+    task = await Task(name="t", assignee="a", status=TaskStatus.IN_PROGRESS, dueDate="2025-01-01").insert()
+
+    response = await api.patch(f"/tasks/{task.id}", json={"priority": None})
+
+    assert response.status_code == 200
+    assert response.json()["priority"] is None
+
+
+@pytest.mark.asyncio
+async def test_bulk_task_update_rejects_null_for_required_fields(mock_db, api):
+    task = await Task(name="t", assignee="a", status=TaskStatus.IN_PROGRESS, dueDate="2025-01-01").insert()
+
+    response = await api.post("/tasks/bulk", json={"items": [{"id": str(task.id), "status": None}]})
+
+    assert response.status_code == 422
+    assert (await Task.get(task.id)).status == TaskStatus.IN_PROGRESS
+
+
+@pytest.mark.asyncio
+async def test_patch_roadmap_phase_rejects_null_title(mock_db, api):
+    phase = await RoadmapPhase(
+        phase="P1", date="Q1", title="Launch", description="d", status=PhaseStatus.CURRENT, deliverables=[]
+    ).insert()
+
+    response = await api.patch(f"/roadmap/{phase.id}", json={"title": None})
+
+    assert response.status_code == 422
+    assert (await RoadmapPhase.get(phase.id)).title == "Launch"
+
+
+@pytest.mark.asyncio
+async def test_patch_pipeline_item_rejects_null_type(mock_db, api):
+    item = await PipelineItem(title="Item", type=PipelineType.INCOMING).insert()
+
+    response = await api.patch(f"/pipeline/{item.id}", json={"type": None})
+
+    assert response.status_code == 422
+    assert (await PipelineItem.get(item.id)).type == PipelineType.INCOMING
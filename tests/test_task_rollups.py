@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.config import settings
+from app.models.task import Task, TaskDailyRollup, TaskStatus
+from app.utils.task_rollups import ensure_task_rollups, load_burnup, load_velocity, rebuild_task_rollups
+
+
+def day(offset: int) -> str:
+    return (datetime.utcnow().date() - timedelta(days=offset)).isoformat()
+
+
+@pytest.mark.asyncio
+async def test_burnup_counts_days_before_the_window_into_its_totals(mock_db):
+    window = settings.BURNUP_WINDOW_DAYS
+    await TaskDailyRollup.insert_many([
+        TaskDailyRollup(day=day(window + 30), scopeAdded=5, completed=1),
+        TaskDailyRollup(day=day(window + 1), scopeAdded=3, completed=2),
+        TaskDailyRollup(day=day(10), scopeAdded=2, completed=4),
+        TaskDailyRollup(day=day(0), scopeAdded=1, completed=1),
+    ])
+
+    points = await load_burnup()
+
+    assert [(p.name, p.totalScope, p.completed) for p in points] == [
+        (day(10), 10, 7),
+        (day(0), 11, 8),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_rebuild_overwrites_buckets_and_drops_stale_days(mongo_db):
+    await TaskDailyRollup.insert_many([
+        TaskDailyRollup(day="2000-01-01", scopeAdded=9, completed=9),
+        TaskDailyRollup(day=day(0), scopeAdded=7, completed=7),
+    ])
+    await Task(name="open", assignee="a", status=TaskStatus.IN_PROGRESS, dueDate="2025-01-01").insert()
+    await Task(name="done", assignee="a", status=TaskStatus.DONE, dueDate="2025-01-01",
+               completedAt=datetime.utcnow()).insert()
+
+    assert await rebuild_task_rollups() == 1
+    rollups = await TaskDailyRollup.find_all().to_list()
+    assert [(r.day, r.scopeAdded, r.completed) for r in rollups] == [(day(0), 2, 1)]
+
+
+@pytest.mark.asyncio
+async def test_velocity_reads_only_the_sprints_it_shows(mock_db, monkeypatch):
+    monkeypatch.setattr(settings, "SPRINT_START_DATE", day(10 * 14))
+    monkeypatch.setattr(settings, "SPRINT_LENGTH_DAYS", 14)
+    monkeypatch.setattr(settings, "VELOCITY_SPRINTS", 2)
+    await TaskDailyRollup.insert_many([
+        TaskDailyRollup(day=day(10 * 14), completed=5),
+        TaskDailyRollup(day=day(14), completed=2),
+        TaskDailyRollup(day=day(0), completed=3),
+    ])
+
+    points = await load_velocity()
+
+    assert [(p.name, p.velocity) for p in points] == [("Sprint 10", 2), ("Sprint 11", 3)]
+
+
+@pytest.mark.asyncio
+async def test_rollups_are_built_on_first_start_only(mongo_db):
+    await Task(name="done", assignee="a", status=TaskStatus.DONE, dueDate="2025-01-01",
+               completedAt=datetime.utcnow()).insert()
+
+    await ensure_task_rollups()
+    await TaskDailyRollup.find_one(TaskDailyRollup.day == day(0)).update({"$inc": {"completed": 1}})
+    await ensure_task_rollups()
+
+    rollups = await TaskDailyRollup.find_all().to_list()
+    assert [(r.day, r.scopeAdded, r.completed) for r in rollups] == [(day(0), 1, 2)]
@@ -0,0 +1,57 @@
+from datetime import datetime
+
+import pytest
+from pymongo import MongoClient
+
+import app.routes.tasks as tasks_routes
+
+from app.models.activity import ActivityLog
+from app.models.task import Task, TaskDailyRollup, TaskStatus
+from app.utils.counters import apply_status_change, compute_counters, get_counters, rebuild_counters
+
+
+def nonzero(counts: dict) -> dict:
+    return {status: count for status, count in counts.items() if count}
+
+
+@pytest.mark.asyncio
+async def test_bulk_task_update_moves_counters_from_the_status_it_replaced(mongod_uri, mongo_db, api, monkeypatch):
+    task = await Task(name="t", assignee="a", status=TaskStatus.IN_PROGRESS, dueDate="2025-01-01").insert()
+    await rebuild_counters()
+    real_completion_update = tasks_routes.completion_update
+
+    def completion_update_racing(status, fields, now):
+        # A concurrent PATCH blocks the task between the bulk read and write
+        with MongoClient(mongod_uri) as client:
+            client[mongo_db.name][Task.get_settings().name].update_one(
+                {"_id": task.id}, {"$set": {"status": TaskStatus.BLOCKED.value}, "$inc": {"revision": 1}}
+            )
+        return real_completion_update(status, fields, now)
+
+    monkeypatch.setattr(tasks_routes, "completion_update", completion_update_racing)
+
+    response = await api.post("/tasks/bulk", json={"items": [{"id": str(task.id), "status": "Done"}]})
+
+    assert response.status_code == 200
+    assert response.json()["results"] == [{"id": str(task.id), "result": "updated"}]
+    logs = await ActivityLog.find({"targetId": task.id}).to_list()
+    assert [log.details for log in logs] == [{"oldStatus": "Blocked", "newStatus": "Done"}]
+    # The concurrent PATCH's own bookkeeping
+    await apply_status_change("tasks", TaskStatus.IN_PROGRESS, TaskStatus.BLOCKED)
+    stored = await get_counters()
+    assert nonzero(stored.tasks) == nonzero((await compute_counters())["tasks"])
+    rollup = await TaskDailyRollup.find_one(TaskDailyRollup.day == datetime.utcnow().strftime("%Y-%m-%d"))
+    assert rollup.completed == 1
+
+
+@pytest.mark.asyncio
+async def test_bulk_task_update_reports_stale_revisions_as_conflicts(mongo_db, api):
+    task = await Task(name="t", assignee="a", status=TaskStatus.IN_PROGRESS, dueDate="2025-01-01").insert()
+    await Task.get_motor_collection().update_one({"_id": task.id}, {"$set": {"revision": 3}})
+
+    response = await api.post("/tasks/bulk", json={"items": [
+        {"id": str(task.id), "status": "Done", "revision": 2},
+    ]})
+
+    assert response.json()["results"] == [{"id": str(task.id), "result": "conflict"}]
+    assert (await Task.get(task.id)).status == TaskStatus.IN_PROGRESS